@@ -7,7 +7,9 @@ from summer.application.default_beans import DEFAULT_BEANS
 from summer.application.summer_context import SummerContext
 from summer.database.database_connection_factory import DatabaseConnectionFactory
 from summer.database.database_context_extension import DatabaseContextExtension
+from summer.database import transaction
 from summer.scheduler.scheduler_context import SummerSchedulerContextExtension
+from summer.taskqueue.task_queue_context import TaskQueueContextExtension
 from summer.util import resources
 
 CONFIG_FILE_PATTERN = re.compile(
@@ -29,6 +31,8 @@ def _build_default_context() -> SummerContext:
 
 
 def find_default_config_files(directory: Union[str, Path]) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
     directory_files = os.listdir(directory)
     matching_filenames = [
         file for file in directory_files if CONFIG_FILE_PATTERN.match(file) is not None]
@@ -46,14 +50,22 @@ _DEFAULT_CTX = _build_default_context()
 def component(**kwargs) -> Callable[[T], T]:
     return _DEFAULT_CTX.component(**kwargs)
 
-def entity(clazz: T) -> T:
+def enable_database() -> DatabaseContextExtension:
     database_extension = _DEFAULT_CTX.get_extension(DatabaseContextExtension)
     if database_extension is None:
         database_extension = DatabaseContextExtension()
         _DEFAULT_CTX.register_context_extension(database_extension)
+    return database_extension
+
+def entity(clazz: T) -> T:
+    database_extension = enable_database()
     database_extension.register_entity(clazz)
     return clazz
 
+def transactional(*args, **kwargs):
+    enable_database()
+    return transaction.transactional(*args, **kwargs)
+
 def enable_scheduling():
     scheduler_extension = _DEFAULT_CTX.get_extension(
         SummerSchedulerContextExtension)
@@ -67,6 +79,17 @@ def scheduled(*args, **kwargs) -> Callable[[T], T]:
         SummerSchedulerContextExtension)
     return scheduler_extension.scheduled(*args, **kwargs)
 
+def enable_task_queue() -> TaskQueueContextExtension:
+    enable_database()
+    task_queue_extension = _DEFAULT_CTX.get_extension(TaskQueueContextExtension)
+    if task_queue_extension is None:
+        task_queue_extension = TaskQueueContextExtension(_DEFAULT_CTX)
+        _DEFAULT_CTX.register_context_extension(task_queue_extension)
+    return task_queue_extension
+
+def task_handler(name=None) -> Callable[[T], T]:
+    return enable_task_queue().task_handler(name)
+
 
 def load_configuration(*configuration_files):
     _DEFAULT_CTX.load_configuration(*configuration_files)
@@ -1,3 +1,44 @@
 _DATABASE_PREFIX = 'database'
 DATABASE_CONFIGURATION = _DATABASE_PREFIX
-DATABASE_TYPE = _DATABASE_PREFIX + '.type'
\ No newline at end of file
+DATABASE_TYPE = _DATABASE_PREFIX + '.type'
+DATABASE_WRITE_BUFFER_SIZE = _DATABASE_PREFIX + '.write_buffer.size'
+DATABASE_WRITE_BUFFER_FLUSH_INTERVAL = _DATABASE_PREFIX + '.write_buffer.flush_interval'
+DATABASE_REPLICAS = _DATABASE_PREFIX + '.replicas'
+DATABASE_REPLICA_SELECTION = _DATABASE_PREFIX + '.replica_selection'
+DATABASE_CACHE_SIZE = _DATABASE_PREFIX + '.cache.size'
+DATABASE_CACHE_TTL = _DATABASE_PREFIX + '.cache.ttl'
+DATABASE_EXPORT_CHUNK_SIZE = _DATABASE_PREFIX + '.export.chunk_size'
+DATABASE_MIGRATIONS_BATCH_SIZE = _DATABASE_PREFIX + '.migrations.batch_size'
+DATABASE_MIGRATIONS_DRY_RUN = _DATABASE_PREFIX + '.migrations.dry_run'
+DATABASE_MANAGE_SCHEMA = _DATABASE_PREFIX + '.manage_schema'
+DATABASE_BACKGROUND_INITIALIZATION = _DATABASE_PREFIX + '.background_initialization'
+DATABASE_ASYNC_WORKERS = _DATABASE_PREFIX + '.async.workers'
+DATABASE_STATISTICS_ENABLED = _DATABASE_PREFIX + '.statistics.enabled'
+DATABASE_STATISTICS_SAMPLE_RATE = _DATABASE_PREFIX + '.statistics.sample_rate'
+DATABASE_STATISTICS_SLOW_THRESHOLD = _DATABASE_PREFIX + '.statistics.slow_threshold'
+DATABASE_STATISTICS_SLOW_LOG_SIZE = _DATABASE_PREFIX + '.statistics.slow_log_size'
+DATABASE_LEASE_DURATION = _DATABASE_PREFIX + '.leases.duration'
+DATABASE_LEASE_HEARTBEAT = _DATABASE_PREFIX + '.leases.heartbeat'
+
+_SCHEDULER_PREFIX = 'scheduler'
+SCHEDULER_BACKEND = _SCHEDULER_PREFIX + '.backend'
+SCHEDULER_TICK = _SCHEDULER_PREFIX + '.tick'
+SCHEDULER_WORKERS = _SCHEDULER_PREFIX + '.workers'
+SCHEDULER_QUEUE_SIZE = _SCHEDULER_PREFIX + '.queue_size'
+SCHEDULER_OVERFLOW_POLICY = _SCHEDULER_PREFIX + '.overflow_policy'
+SCHEDULER_ASYNC_MAX_CONCURRENCY = _SCHEDULER_PREFIX + '.async.max_concurrency'
+SCHEDULER_MISFIRE_POLICY = _SCHEDULER_PREFIX + '.misfire_policy'
+SCHEDULER_METRICS_ENABLED = _SCHEDULER_PREFIX + '.metrics.enabled'
+SCHEDULER_PROCESS_WORKERS = _SCHEDULER_PREFIX + '.process.workers'
+SCHEDULER_PROCESS_CONTEXT = _SCHEDULER_PREFIX + '.process.context'
+
+_TASKQUEUE_PREFIX = 'taskqueue'
+TASKQUEUE_VISIBILITY_TIMEOUT = _TASKQUEUE_PREFIX + '.visibility_timeout'
+TASKQUEUE_MAX_ATTEMPTS = _TASKQUEUE_PREFIX + '.max_attempts'
+TASKQUEUE_BACKOFF_BASE = _TASKQUEUE_PREFIX + '.backoff.base'
+TASKQUEUE_BACKOFF_MAX = _TASKQUEUE_PREFIX + '.backoff.max'
+TASKQUEUE_WORKER_ENABLED = _TASKQUEUE_PREFIX + '.worker.enabled'
+TASKQUEUE_WORKER_QUEUES = _TASKQUEUE_PREFIX + '.worker.queues'
+TASKQUEUE_WORKER_CONCURRENCY = _TASKQUEUE_PREFIX + '.worker.concurrency'
+TASKQUEUE_WORKER_BATCH_SIZE = _TASKQUEUE_PREFIX + '.worker.batch_size'
+TASKQUEUE_WORKER_POLL_INTERVAL = _TASKQUEUE_PREFIX + '.worker.poll_interval'
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 
 from summer.autowire.context import SummerBeanContext
 from summer.autowire.exceptions import ValidationError
@@ -34,6 +34,14 @@ class SummerConfigurationContext:
             self._configuration.update(new_config)
             self._configuration_cache = {}
 
+    def set_configuration_value(self, key: str, value: Any):
+        """overrides the value of a dotted key, like one loaded from a file"""
+        self._configuration[key] = value
+        self._configuration_cache = {}
+
+    def get_configuration_files(self) -> List[str]:
+        return list(self._config_files)
+
     def get_configuration_value(self, key: str, value_type: Type[T], default: T | _NOT_SET_TYPE = NOT_SET) -> T:
         try:
             return self._get_value_internal_cached(key, value_type)
@@ -0,0 +1,193 @@
+
+import asyncio
+import threading
+from abc import abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Type, TypeVar, Union
+from peewee import Model, ModelSelect
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+
+M = TypeVar('M', bound=Model)
+T = TypeVar('T')
+
+
+class _Lane:
+    """a single worker thread, so all queries of a lane share the connection of this thread"""
+
+    def __init__(self, name: str, connect: Callable[[], Any]) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._connect = connect
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await asyncio.wrap_future(self._executor.submit(self._call, fn, *args, **kwargs))
+
+    def _call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        self._connect()
+        return fn(*args, **kwargs)
+
+    def shutdown(self, close: Callable[[], Any]):
+        self._executor.submit(close)
+        self._executor.shutdown(wait=True)
+
+
+class _LanePool:
+    """hands out free lanes to coroutines of any event loop, waiting coroutines are served in order"""
+
+    def __init__(self, lanes: List[_Lane]) -> None:
+        self.lanes = lanes
+        self._free: Deque[_Lane] = deque(lanes)
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> _Lane:
+        with self._lock:
+            if len(self._free) > 0:
+                return self._free.popleft()
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # the lane might have been handed over right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release(waiter.result())
+            raise
+
+    def release(self, lane: _Lane):
+        with self._lock:
+            if len(self._waiters) == 0:
+                self._free.append(lane)
+                return
+            waiter = self._waiters.popleft()
+        waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter, lane)
+
+    def _hand_over(self, waiter: asyncio.Future, lane: _Lane):
+        if waiter.done():
+            self.release(lane)
+        else:
+            waiter.set_result(lane)
+
+
+class _AsyncQueries:
+
+    @abstractmethod
+    async def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        pass
+
+    async def execute(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """runs any blocking database code on a worker"""
+        return await self._run(fn, *args, **kwargs)
+
+    async def get(self, entity: Type[M], *query, **filters) -> M:
+        return await self._run(entity.get, *query, **filters)
+
+    async def get_or_none(self, entity: Type[M], *query, **filters) -> Optional[M]:
+        return await self._run(entity.get_or_none, *query, **filters)
+
+    async def get_by_id(self, entity: Type[M], pk: Any) -> M:
+        return await self._run(entity.get_by_id, pk)
+
+    async def select(self, query: ModelSelect) -> List[Any]:
+        return await self._run(list, query)
+
+    async def insert_many(self, entity: Type[Model], rows: Iterable[Union[Dict[str, Any], Model]], batch_size: int = 1000) -> int:
+        """inserts the rows in batches within one transaction, returns the number of rows"""
+        rows = [dict(row.__data__) if isinstance(row, Model) else row for row in rows]
+        return await self._run(_insert_many, entity, rows, batch_size)
+
+
+def _insert_many(entity: Type[Model], rows: List[Dict[str, Any]], batch_size: int) -> int:
+    with entity._meta.database.atomic():
+        for start in range(0, len(rows), batch_size):
+            entity.insert_many(rows[start:start + batch_size]).execute()
+    return len(rows)
+
+
+class AsyncTransaction(_AsyncQueries):
+    """all queries of a transaction run on the same worker and are committed on exit, or rolled back on error"""
+
+    def __init__(self, pool: _LanePool, connection_factory: DatabaseConnectionFactory) -> None:
+        self._pool = pool
+        self._connection_factory = connection_factory
+        self._lane: Optional[_Lane] = None
+        self._atomic = None
+
+    async def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        if self._lane is None:
+            raise RuntimeError("transaction is not active")
+        return await self._lane.run(fn, *args, **kwargs)
+
+    def _begin(self):
+        self._atomic = self._connection_factory.get_database().atomic()
+        self._atomic.__enter__()
+
+    async def __aenter__(self) -> 'AsyncTransaction':
+        self._lane = await self._pool.acquire()
+        try:
+            await self._lane.run(self._begin)
+        except BaseException:
+            self._pool.release(self._lane)
+            self._lane = None
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        lane, self._lane = self._lane, None
+        try:
+            await lane.run(self._atomic.__exit__, exc_type, exc, traceback)
+        finally:
+            self._atomic = None
+            self._pool.release(lane)
+
+
+class AsyncEntityAccess(BeanStereotype, _AsyncQueries):
+    """
+    Awaitable access to the entities of the context for asyncio applications. Queries are executed by a bounded
+    number of worker threads, each of them keeping its own connection, so the event loop is never blocked.
+    """
+
+    workers = ConfigurationValue(
+        config_keys.DATABASE_ASYNC_WORKERS, int, default=4).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self._pool: Optional[_LanePool] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> _LanePool:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = _LanePool([_Lane(f"summer-async-db-{i}", self._connect) for i in range(max(self.workers, 1))])
+        return self._pool
+
+    def _connect(self):
+        self._connection_factory.get_database().connect(reuse_if_open=True)
+
+    def _close(self):
+        database = self._connection_factory.get_database()
+        if not database.is_closed():
+            database.close()
+
+    async def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        pool = self._get_pool()
+        lane = await pool.acquire()
+        try:
+            return await lane.run(fn, *args, **kwargs)
+        finally:
+            pool.release(lane)
+
+    def transaction(self) -> AsyncTransaction:
+        return AsyncTransaction(self._get_pool(), self._connection_factory)
+
+    def __pre_destroy__(self):
+        if self._pool is None:
+            return
+        for lane in self._pool.lanes:
+            lane.shutdown(self._close)
@@ -0,0 +1,99 @@
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from playhouse.pool import MaxConnectionsExceeded, PooledMySQLDatabase, PooledPostgresqlDatabase, PooledSqliteDatabase
+
+
+@dataclass
+class PoolConfiguration:
+    """
+    max_connections: maximum number of connections held open by the pool
+    stale_timeout: maximum age of a connection in seconds, older connections are recycled on checkout/return
+    wait_timeout: seconds to wait for a free connection when the pool is exhausted, None fails immediately
+    """
+    max_connections: int = field(default=20)
+    stale_timeout: Optional[int] = field(default=300)
+    wait_timeout: Optional[float] = field(default=10)
+
+    def as_kwargs(self) -> Dict[str, Any]:
+        return {
+            'max_connections': self.max_connections,
+            'stale_timeout': self.stale_timeout,
+            'timeout': self.wait_timeout
+        }
+
+
+@dataclass
+class PoolStatistics:
+    max_connections: int
+    in_use: int
+    idle: int
+    checkouts: int
+    timeouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def utilization(self) -> float:
+        if not self.max_connections:
+            return 0.0
+        return self.in_use / self.max_connections
+
+    @property
+    def average_wait_seconds(self) -> float:
+        if self.checkouts == 0:
+            return 0.0
+        return self.total_wait_seconds / self.checkouts
+
+
+class InstrumentedPoolMixin:
+    """measures how long callers wait for a connection to be checked out of the pool"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._statistics_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        super().__init__(*args, **kwargs)
+
+    def connect(self, reuse_if_open=False):
+        start = time.perf_counter()
+        try:
+            opened = super().connect(reuse_if_open)
+        except MaxConnectionsExceeded:
+            with self._statistics_lock:
+                self._timeouts += 1
+            raise
+        if opened:
+            waited = time.perf_counter() - start
+            with self._statistics_lock:
+                self._checkouts += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+        return opened
+
+    def get_pool_statistics(self) -> PoolStatistics:
+        with self._statistics_lock:
+            return PoolStatistics(
+                max_connections=self._max_connections,
+                in_use=len(self._in_use),
+                idle=len(self._connections),
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                total_wait_seconds=self._total_wait,
+                max_wait_seconds=self._max_wait)
+
+
+class InstrumentedPooledSqliteDatabase(InstrumentedPoolMixin, PooledSqliteDatabase):
+    pass
+
+
+class InstrumentedPooledMySQLDatabase(InstrumentedPoolMixin, PooledMySQLDatabase):
+    pass
+
+
+class InstrumentedPooledPostgresqlDatabase(InstrumentedPoolMixin, PooledPostgresqlDatabase):
+    pass
@@ -1,7 +1,8 @@
 from abc import abstractmethod
 from dataclasses import dataclass, field
-from typing import Type, TypeVar, Generic
+from typing import Optional, Type, TypeVar, Generic
 from peewee import Database, MySQLDatabase, PostgresqlDatabase, SqliteDatabase
+from summer.database.connection_pool import PoolConfiguration, InstrumentedPooledMySQLDatabase, InstrumentedPooledPostgresqlDatabase, InstrumentedPooledSqliteDatabase
 
 CONFIGURATION_TYPE = TypeVar("CONFIGURATION_TYPE")
 
@@ -26,6 +27,7 @@ class MysqlConnectionConfiguration:
     db_name :str
     port :int = field(default=3306)
     password: str= field(default=None)
+    pool: Optional[PoolConfiguration] = field(default=None)
 
 
 class MysqlConnectionTemplate(DatabaseConnectionTemplate[MysqlConnectionConfiguration]):
@@ -41,8 +43,13 @@ class MysqlConnectionTemplate(DatabaseConnectionTemplate[MysqlConnectionConfigur
         kwargs = {}
         if configuration.password is not None:
             kwargs['password'] = configuration.password
-        
-        return MySQLDatabase(configuration.db_name,
+
+        database_class = MySQLDatabase
+        if configuration.pool is not None:
+            database_class = InstrumentedPooledMySQLDatabase
+            kwargs.update(configuration.pool.as_kwargs())
+
+        return database_class(configuration.db_name,
             user=configuration.username, 
             host=configuration.hostname, 
             port=configuration.port, 
@@ -55,6 +62,7 @@ class PostgreSQLConnectionConfiguration:
     password: str
     db_name :str
     port :int = field(default=5432)
+    pool: Optional[PoolConfiguration] = field(default=None)
 
 
 class PostgreSQLConnectionTemplate(DatabaseConnectionTemplate[PostgreSQLConnectionConfiguration]):
@@ -67,17 +75,24 @@ class PostgreSQLConnectionTemplate(DatabaseConnectionTemplate[PostgreSQLConnecti
     
     def get_connection(self, configuration: PostgreSQLConnectionConfiguration) -> PostgresqlDatabase:
 
-        
-        return PostgresqlDatabase(configuration.db_name,
+        kwargs = {}
+        database_class = PostgresqlDatabase
+        if configuration.pool is not None:
+            database_class = InstrumentedPooledPostgresqlDatabase
+            kwargs.update(configuration.pool.as_kwargs())
+
+        return database_class(configuration.db_name,
             user=configuration.username, 
             host=configuration.hostname, 
             port=configuration.port, 
-            password=configuration.password)
+            password=configuration.password,
+            **kwargs)
 
 
 @dataclass
 class SQLiteConnectionConfiguration:
     filename: str = field(default=':memory:')
+    pool: Optional[PoolConfiguration] = field(default=None)
 
 
 class SQLiteConnectionTemplate(DatabaseConnectionTemplate[SQLiteConnectionConfiguration]):
@@ -90,4 +105,7 @@ class SQLiteConnectionTemplate(DatabaseConnectionTemplate[SQLiteConnectionConfig
     
     def get_connection(self, configuration: SQLiteConnectionConfiguration) -> SqliteDatabase:
         pragmas = {'journal_mode': 'wal'}
+        if configuration.pool is not None:
+            # pooled connections are handed to different threads over their lifetime
+            return InstrumentedPooledSqliteDatabase(configuration.filename, pragmas=pragmas, check_same_thread=False, **configuration.pool.as_kwargs())
         return SqliteDatabase(configuration.filename, pragmas=pragmas)
@@ -1,16 +1,23 @@
-from typing import Optional, Type, List
+import asyncio
+import contextlib
+import threading
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Optional, Set, Tuple, Type, List
 from summer.bean_strereotype import BeanStereotype
-from peewee import Model, Database, DatabaseProxy
+from peewee import Model, Database, DatabaseProxy, SqliteDatabase, sort_models
+from playhouse.pool import PooledDatabase
 from summer.configuration.configuration import SummerConfigurationContext
 
 from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.connection_pool import InstrumentedPoolMixin, PoolStatistics
 from summer.database.connection_templates import DatabaseConnectionTemplate, SQLiteConnectionTemplate, MysqlConnectionTemplate, PostgreSQLConnectionTemplate
 from summer.database.entities import DatabaseException
+from summer.database.routing_database import RoutingDatabase
+from summer.scheduler.scheduled_task import ScheduledTaskInterceptor
 from summer.summer_logging import get_summer_logger
 from summer.configuration import config_keys
 
 
-class DatabaseConnectionFactory(BeanStereotype):
+class DatabaseConnectionFactory(BeanStereotype, ScheduledTaskInterceptor):
 
     database_templates: List[DatabaseConnectionTemplate] = [
         SQLiteConnectionTemplate(),
@@ -21,47 +28,232 @@ class DatabaseConnectionFactory(BeanStereotype):
     database_type = ConfigurationValue(
         config_keys.DATABASE_TYPE, str, default='sqlite').typed()
 
+    replica_selection = ConfigurationValue(
+        config_keys.DATABASE_REPLICA_SELECTION, str, default=RoutingDatabase.ROUND_ROBIN).typed()
+
+    background_initialization = ConfigurationValue(
+        config_keys.DATABASE_BACKGROUND_INITIALIZATION, bool, default=False).typed()
+
+    # processes sharing the database of another one, like scheduler workers, neither create tables nor migrate
+    manage_schema = ConfigurationValue(
+        config_keys.DATABASE_MANAGE_SCHEMA, bool, default=True).typed()
+
     def __init__(self, 
         configuration_context: SummerConfigurationContext
         ) -> None:
         super().__init__()
         self._configuration_context = configuration_context
         self._database: Optional[Database] = None
+        self._routing_database: Optional[RoutingDatabase] = None
+        self._write_listeners: List[Callable[[Type[Model]], Any]] = []
+        self._connected = False
+        self._lock = threading.RLock()
+        self._initialization_thread: Optional[threading.Thread] = None
+        self._query_recorder = None
+
+    def _assert_created(self):
+        with self._lock:
+            if self._database is None:
+                template = self._get_template()
+                database = self._create_database_connection(template)
+                replicas = self._create_replica_connections(template)
+                self._routing_database = RoutingDatabase(database, replicas, self.replica_selection)
+                for listener in self._write_listeners:
+                    self._routing_database.add_write_listener(listener)
+                self._routing_database.query_recorder = self._query_recorder
+                self._database = database
 
     def _assert_connected(self):
-        if self._database is None:
-            self._database = self._create_database_connection()
-            self._database.connect()
+        self._assert_created()
+        self._routing_database.wait_until_ready()
+        with self._lock:
+            if not self._connected:
+                self._database.connect()
+                self._connected = True
 
-    def _create_database_connection(self) -> Database:
+    def _get_template(self) -> DatabaseConnectionTemplate:
         db_type = self.database_type
         for template in self.database_templates:
             if isinstance(template, DatabaseConnectionTemplate) and template.get_type().lower() == db_type.lower():
-                configuration = self._configuration_context.get_configuration_value(
-                    config_keys.DATABASE_CONFIGURATION, template.get_configuration_type())
-                return template.get_connection(configuration)
+                return template
 
         raise ValueError(f"Unknown database type \"{db_type}\"")
 
+    def _create_database_connection(self, template: DatabaseConnectionTemplate) -> Database:
+        configuration = self._configuration_context.get_configuration_value(
+            config_keys.DATABASE_CONFIGURATION, template.get_configuration_type())
+        return template.get_connection(configuration)
+
+    def _create_replica_connections(self, template: DatabaseConnectionTemplate) -> List[Database]:
+        configurations = self._configuration_context.get_configuration_value(
+            config_keys.DATABASE_REPLICAS, List[template.get_configuration_type()], default=[])
+        return [template.get_connection(configuration) for configuration in configurations]
+
     def bind_entity(self, entity: Type[Model]):
+        self.bind_entities([entity])
+
+    def bind_entities(self, entities: Iterable[Type[Model]]):
+        """binds all entities to this context and creates their missing tables within one transaction"""
         self._assert_connected()
+        entities = list(entities)
+        for entity in entities:
+            self._bind_proxy(entity)
+        self._create_missing_tables(entities)
+
+    def _bind_proxy(self, entity: Type[Model]):
         db_proxy = entity._meta.database
         if not isinstance(db_proxy, DatabaseProxy):
             raise DatabaseException(
                 "Entity can not be bound to context, because it is not initialized with a database proxy")
 
-        if db_proxy.obj is not None and db_proxy.obj != self._database:
+        if db_proxy.obj is not None and db_proxy.obj is not self._routing_database:
             raise DatabaseException(
                 "Entity can not be bound to context, because it isalready bound to another context")
 
-        if db_proxy.obj != self._database:
-            entity._meta.database.initialize(self._database)
-        self._create_database_if_necessary(entity)
+        if db_proxy.obj is not self._routing_database:
+            entity._meta.database.initialize(self._routing_database)
+
+    def initialize_in_background(self, entities: Iterable[Type[Model]], initializer: Callable[[], Any]):
+        """
+        binds the entities right away, but connects, creates their tables and calls the initializer in a background thread.
+        Until this is done, queries of all other threads wait for the initialization and fail if it failed.
+        """
+        self._assert_created()
+        entities = list(entities)
+        for entity in entities:
+            self._bind_proxy(entity)
+        self._routing_database.close_barrier()
+        if self._is_in_memory():
+            # an in-memory database only exists on the connection of the thread which creates its tables
+            self._initialize(entities, initializer)
+            return
+        self._initialization_thread = threading.Thread(
+            target=self._initialize, args=(entities, initializer), name="summer-database-init", daemon=True)
+        self._initialization_thread.start()
+
+    def _initialize(self, entities: List[Type[Model]], initializer: Callable[[], Any]):
+        with self._routing_database.bypass_barrier():
+            try:
+                self._assert_connected()
+                try:
+                    self.bind_entities(entities)
+                    initializer()
+                finally:
+                    # the connection of this thread is not used afterwards, other threads connect on demand
+                    if not self._is_in_memory():
+                        self._database.close()
+            except BaseException as e:
+                get_summer_logger().error("Initializing the database failed", exc_info=True)
+                self._routing_database.release_barrier(e)
+                return
+        get_summer_logger().info("Database initialized")
+        self._routing_database.release_barrier()
+
+    def _is_in_memory(self) -> bool:
+        return isinstance(self._database, SqliteDatabase) and self._database.database in ('', ':memory:')
+
+    def wait_until_ready(self, timeout: Optional[float] = None):
+        """blocks until the database is initialized, raises a DatabaseException if initialization failed or timed out"""
+        if self._routing_database is not None:
+            self._routing_database.wait_until_ready(timeout)
+
+    def is_ready(self) -> bool:
+        return self._routing_database is not None and self._routing_database.is_ready()
+
+    def _existing_tables(self, entities: List[Type[Model]]) -> Set[Tuple[Optional[str], str]]:
+        existing = set()
+        for schema in {entity._meta.schema for entity in entities}:
+            existing.update((schema, table.lower()) for table in self._database.get_tables(schema=schema))
+        return existing
+
+    def _create_missing_tables(self, entities: List[Type[Model]]):
+        if len(entities) == 0 or not self.manage_schema:
+            return
+        existing = self._existing_tables(entities)
+        requested = set(entities)
+        # sort_models also returns referenced models which are not part of this batch
+        missing = [entity for entity in sort_models(entities)
+                   if entity in requested and (entity._meta.schema, entity._meta.table_name.lower()) not in existing]
+        if len(missing) == 0:
+            return
 
-    def _create_database_if_necessary(self, entity: Type[Model]):
-        if not entity.table_exists():
-            get_summer_logger().debug("Creating table for class %s", entity)
-            entity.create_table()
+        with self._database.atomic():
+            for entity in missing:
+                get_summer_logger().debug("Creating table for class %s", entity)
+                entity._schema.create_all(safe=True)
 
     def get_database(self) -> Database:
+        self.wait_until_ready()
         return self._database
+
+    def get_routing_database(self) -> Optional[RoutingDatabase]:
+        return self._routing_database
+
+    def add_write_listener(self, listener: Callable[[Type[Model]], Any]):
+        self._write_listeners.append(listener)
+        if self._routing_database is not None:
+            self._routing_database.add_write_listener(listener)
+
+    def set_query_recorder(self, recorder):
+        """all statements on the entities of this context are executed through the recorder, see QueryStatistics"""
+        self._query_recorder = recorder
+        if self._routing_database is not None:
+            self._routing_database.query_recorder = recorder
+
+    def read_from_primary(self) -> ContextManager[None]:
+        """queries of the current thread within this context are not routed to replicas"""
+        self._assert_connected()
+        return self._routing_database.use_primary()
+
+    def is_pooled(self) -> bool:
+        return isinstance(self._database, PooledDatabase)
+
+    def get_pool_statistics(self) -> Optional[PoolStatistics]:
+        if isinstance(self._database, InstrumentedPoolMixin):
+            return self._database.get_pool_statistics()
+        return None
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[Database]:
+        """checks a connection out of the pool for the current thread and returns it afterwards"""
+        self._assert_connected()
+        opened = self._database.connect(reuse_if_open=True)
+        try:
+            yield self._database
+        finally:
+            if opened:
+                self._database.close()
+
+    def around_task(self) -> ContextManager[Any]:
+        if not self._connected or not self._pooled_databases() or _in_event_loop():
+            return contextlib.nullcontext()
+        return self._task_connections()
+
+    def _pooled_databases(self) -> List[PooledDatabase]:
+        return [database for database in [self._database, *self._routing_database.replicas] if isinstance(database, PooledDatabase)]
+
+    @contextlib.contextmanager
+    def _task_connections(self) -> Iterator[None]:
+        """returns the pooled connections the task opened on the primary and the replicas once it is done"""
+        opened_before = {id(database) for database in self._pooled_databases() if not database.is_closed()}
+        try:
+            yield
+        finally:
+            for database in self._pooled_databases():
+                if id(database) not in opened_before and not database.is_closed():
+                    database.close()
+
+    def __pre_destroy__(self):
+        if self._routing_database is None:
+            return
+        for database in self._pooled_databases():
+            database.close_all()
+
+
+def _in_event_loop() -> bool:
+    # coroutines share the connection of the event loop thread, their queries run on the workers of AsyncEntityAccess
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
@@ -5,6 +5,13 @@ from typing import Any, Dict, Iterable, Type
 from summer.application.context_extension import ContextExtension
 from summer.database.database_connection_factory import DatabaseConnectionFactory
 from summer.database.migration_manager import MigrationManager
+from summer.database import transaction
+from summer.database.write_buffer import EntityWriteBuffer
+from summer.database.entity_cache import EntityCache
+from summer.database.entity_export import EntityExporter
+from summer.database.async_entities import AsyncEntityAccess
+from summer.database.query_statistics import QueryStatistics
+from summer.database.lease_manager import LeaseManager
 from peewee import Model
 
 class DatabaseContextExtension(ContextExtension):
@@ -12,9 +19,10 @@ class DatabaseContextExtension(ContextExtension):
     def __init__(self) -> None:
         super().__init__()
         self._entities = Queue()
+        self._connection_factory: DatabaseConnectionFactory = None
 
     def get_beans(self) -> Iterable[Any]:
-        return [MigrationManager, DatabaseConnectionFactory] 
+        return [MigrationManager, DatabaseConnectionFactory, EntityWriteBuffer, EntityCache, EntityExporter, AsyncEntityAccess, QueryStatistics, LeaseManager]
 
     def register_entity(self, entity: Type[Model]):
         self._entities.put(entity)
@@ -31,12 +39,25 @@ class DatabaseContextExtension(ContextExtension):
         if migration_manager is None or connection_factory is None:
             return
         
+        self._connection_factory = connection_factory
+        transaction.set_database_provider(connection_factory.get_database)
+        if not connection_factory.manage_schema:
+            self._register_entities(connection_factory)
+            return
+        if connection_factory.background_initialization:
+            # the remaining startup continues, queries wait until the tables are created and migrated
+            connection_factory.initialize_in_background(self._entities.queue, migration_manager.run_migrations)
+            return
         self._register_entities(connection_factory)
         migration_manager.run_migrations()
 
 
 
+    def __pre_destroy__(self):
+        # a context created later may have replaced the provider already, its transactions keep working
+        if self._connection_factory is not None:
+            transaction.clear_database_provider(self._connection_factory.get_database)
+
     def _register_entities(self, connection_factory: DatabaseConnectionFactory):
-        for entity in self._entities.queue:
-            connection_factory.bind_entity(entity)
+        connection_factory.bind_entities(self._entities.queue)
     
\ No newline at end of file
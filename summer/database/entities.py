@@ -1,7 +1,9 @@
 
-from peewee import Model, DatabaseProxy, UUIDField
+from peewee import Model, DatabaseProxy, UUIDField, BinaryUUIDField
 import uuid
 
+from summer.util import uuid_util
+
 class DatabaseException(Exception):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
@@ -13,5 +15,9 @@ class BaseModel(Model):
 class BaseModelWithId(BaseModel):
     id = UUIDField(primary_key=True, index=True, default=uuid.uuid4)
 
+class BaseModelWithOrderedId(BaseModel):
+    """uses time-ordered UUIDv7 ids stored as 16 bytes, so new rows are appended to the end of the primary key index"""
+    id = BinaryUUIDField(primary_key=True, default=uuid_util.uuid7)
+
 
  
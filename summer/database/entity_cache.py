@@ -0,0 +1,182 @@
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Type, TypeVar
+from peewee import Model, ModelSelect
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+
+M = TypeVar('M', bound=Model)
+
+_BY_ID = "id"
+_BY_QUERY = "query"
+
+
+@dataclass
+class CacheStatistics:
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests > 0 else 0.0
+
+
+class EntityCache(BeanStereotype):
+    """
+    Opt-in cache for entities, either by primary key or by the fingerprint (SQL and parameters) of a query.
+    Entries expire after the configured ttl, the least recently used entries are evicted when the cache is full.
+
+    Every write query on an entity executed through the same context (save, delete_instance, insert, update, delete)
+    invalidates all entries of this entity, within a transaction when it is committed.
+    Raw SQL executed directly on the database is not noticed.
+    Reads within transactions bypass the cache, so uncommitted rows are never cached.
+    """
+
+    max_size = ConfigurationValue(
+        config_keys.DATABASE_CACHE_SIZE, int, default=10000).typed()
+    ttl = ConfigurationValue(
+        config_keys.DATABASE_CACHE_TTL, float, default=60.0).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Tuple[float, Any, Tuple[Type[Model], ...]]] = OrderedDict()
+        self._keys_by_entity: Dict[Type[Model], Set[Hashable]] = defaultdict(set)
+        # incremented on each invalidation, so results of reads which overlapped a write are not cached
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        connection_factory.add_write_listener(self.invalidate)
+
+    def get_by_id(self, entity: Type[M], pk: Any) -> M:
+        key = (entity, _BY_ID, pk)
+        if self._in_transaction():
+            return entity.get_by_id(pk)
+        found, value, generation = self._get(key)
+        if not found:
+            value = entity.get_by_id(pk)
+            self._put(key, value, [entity], generation)
+        return _clone(value)
+
+    def select(self, query: ModelSelect) -> List[Any]:
+        # peewee keeps the rows of an executed query, so the same query object would return them again
+        if self._in_transaction():
+            return list(query.clone())
+        sql, params = query.sql()
+        key = (query.model, _BY_QUERY, getattr(query, '_row_type', None), sql, tuple(params))
+        try:
+            hash(key)
+        except TypeError:
+            return list(query.clone())
+
+        found, rows, generation = self._get(key)
+        if not found:
+            rows = list(query.clone())
+            self._put(key, rows, _query_entities(query), generation)
+        return [_clone(row) for row in rows]
+
+    def invalidate(self, entity: Optional[Type[Model]] = None):
+        with self._lock:
+            self._generation += 1
+            if entity is None:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                self._keys_by_entity.clear()
+                return
+            keys = self._keys_by_entity.pop(entity, None)
+            if not keys:
+                return
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._discard_key(key, entry[2])
+                    self._invalidations += 1
+
+    def get_statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(
+                size=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations)
+
+    def _in_transaction(self) -> bool:
+        database = self._connection_factory.get_database()
+        return database is not None and database.in_transaction()
+
+    def _get(self, key: Hashable) -> Tuple[bool, Any, int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None, self._generation
+            expires, value, entities = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self._discard_key(key, entities)
+                self._expirations += 1
+                self._misses += 1
+                return False, None, self._generation
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, value, self._generation
+
+    def _put(self, key: Hashable, value: Any, entities: List[Type[Model]], generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value, tuple(entities))
+            self._entries.move_to_end(key)
+            for entity in entities:
+                self._keys_by_entity[entity].add(key)
+            while len(self._entries) > self.max_size:
+                oldest, (_, _, oldest_entities) = self._entries.popitem(last=False)
+                self._discard_key(oldest, oldest_entities)
+                self._evictions += 1
+
+    def _discard_key(self, key: Hashable, entities: Tuple[Type[Model], ...]):
+        for entity in entities:
+            keys = self._keys_by_entity.get(entity)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_entity[entity]
+
+
+def _query_entities(query: ModelSelect) -> List[Type[Model]]:
+    entities = [query.model]
+    for joins in getattr(query, '_joins', {}).values():
+        for join in joins:
+            destination = getattr(join[0], 'model', join[0])
+            if isinstance(destination, type) and issubclass(destination, Model) and destination not in entities:
+                entities.append(destination)
+    return entities
+
+
+def _clone(value: Any) -> Any:
+    # cached instances are shared, callers get their own copy to modify
+    if isinstance(value, Model):
+        clone = value.__class__(__no_default__=1)
+        clone.__data__ = dict(value.__data__)
+        clone.__rel__ = dict(value.__rel__)
+        return clone
+    if isinstance(value, dict):
+        return dict(value)
+    return value
@@ -0,0 +1,105 @@
+
+import contextlib
+import csv
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+from peewee import Expression, Field, Model
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import DatabaseException
+
+Row = Union[Tuple[Any, ...], Dict[str, Any]]
+
+
+class EntityExporter(BeanStereotype):
+    """
+    Streams whole tables chunk by chunk using keyset pagination on the primary key.
+    Rows are returned as tuples or dicts without creating model instances, so memory usage
+    only depends on the chunk size and not on the size of the table.
+    """
+
+    chunk_size = ConfigurationValue(
+        config_keys.DATABASE_EXPORT_CHUNK_SIZE, int, default=1000).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+
+    def iter_chunks(self, entity: Type[Model], fields: Optional[Sequence[Field]] = None, where: Optional[Expression] = None,
+                    as_dicts: bool = False, chunk_size: Optional[int] = None) -> Iterator[List[Row]]:
+        primary_key = entity._meta.primary_key
+        if primary_key is None or entity._meta.composite_key:
+            raise DatabaseException(f"Can not export {entity.__name__}, keyset pagination requires a single primary key")
+
+        fields = list(fields) if fields is not None else list(entity._meta.sorted_fields)
+        exported_names = [field.name for field in fields]
+        # fields overload ==, so they have to be compared by identity
+        key_index = next((i for i, field in enumerate(fields) if field is primary_key), None)
+        selected = fields
+        if key_index is None:
+            selected = [*fields, primary_key]
+            key_index = len(fields)
+        chunk_size = chunk_size if chunk_size is not None else self.chunk_size
+
+        last_key = None
+        # replicas lag behind differently, reading every chunk from the primary keeps the pages consistent
+        with self._connection_factory.read_from_primary():
+            while True:
+                query = entity.select(*selected).order_by(primary_key).limit(chunk_size)
+                if where is not None:
+                    query = query.where(where)
+                if last_key is not None:
+                    query = query.where(primary_key > last_key)
+
+                rows = list(query.tuples().iterator())
+                if len(rows) == 0:
+                    return
+                last_key = rows[-1][key_index]
+                if len(selected) != len(fields):
+                    rows = [row[:-1] for row in rows]
+                if as_dicts:
+                    rows = [dict(zip(exported_names, row)) for row in rows]
+                yield rows
+                if len(rows) < chunk_size:
+                    return
+
+    def iter_rows(self, entity: Type[Model], **kwargs) -> Iterator[Row]:
+        for chunk in self.iter_chunks(entity, **kwargs):
+            yield from chunk
+
+    def to_csv(self, entity: Type[Model], target: Union[str, IO[str]], fields: Optional[Sequence[Field]] = None, **kwargs) -> int:
+        header = [field.name for field in (fields if fields is not None else entity._meta.sorted_fields)]
+        count = 0
+        with _open_target(target) as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for chunk in self.iter_chunks(entity, fields=fields, **kwargs):
+                writer.writerows(chunk)
+                count += len(chunk)
+        return count
+
+    def to_json_lines(self, entity: Type[Model], target: Union[str, IO[str]], fields: Optional[Sequence[Field]] = None, **kwargs) -> int:
+        count = 0
+        with _open_target(target) as f:
+            for chunk in self.iter_chunks(entity, fields=fields, as_dicts=True, **kwargs):
+                f.write("".join(json.dumps(row, default=str) + "\n" for row in chunk))
+                count += len(chunk)
+        return count
+
+    def iter_dataframes(self, entity: Type[Model], fields: Optional[Sequence[Field]] = None, **kwargs) -> Iterator["pandas.DataFrame"]:
+        import pandas as pd
+        columns = [field.name for field in (fields if fields is not None else entity._meta.sorted_fields)]
+        for chunk in self.iter_chunks(entity, fields=fields, **kwargs):
+            yield pd.DataFrame.from_records(chunk, columns=columns)
+
+
+@contextlib.contextmanager
+def _open_target(target: Union[str, IO[str]]) -> Iterator[IO[str]]:
+    if isinstance(target, str):
+        with open(target, "w", newline="") as f:
+            yield f
+    else:
+        yield target
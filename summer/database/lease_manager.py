@@ -0,0 +1,140 @@
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from peewee import CharField, FloatField
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.scheduler.scheduled_task import ClusterCoordinator
+from summer.summer_logging import get_summer_logger
+
+
+class Lease(BaseModel):
+    name = CharField(primary_key=True)
+    owner = CharField()
+    # unix timestamps, the clocks of the nodes must agree to well below the lease duration
+    expires_at = FloatField()
+    acquired_at = FloatField()
+
+    class Meta:
+        table_name = "summer_lease"
+
+
+class LeaseManager(BeanStereotype, ClusterCoordinator):
+    """
+    Named leases stored in the database, which let one node of a cluster run cluster singleton tasks.
+    A node holds a lease until it stops renewing it, a heartbeat thread renews all held leases.
+    Other nodes take the lease over once it has expired.
+    """
+
+    duration = ConfigurationValue(
+        config_keys.DATABASE_LEASE_DURATION, float, default=30.0).typed()
+    heartbeat = ConfigurationValue(
+        config_keys.DATABASE_LEASE_HEARTBEAT, float, default=10.0).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._held: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._bound = False
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._duration = 30.0
+        self._heartbeat = 10.0
+
+    def __post_bean_init__(self):
+        # configuration values are resolved on every access of the bean, the heartbeat thread uses plain values
+        self._duration = self.duration
+        self._heartbeat = self.heartbeat
+        if self._heartbeat >= self._duration:
+            get_summer_logger().warning("Lease heartbeat %.1fs is not shorter than the lease duration %.1fs",
+                                        self._heartbeat, self._duration)
+
+    def _assert_bound(self):
+        if not self._bound:
+            self._connection_factory.bind_entity(Lease)
+            self._bound = True
+
+    def try_acquire(self, name: str) -> bool:
+        """acquires or renews the lease, returns False if another node holds it"""
+        self._assert_bound()
+        now = time.time()
+        with self._connection_factory.connection():
+            Lease.insert(name=name, owner=self.owner, expires_at=now + self._duration, acquired_at=now) \
+                .on_conflict_ignore().execute()
+            # a single conditional update, so only one of the competing nodes can take over an expired lease
+            updated = Lease.update(owner=self.owner, expires_at=now + self._duration) \
+                .where((Lease.name == name) & ((Lease.owner == self.owner) | (Lease.expires_at < now))) \
+                .execute()
+        with self._lock:
+            if updated == 0:
+                self._held.pop(name, None)
+                return False
+            if name not in self._held:
+                get_summer_logger().info("Acquired lease \"%s\"", name)
+            self._held[name] = now + self._duration
+        self._assert_heartbeat()
+        return True
+
+    def holds(self, name: str) -> bool:
+        with self._lock:
+            return self._held.get(name, 0.0) > time.time()
+
+    def get_held_leases(self) -> List[str]:
+        with self._lock:
+            return list(self._held.keys())
+
+    def release(self, name: str):
+        with self._lock:
+            held = self._held.pop(name, None) is not None
+        if not held:
+            return
+        with self._connection_factory.connection():
+            Lease.update(expires_at=0.0).where((Lease.name == name) & (Lease.owner == self.owner)).execute()
+
+    def _renew_all(self):
+        now = time.time()
+        for name in self.get_held_leases():
+            with self._connection_factory.connection():
+                updated = Lease.update(expires_at=now + self._duration) \
+                    .where((Lease.name == name) & (Lease.owner == self.owner)).execute()
+            with self._lock:
+                if updated == 0:
+                    get_summer_logger().warning("Lost lease \"%s\", another node has taken it over", name)
+                    self._held.pop(name, None)
+                elif name in self._held:
+                    self._held[name] = now + self._duration
+
+    def _assert_heartbeat(self):
+        with self._lock:
+            if self._heartbeat_thread is None and not self._stopped.is_set():
+                self._heartbeat_thread = threading.Thread(target=self._run_heartbeat, name="summer-lease-heartbeat", daemon=True)
+                self._heartbeat_thread.start()
+
+    def _run_heartbeat(self):
+        while not self._stopped.wait(self._heartbeat):
+            try:
+                self._renew_all()
+            except Exception:
+                get_summer_logger().error("Renewing leases led to an error", exc_info=True)
+
+    def __pre_destroy__(self):
+        self._stopped.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        # other nodes can take over right away instead of waiting for the leases to expire
+        for name in self.get_held_leases():
+            try:
+                self.release(name)
+            except Exception:
+                get_summer_logger().warning("Releasing lease \"%s\" led to an error", name, exc_info=True)
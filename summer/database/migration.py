@@ -1,6 +1,8 @@
 
 
 from abc import abstractmethod
+import hashlib
+import inspect
 from peewee import Database
 from playhouse.migrate import SchemaMigrator
 
@@ -14,3 +16,11 @@ class Migration:
     @abstractmethod
     def migrate(self, db: Database, migrator: SchemaMigrator):
         pass
+
+    def checksum(self) -> str:
+        """identifies the content of the migration, by default a hash of the source code of its class"""
+        try:
+            content = inspect.getsource(self.__class__)
+        except (OSError, TypeError):
+            content = f"{self.__class__.__module__}.{self.__class__.__qualname__}:{self.name()}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -1,13 +1,19 @@
 
 
-from typing import List
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
 from summer.database.database_connection_factory import DatabaseConnectionFactory
-from summer.database.entities import BaseModelWithId
+from summer.database.entities import BaseModelWithId, DatabaseException
 from summer.database.migration import Migration as ScriptedMigration
-from summer.summer_logging import _SUMMER_LOGGER, get_summer_logger
-from peewee import PostgresqlDatabase, MySQLDatabase, SqliteDatabase, Database, CharField, DateTimeField
-from playhouse.migrate import PostgresqlMigrator, MySQLMigrator, SqliteMigrator, SchemaMigrator
+from summer.summer_logging import get_summer_logger
+from peewee import PostgresqlDatabase, MySQLDatabase, SqliteDatabase, Database, CharField, DateTimeField, FloatField
+from playhouse.migrate import PostgresqlMigrator, MySQLMigrator, SqliteMigrator, SchemaMigrator, migrate
 import datetime
 
 
@@ -21,6 +27,25 @@ class MigrationZero(ScriptedMigration):
 class Migration(BaseModelWithId):
     name = CharField()
     applied = DateTimeField()
+    checksum = CharField(null=True)
+    duration = FloatField(null=True)
+
+
+@dataclass
+class MigrationResult:
+    name: str
+    checksum: str
+    applied: bool
+    duration: Optional[float] = field(default=None)
+
+
+_LEGACY_NAME = re.compile(r"<bound method (\S+) of <")
+
+
+def _natural_key(name: str) -> List[Any]:
+    # "10" sorts after "9", splitting by digits keeps str and int parts at the same positions
+    return [int(part) if i % 2 == 1 else part for i, part in enumerate(re.split(r'(\d+)', name))]
+
 
 class MigrationManager(BeanStereotype):
 
@@ -30,30 +55,159 @@ class MigrationManager(BeanStereotype):
             SqliteDatabase: SqliteMigrator
     }
 
+    # MySQL commits implicitly on every DDL statement
+    TRANSACTIONAL_DDL = (PostgresqlDatabase, SqliteDatabase)
+
+    batch_size = ConfigurationValue(
+        config_keys.DATABASE_MIGRATIONS_BATCH_SIZE, int, default=0).typed()
+    dry_run = ConfigurationValue(
+        config_keys.DATABASE_MIGRATIONS_DRY_RUN, bool, default=False).typed()
+
     def __init__(self, migrations: List[ScriptedMigration], connection_factory: DatabaseConnectionFactory) -> None:
         super().__init__()
-        self._migrations = sorted(migrations, key=lambda x: x.name()) if len(migrations) > 0 else [MigrationZero()]
+        self._migrations = sorted(migrations, key=lambda x: _natural_key(x.name())) if len(migrations) > 0 else [MigrationZero()]
         self._connection_factory = connection_factory
 
-    def run_migrations(self):
+    def run_migrations(self, dry_run: Optional[bool] = None) -> List[MigrationResult]:
+        """
+        applies all pending migrations and returns what has been applied, or with dry_run what would be applied.
+        On databases with transactional DDL, migrations are applied in transactions of batch_size migrations
+        (all pending ones if batch_size is 0) together with their bookkeeping, so a failing migration rolls
+        back its whole batch.
+        """
+        dry_run = self.dry_run if dry_run is None else dry_run
         self._connection_factory.bind_entity(Migration)
+        # replicas might lag behind, migration state must always be read from the primary
+        with self._connection_factory.read_from_primary():
+            return self._run_migrations(dry_run)
+
+    def _run_migrations(self, dry_run: bool) -> List[MigrationResult]:
         database = self._connection_factory.get_database()
-        existing_migrations = Migration.select().order_by(Migration.name.desc())
-        existing_migration_count = existing_migrations.count()
-        get_summer_logger().info("Found %s already applied migrations, %s total", existing_migration_count, len(self._migrations))
+        migrator = self.get_migrator(database)
+        has_checksums = self._upgrade_migration_table(database, migrator, dry_run)
+
+        # a dry run does not add the columns, so only the name is read from tables created before them
+        columns = [Migration.name, Migration.checksum] if has_checksums else [Migration.name]
+        rows = list(Migration.select(*columns))
+        get_summer_logger().info("Found %s already applied migrations, %s total", len(rows), len(self._migrations))
 
-        if existing_migration_count == 0:
+        if len(rows) == 0:
+            # a new database is created from the current entities, so it already is on the latest version
             latest_migration = self._migrations[-1]
-            Migration.create(name=latest_migration.name, applied=datetime.datetime.now())
-        
-        else:
-            max_migration = existing_migrations[0]
-            for migration in self._migrations:
-                if migration.name() > max_migration.name:
-                    get_summer_logger().info("applying migration \"%s\"", migration.name())
-                    migration.migrate(database, self.get_migrator(database))
-                    Migration.create(name=migration.name(), applied=datetime.datetime.now())
+            if not dry_run:
+                Migration.create(name=latest_migration.name(), applied=datetime.datetime.now(), checksum=latest_migration.checksum())
+            return []
 
+        applied = self._read_applied(rows, has_checksums, dry_run)
+        known_applied = [migration for migration in self._migrations if migration.name() in applied]
+        if len(known_applied) == 0:
+            raise DatabaseException(
+                f"none of the applied migrations {sorted(applied.keys())} is known, the pending migrations can not be determined")
+
+        self._verify_checksums(known_applied, applied, dry_run)
+        pending = self._plan(known_applied[0], known_applied[-1], applied)
+        if dry_run:
+            for migration in pending:
+                get_summer_logger().info("dry run: would apply migration \"%s\"", migration.name())
+            return [MigrationResult(migration.name(), migration.checksum(), False) for migration in pending]
+
+        results = []
+        start = time.perf_counter()
+        for batch in self._batches(database, pending):
+            results.extend(self._apply_batch(database, migrator, batch))
+        if len(results) > 0:
+            report = ", ".join(f"{result.name} ({result.duration:.3f}s)" for result in results)
+            get_summer_logger().info("Applied %s migrations in %.3fs: %s", len(results), time.perf_counter() - start, report)
+        return results
+
+    def _read_applied(self, rows: List[Migration], has_checksums: bool, dry_run: bool) -> Dict[str, Optional[str]]:
+        """applied migration names with their checksums, names stored by older versions are mapped to their migrations"""
+        legacy_names = {}
+        for migration in self._migrations:
+            # older versions stored the representation of the bound name method when they created a database
+            legacy_names[f"{type(migration).__qualname__}.name"] = migration
+        applied: Dict[str, Optional[str]] = {}
+        for row in rows:
+            match = _LEGACY_NAME.match(row.name)
+            migration = legacy_names.get(match.group(1)) if match is not None else None
+            checksum = row.checksum if has_checksums else None
+            if migration is None:
+                applied[row.name] = checksum
+                continue
+            get_summer_logger().info("Renaming applied migration \"%s\" to \"%s\"", row.name, migration.name())
+            applied[migration.name()] = checksum
+            if not dry_run:
+                Migration.update(name=migration.name()).where(Migration.name == row.name).execute()
+        return applied
+
+    def _plan(self, earliest_applied: ScriptedMigration, latest_applied: ScriptedMigration,
+              applied: Dict[str, Optional[str]]) -> List[ScriptedMigration]:
+        earliest_key = _natural_key(earliest_applied.name())
+        latest_key = _natural_key(latest_applied.name())
+        pending = []
+        for migration in self._migrations:
+            if migration.name() in applied:
+                continue
+            key = _natural_key(migration.name())
+            # databases are created on the latest migration, the ones before their first applied migration are included
+            if key < earliest_key:
+                continue
+            if key < latest_key:
+                get_summer_logger().warning("Migration \"%s\" is older than the latest applied migration \"%s\" and will not be applied",
+                                            migration.name(), latest_applied.name())
+                continue
+            pending.append(migration)
+        return pending
+
+    def _batches(self, database: Database, pending: List[ScriptedMigration]) -> List[List[ScriptedMigration]]:
+        if not isinstance(database, self.TRANSACTIONAL_DDL):
+            return [[migration] for migration in pending]
+        batch_size = self.batch_size if self.batch_size > 0 else max(len(pending), 1)
+        return [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    def _apply_batch(self, database: Database, migrator: SchemaMigrator, batch: List[ScriptedMigration]) -> List[MigrationResult]:
+        with database.atomic():
+            results = []
+            for migration in batch:
+                get_summer_logger().info("applying migration \"%s\"", migration.name())
+                start = time.perf_counter()
+                migration.migrate(database, migrator)
+                results.append(MigrationResult(migration.name(), migration.checksum(), True, time.perf_counter() - start))
+
+            applied = datetime.datetime.now()
+            Migration.insert_many([
+                {'name': result.name, 'applied': applied, 'checksum': result.checksum, 'duration': result.duration}
+                for result in results]).execute()
+            return results
+
+    def _verify_checksums(self, known_applied: List[ScriptedMigration], applied: Dict[str, Optional[str]], dry_run: bool):
+        missing_checksums = []
+        for migration in known_applied:
+            stored = applied[migration.name()]
+            if stored is None:
+                missing_checksums.append(migration)
+            elif stored != migration.checksum():
+                get_summer_logger().warning("Migration \"%s\" has been changed after it has been applied", migration.name())
+
+        if dry_run or len(missing_checksums) == 0:
+            return
+        # migrations applied before checksums were stored are trusted once
+        with Migration._meta.database.atomic():
+            for migration in missing_checksums:
+                Migration.update(checksum=migration.checksum()).where(Migration.name == migration.name()).execute()
+
+    def _upgrade_migration_table(self, database: Database, migrator: SchemaMigrator, dry_run: bool) -> bool:
+        """adds the columns of newer versions, returns whether the table has them"""
+        columns = {column.name for column in database.get_columns(Migration._meta.table_name)}
+        missing = [f for f in (Migration.checksum, Migration.duration) if f.column_name not in columns]
+        if len(missing) == 0:
+            return True
+        if dry_run:
+            get_summer_logger().info("dry run: would add columns %s to the migration table", [f.column_name for f in missing])
+            return False
+        get_summer_logger().info("Adding columns %s to the migration table", [f.column_name for f in missing])
+        migrate(*[migrator.add_column(Migration._meta.table_name, f.column_name, f) for f in missing])
+        return True
 
     def get_migrator(self, database: Database) -> SchemaMigrator:
         for db, migrator in self.MIGRATORS.items():
@@ -62,4 +216,4 @@ class MigrationManager(BeanStereotype):
 
         raise ValueError("Unknown database type %s", type(db))
 
-    
\ No newline at end of file
+
@@ -0,0 +1,178 @@
+
+import datetime
+import math
+import re
+import threading
+from time import perf_counter
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence
+from peewee import Database
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.summer_logging import get_summer_logger
+from summer.util.histogram import OTHER, Histogram, HistogramRecorder, get_bounded
+
+# upper bounds of the latency histograms in seconds
+HISTOGRAM_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OTHER_STATEMENTS = OTHER
+
+# "IN (?, ?, ?)" and multi row "VALUES (?, ?), (?, ?)" only differ by the number of parameters
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_REPEATED_GROUPS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+
+
+def fingerprint(sql: str) -> str:
+    return _REPEATED_GROUPS.sub(r"\1, ...", _PARAMETER_LIST.sub("(?...)", sql))
+
+
+@dataclass
+class StatementStatistics:
+    fingerprint: str
+    errors: int
+    rows: int
+    latency: Histogram
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    params: Sequence[Any]
+    duration: float
+    rows: int
+    executed_at: datetime.datetime
+
+
+class _Statement:
+    __slots__ = ('errors', 'rows', 'latency')
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.rows = 0
+        self.latency = HistogramRecorder(HISTOGRAM_BUCKETS)
+
+
+class QueryRecorder:
+    """
+    Executes statements on behalf of the routing database and times them. Only a sample of the statements
+    is added to the per fingerprint statistics, every statement slower than the threshold is logged.
+    Rows are counted as reported by the driver, which is the number of changed rows for writes
+    and might be unknown (not counted) for selects.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, slow_threshold: Optional[float] = 1.0,
+                 slow_log_size: int = 100, max_fingerprints: int = 1000) -> None:
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold if slow_threshold is not None else float('inf')
+        self.max_fingerprints = max_fingerprints
+        # every n-th statement is sampled, a countdown is cheaper than drawing a random number per statement
+        self._sample_interval = max(1, round(1 / sample_rate)) if sample_rate > 0 else math.inf
+        self._countdown = self._sample_interval
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _Statement] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._slow_queries: Deque[SlowQuery] = deque(maxlen=slow_log_size)
+
+    def execute(self, database: Database, sql: str, params: Sequence[Any]):
+        # updated without the lock, concurrent statements only shift the sample a little
+        countdown = self._countdown - 1
+        sampled = countdown <= 0
+        self._countdown = self._sample_interval if sampled else countdown
+        start = perf_counter()
+        try:
+            cursor = database.execute_sql(sql, params)
+        except Exception:
+            if sampled:
+                self._record(sql, perf_counter() - start, 0, True)
+            raise
+        duration = perf_counter() - start
+        if sampled or duration >= self.slow_threshold:
+            rows = max(getattr(cursor, 'rowcount', -1) or 0, 0)
+            if sampled:
+                self._record(sql, duration, rows, False)
+            if duration >= self.slow_threshold:
+                self._record_slow(sql, params, duration, rows)
+        return cursor
+
+    def _fingerprint(self, sql: str) -> str:
+        statement_fingerprint = self._fingerprints.get(sql)
+        if statement_fingerprint is None:
+            statement_fingerprint = fingerprint(sql)
+            # statements with literals inlined could grow the cache without bounds
+            if len(self._fingerprints) < self.max_fingerprints * 10:
+                self._fingerprints[sql] = statement_fingerprint
+        return statement_fingerprint
+
+    def _record(self, sql: str, duration: float, rows: int, error: bool):
+        key = self._fingerprint(sql)
+        with self._lock:
+            statement = get_bounded(self._statements, key, self.max_fingerprints, _Statement)
+            statement.errors += error
+            statement.rows += rows
+            statement.latency.add(duration)
+
+    def _record_slow(self, sql: str, params: Sequence[Any], duration: float, rows: int):
+        get_summer_logger().warning("Slow query took %.3fs: %s", duration, self._fingerprint(sql))
+        slow_query = SlowQuery(sql, tuple(params or ()), duration, rows, datetime.datetime.now())
+        with self._lock:
+            self._slow_queries.append(slow_query)
+
+    def get_statistics(self) -> List[StatementStatistics]:
+        with self._lock:
+            return [StatementStatistics(key, s.errors, s.rows, s.latency.snapshot()) for key, s in self._statements.items()]
+
+    def get_slow_queries(self) -> List[SlowQuery]:
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow_queries.clear()
+
+
+class QueryStatistics(BeanStereotype):
+    """
+    Latency histograms and row counts per statement fingerprint, plus a log of the slowest recent queries,
+    for all statements executed on the entities of the context.
+    Statistics are collected for the sample_rate fraction of the statements only, 1% by default,
+    slow queries are logged regardless of the sample.
+    """
+
+    enabled = ConfigurationValue(
+        config_keys.DATABASE_STATISTICS_ENABLED, bool, default=True).typed()
+    sample_rate = ConfigurationValue(
+        config_keys.DATABASE_STATISTICS_SAMPLE_RATE, float, default=0.01).typed()
+    slow_threshold = ConfigurationValue(
+        config_keys.DATABASE_STATISTICS_SLOW_THRESHOLD, float, default=1.0).typed()
+    slow_log_size = ConfigurationValue(
+        config_keys.DATABASE_STATISTICS_SLOW_LOG_SIZE, int, default=100).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self._recorder: Optional[QueryRecorder] = None
+
+    def __post_bean_init__(self):
+        if not self.enabled:
+            return
+        # configuration values are resolved on every access of the bean, the recorder holds plain values
+        self._recorder = QueryRecorder(self.sample_rate, self.slow_threshold, self.slow_log_size)
+        self._connection_factory.set_query_recorder(self._recorder)
+
+    def get_statistics(self) -> List[StatementStatistics]:
+        return self._recorder.get_statistics() if self._recorder is not None else []
+
+    def get_slow_queries(self) -> List[SlowQuery]:
+        return self._recorder.get_slow_queries() if self._recorder is not None else []
+
+    def reset(self):
+        if self._recorder is not None:
+            self._recorder.reset()
@@ -0,0 +1,144 @@
+
+import contextlib
+import itertools
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Type
+from peewee import Database, Model, SelectBase
+
+from summer.database.entities import DatabaseException
+
+
+class RoutingDatabase:
+    """
+    The database all entities of a context are bound to. Everything is delegated to the primary database,
+    only read queries outside of transactions are routed to one of the replicas, if there are any.
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_BUSY = "least_busy"
+
+    def __init__(self, primary: Database, replicas: Optional[List[Database]] = None, replica_selection: str = ROUND_ROBIN) -> None:
+        self.primary = primary
+        self.replicas: List[Database] = list(replicas) if replicas is not None else []
+        if replica_selection not in (self.ROUND_ROBIN, self.LEAST_BUSY):
+            raise ValueError(f"Unknown replica selection \"{replica_selection}\"")
+        self._replica_selection = replica_selection
+        self._round_robin = itertools.count()
+        self._in_flight = [0] * len(self.replicas)
+        self._in_flight_lock = threading.Lock()
+        self._state = threading.local()
+        self._write_listeners: List[Callable[[Type[Model]], Any]] = []
+        self._ready = threading.Event()
+        self._ready.set()
+        self._initialization_error: Optional[BaseException] = None
+        # optional QueryRecorder, executes and times all statements
+        self.query_recorder = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.primary, name)
+
+    def add_write_listener(self, listener: Callable[[Type[Model]], Any]):
+        """
+        the listener is called with the entity type after each write query executed on one of the entities,
+        within a transaction once it is committed
+        """
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, query):
+        model = getattr(query, 'model', None)
+        if model is None:
+            return
+        # other connections see the rows written in a transaction only after the commit, their reads in between
+        # would cache the old rows again. The callbacks of rolled back transactions are dropped by peewee.
+        if self.primary.in_transaction() and hasattr(self.primary, 'after_commit'):
+            try:
+                self.primary.after_commit(lambda: self._notify_listeners(model))
+                return
+            except ValueError:
+                # manual transactions have no commit callbacks
+                pass
+        self._notify_listeners(model)
+
+    def _notify_listeners(self, model: Type[Model]):
+        for listener in self._write_listeners:
+            listener(model)
+
+    def close_barrier(self):
+        """queries of all threads block until release_barrier is called, except within bypass_barrier"""
+        self._initialization_error = None
+        self._ready.clear()
+
+    def release_barrier(self, error: Optional[BaseException] = None):
+        """lets waiting queries continue, with an error they fail instead"""
+        self._initialization_error = error
+        self._ready.set()
+
+    @contextlib.contextmanager
+    def bypass_barrier(self) -> Iterator[None]:
+        """queries of the current thread are not blocked by the barrier within this context"""
+        bypass = getattr(self._state, 'bypass_barrier', False)
+        self._state.bypass_barrier = True
+        try:
+            yield
+        finally:
+            self._state.bypass_barrier = bypass
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self._initialization_error is None
+
+    def wait_until_ready(self, timeout: Optional[float] = None):
+        if getattr(self._state, 'bypass_barrier', False):
+            return
+        if not self._ready.wait(timeout):
+            raise DatabaseException(f"Database has not been initialized within {timeout} seconds")
+        if self._initialization_error is not None:
+            raise DatabaseException("Database initialization failed") from self._initialization_error
+
+    @contextlib.contextmanager
+    def use_primary(self) -> Iterator[None]:
+        """all queries of the current thread are executed on the primary database within this context"""
+        depth = getattr(self._state, 'primary_depth', 0)
+        self._state.primary_depth = depth + 1
+        try:
+            yield
+        finally:
+            self._state.primary_depth = depth
+
+    def _is_replica_query(self, query) -> bool:
+        return (
+            isinstance(query, SelectBase)
+            and not getattr(query, '_for_update', None)
+            and not getattr(self._state, 'primary_depth', 0)
+            and not self.primary.in_transaction()
+        )
+
+    def _select_replica(self) -> int:
+        if self._replica_selection == self.LEAST_BUSY:
+            with self._in_flight_lock:
+                return min(range(len(self._in_flight)), key=self._in_flight.__getitem__)
+        return next(self._round_robin) % len(self.replicas)
+
+    def execute(self, query, **context_options):
+        if not self._ready.is_set() or self._initialization_error is not None:
+            self.wait_until_ready()
+        if len(self.replicas) == 0 or not self._is_replica_query(query):
+            cursor = self._execute(self.primary, query, context_options)
+            if self._write_listeners and not isinstance(query, SelectBase):
+                self._notify_write(query)
+            return cursor
+
+        index = self._select_replica()
+        with self._in_flight_lock:
+            self._in_flight[index] += 1
+        try:
+            return self._execute(self.replicas[index], query, context_options)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight[index] -= 1
+
+    def _execute(self, database: Database, query, context_options):
+        recorder = self.query_recorder
+        if recorder is None:
+            return database.execute(query, **context_options)
+        sql, params = database.get_sql_context(**context_options).sql(query).query()
+        return recorder.execute(database, sql, params)
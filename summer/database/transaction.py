@@ -0,0 +1,49 @@
+
+import functools
+from typing import Callable, Optional, TypeVar, Union
+from peewee import Database
+
+from summer.database.entities import DatabaseException
+
+T = TypeVar('T', bound=Callable)
+
+_DATABASE_PROVIDER: Optional[Callable[[], Database]] = None
+
+
+def set_database_provider(provider: Optional[Callable[[], Database]]):
+    global _DATABASE_PROVIDER
+    _DATABASE_PROVIDER = provider
+
+
+def clear_database_provider(provider: Callable[[], Database]):
+    global _DATABASE_PROVIDER
+    if _DATABASE_PROVIDER == provider:
+        _DATABASE_PROVIDER = None
+
+
+def _get_database() -> Database:
+    database = _DATABASE_PROVIDER() if _DATABASE_PROVIDER is not None else None
+    if database is None:
+        raise DatabaseException("transactional function called without an initialized database context")
+    return database
+
+
+def transactional(fn: Optional[T] = None, *, savepoint: bool = True) -> Union[T, Callable[[T], T]]:
+    """
+    Runs the decorated function in a transaction, which is committed when the function returns and
+    rolled back when it raises. Nested transactional calls use a savepoint, so only their own changes
+    are rolled back on failure; with savepoint=False they simply join the surrounding transaction.
+    """
+    def decorator(function: T) -> T:
+        @functools.wraps(function)
+        def inner(*args, **kwargs):
+            database = _get_database()
+            if not savepoint and database.in_transaction():
+                return function(*args, **kwargs)
+            with database.atomic():
+                return function(*args, **kwargs)
+        return inner
+
+    if fn is not None:
+        return decorator(fn)
+    return decorator
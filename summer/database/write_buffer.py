@@ -0,0 +1,166 @@
+
+import datetime
+import sqlite3
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Type, Union
+from peewee import Database, Model, MySQLDatabase, PostgresqlDatabase, SqliteDatabase
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import DatabaseException
+from summer.summer_logging import get_summer_logger
+
+
+@dataclass
+class FailedBatch:
+    entity: Type[Model]
+    rows: List[Dict[str, Any]]
+    error: Exception
+    failed_at: datetime.datetime
+
+
+class EntityWriteBuffer(BeanStereotype):
+    """
+    Write-behind buffer for entity inserts. Rows are collected per entity and written with insert_many
+    once the buffer is full, after the flush interval has passed or when the context is destroyed.
+    """
+
+    max_size = ConfigurationValue(
+        config_keys.DATABASE_WRITE_BUFFER_SIZE, int, default=10000).typed()
+    flush_interval = ConfigurationValue(
+        config_keys.DATABASE_WRITE_BUFFER_FLUSH_INTERVAL, float, default=5.0).typed()
+
+    MAX_QUERY_PARAMETERS = {
+        MySQLDatabase: 65535,
+        PostgresqlDatabase: 32767,
+        SqliteDatabase: 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    }
+    MAX_FAILED_BATCHES = 100
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffers: Dict[Type[Model], List[Dict[str, Any]]] = defaultdict(list)
+        self._size = 0
+        self._failed_batches: Deque[FailedBatch] = deque(maxlen=self.MAX_FAILED_BATCHES)
+        self._failure_listeners: List[Callable[[FailedBatch], Any]] = []
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def add(self, row: Union[Model, Dict[str, Any]], entity: Optional[Type[Model]] = None):
+        self.add_all([row], entity)
+
+    def add_all(self, rows: Iterable[Union[Model, Dict[str, Any]]], entity: Optional[Type[Model]] = None):
+        with self._lock:
+            for row in rows:
+                if isinstance(row, Model):
+                    self._buffers[row.__class__].append(dict(row.__data__))
+                elif entity is not None:
+                    self._buffers[entity].append(row)
+                else:
+                    raise DatabaseException("the entity type must be given when buffering dictionaries")
+                self._size += 1
+            full = self._size >= self.max_size
+        self._assert_flush_thread()
+        if full:
+            self.flush()
+
+    def size(self) -> int:
+        return self._size
+
+    def flush(self) -> int:
+        """writes all buffered rows, returns the number of rows which have been written successfully"""
+        with self._flush_lock:
+            with self._lock:
+                buffers = self._buffers
+                self._buffers = defaultdict(list)
+                self._size = 0
+            if len(buffers) == 0:
+                return 0
+
+            written = 0
+            pending = dict(buffers)
+            try:
+                with self._connection_factory.connection() as database:
+                    for entity in list(pending):
+                        written += self._write_rows(database, entity, pending.pop(entity))
+            except Exception as e:
+                if len(pending) == 0:
+                    raise
+                # the rows are not lost silently when no connection can be opened, they are reported as failed batches
+                failed_at = datetime.datetime.now()
+                for entity, rows in pending.items():
+                    self._report_failure(FailedBatch(entity, rows, e, failed_at))
+            return written
+
+    def _write_rows(self, database: Database, entity: Type[Model], rows: List[Dict[str, Any]]) -> int:
+        # insert_many expects the same columns in every row of a statement
+        rows_by_columns: Dict[frozenset, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            rows_by_columns[frozenset(row.keys())].append(row)
+
+        written = 0
+        for columns, column_rows in rows_by_columns.items():
+            chunk_size = self._chunk_size(database, entity, len(columns))
+            try:
+                with database.atomic():
+                    for start in range(0, len(column_rows), chunk_size):
+                        entity.insert_many(column_rows[start:start + chunk_size]).execute()
+                written += len(column_rows)
+            except Exception as e:
+                self._report_failure(FailedBatch(entity, column_rows, e, datetime.datetime.now()))
+        return written
+
+    def _chunk_size(self, database: Database, entity: Type[Model], column_count: int) -> int:
+        max_parameters = 999
+        for database_type, limit in self.MAX_QUERY_PARAMETERS.items():
+            if isinstance(database, database_type):
+                max_parameters = limit
+                break
+        # fields with defaults are added by peewee even if they are missing in the row
+        parameters_per_row = max(column_count, len(entity._meta.fields), 1)
+        return max(1, max_parameters // parameters_per_row)
+
+    def _report_failure(self, failed_batch: FailedBatch):
+        get_summer_logger().error("Writing %s buffered rows of %s failed",
+                                  len(failed_batch.rows), failed_batch.entity.__name__, exc_info=failed_batch.error)
+        self._failed_batches.append(failed_batch)
+        for listener in self._failure_listeners:
+            try:
+                listener(failed_batch)
+            except Exception:
+                get_summer_logger().error("Failure listener of the write buffer led to an error", exc_info=True)
+
+    def on_failure(self, listener: Callable[[FailedBatch], Any]):
+        self._failure_listeners.append(listener)
+
+    def get_failed_batches(self) -> List[FailedBatch]:
+        return list(self._failed_batches)
+
+    def _assert_flush_thread(self):
+        if self._flush_thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(
+                    target=self._flush_periodically, name="summer-write-buffer", daemon=True)
+                self._flush_thread.start()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                get_summer_logger().error("Flushing the write buffer led to an error", exc_info=True)
+
+    def __pre_destroy__(self):
+        self._stopped.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+        self.flush()
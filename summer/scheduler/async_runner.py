@@ -0,0 +1,154 @@
+
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+from summer.scheduler.executor import BoundedExecutor
+from summer.summer_logging import get_summer_logger
+
+
+class _Submission:
+    __slots__ = ('on_discard', 'future', 'discarded')
+
+    def __init__(self, on_discard: Optional[Callable[[], Any]]) -> None:
+        self.on_discard = on_discard
+        self.future: Optional[Future] = None
+        self.discarded = False
+
+
+class AsyncTaskRunner:
+    """
+    Runs coroutines of scheduled tasks on one long lived event loop in its own thread.
+    At most max_concurrency of them run at the same time, at most queue_size more wait for their turn.
+    Beyond that the overflow policy applies like for the BoundedExecutor. DISCARD_OLDEST discards
+    the longest waiting coroutine which has not started yet, the new one if all of them have started.
+    """
+
+    def __init__(self, max_concurrency: int = 1000, queue_size: int = 10000,
+                 overflow_policy: str = BoundedExecutor.BLOCK, name: str = "summer-scheduler-loop") -> None:
+        if overflow_policy not in (BoundedExecutor.BLOCK, BoundedExecutor.DISCARD, BoundedExecutor.DISCARD_OLDEST):
+            raise ValueError(f"Unknown overflow policy \"{overflow_policy}\"")
+        self.max_concurrency = max(max_concurrency, 1)
+        self.overflow_policy = overflow_policy
+        self._name = name
+        self._capacity = threading.BoundedSemaphore(self.max_concurrency + max(queue_size, 0))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._concurrency: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        # submitted coroutines which have not started yet, oldest first
+        self._waiting: Deque[_Submission] = deque()
+        self._shutdown = False
+        self._pending = 0
+        self._active = 0
+        self._discarded = 0
+
+    @property
+    def queued(self) -> int:
+        return self._pending - self._active
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def discarded(self) -> int:
+        return self._discarded
+
+    def _assert_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(loop, started), name=self._name, daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, started: threading.Event):
+        asyncio.set_event_loop(loop)
+        self._concurrency = asyncio.Semaphore(self.max_concurrency)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, coroutine_function: Callable[[], Awaitable[Any]], on_discard: Optional[Callable[[], Any]] = None) -> bool:
+        """returns False if the coroutine has been discarded instead of started"""
+        if self._shutdown:
+            raise RuntimeError("cannot submit after shutdown")
+        blocking = self.overflow_policy == BoundedExecutor.BLOCK
+        if not self._capacity.acquire(blocking=blocking):
+            oldest = self._discard_oldest() if self.overflow_policy == BoundedExecutor.DISCARD_OLDEST else None
+            self._discarded += 1
+            if oldest is None:
+                self._report_discard(on_discard)
+                return False
+            # the new coroutine takes over the capacity of the discarded one
+            self._report_discard(oldest.on_discard)
+        loop = self._assert_started()
+        submission = _Submission(on_discard)
+        with self._lock:
+            self._pending += 1
+            self._waiting.append(submission)
+        submission.future = asyncio.run_coroutine_threadsafe(self._run(coroutine_function, submission), loop)
+        return True
+
+    def _discard_oldest(self) -> Optional[_Submission]:
+        with self._lock:
+            if len(self._waiting) == 0:
+                return None
+            submission = self._waiting.popleft()
+            submission.discarded = True
+        # a discarded coroutine which is not cancelled yet returns when it gets its turn
+        if submission.future is not None:
+            submission.future.cancel()
+        return submission
+
+    def _report_discard(self, on_discard: Optional[Callable[[], Any]]):
+        if on_discard is None:
+            return
+        try:
+            on_discard()
+        except Exception:
+            get_summer_logger().error("Handling a discarded task led to an error", exc_info=True)
+
+    async def _run(self, coroutine_function: Callable[[], Awaitable[Any]], submission: _Submission):
+        try:
+            async with self._concurrency:
+                with self._lock:
+                    if submission.discarded:
+                        return
+                    self._waiting.remove(submission)
+                self._active += 1
+                try:
+                    await coroutine_function()
+                except Exception:
+                    get_summer_logger().error("Running a scheduled coroutine led to an error", exc_info=True)
+                finally:
+                    self._active -= 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+            if not submission.discarded:
+                self._capacity.release()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """cancels all coroutines which are still running and stops the loop"""
+        self._shutdown = True
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+    async def _cancel_all(self):
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
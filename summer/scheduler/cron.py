@@ -0,0 +1,180 @@
+
+import bisect
+import calendar
+import datetime
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from summer.autowire.exceptions import ValidationError
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTH_NAMES = {name.lower(): index for index, name in enumerate(calendar.month_abbr) if name}
+_DAY_NAMES = {name.lower(): (index + 1) % 7 for index, name in enumerate(calendar.day_abbr)}
+
+# name, minimum, maximum, names
+_FIELDS: List[Tuple[str, int, int, Dict[str, int]]] = [
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day of month", 1, 31, {}),
+    ("month", 1, 12, _MONTH_NAMES),
+    ("day of week", 0, 7, _DAY_NAMES),
+]
+
+# a schedule like "0 0 30 2 *" never fires, the search gives up after this many years
+_MAX_YEARS = 28
+
+
+def _parse_value(text: str, field: Tuple[str, int, int, Dict[str, int]]) -> int:
+    name, minimum, maximum, names = field
+    value = names.get(text.lower())
+    if value is None:
+        try:
+            value = int(text)
+        except ValueError:
+            raise ValidationError(f"invalid {name} \"{text}\" in cron expression")
+    if value < minimum or value > maximum:
+        raise ValidationError(f"{name} \"{text}\" is out of range {minimum}-{maximum}")
+    return value
+
+
+def _parse_field(text: str, field: Tuple[str, int, int, Dict[str, int]]) -> Tuple[List[int], bool]:
+    """returns the sorted values of the field and whether it is restricted, i.e. not a plain *"""
+    _, minimum, maximum, _ = field
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text) if step_text.isdigit() and int(step_text) > 0 else 0
+            if step == 0:
+                raise ValidationError(f"invalid step \"{step_text}\" in cron expression")
+        if part in ("*", "?"):
+            start, end = minimum, maximum
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, field), _parse_value(end_text, field)
+        else:
+            start = _parse_value(part, field)
+            end = maximum if step > 1 else start
+        if start > end:
+            raise ValidationError(f"invalid range \"{part}\" in cron expression")
+        values.update(range(start, end + 1, step))
+    return sorted(values), text not in ("*", "?")
+
+
+class CronExpression:
+    """
+    A compiled cron expression with the fields minute, hour, day of month, month and day of week, or one of the
+    macros like @daily. Every field is kept as a sorted list, so the next fire time is found with a few bisections
+    instead of trying minute by minute. Like in cron, a day matches if either day field matches when both are restricted.
+    Times are computed in the given time zone, or in the local time of the system.
+    """
+
+    def __init__(self, expression: str, timezone: Optional[str] = None) -> None:
+        self.expression = expression
+        self.timezone = ZoneInfo(timezone) if timezone is not None else None
+        fields = _MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValidationError(f"cron expression \"{expression}\" must have 5 fields")
+        parsed = [_parse_field(text, field) for text, field in zip(fields, _FIELDS)]
+        self.minutes, _ = parsed[0]
+        self.hours, _ = parsed[1]
+        self.days, days_restricted = parsed[2]
+        self.months, _ = parsed[3]
+        weekdays, weekdays_restricted = parsed[4]
+        # cron counts sunday as 0 and 7, python as 6
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        self._days_set = frozenset(self.days)
+        self._match_any_day = days_restricted and weekdays_restricted
+        self._days_restricted = days_restricted
+        self._weekdays_restricted = weekdays_restricted
+
+    def _day_matches(self, year: int, month: int, day: int) -> bool:
+        day_match = day in self._days_set
+        weekday_match = calendar.weekday(year, month, day) in self.weekdays
+        if self._match_any_day:
+            return day_match or weekday_match
+        if self._days_restricted:
+            return day_match
+        if self._weekdays_restricted:
+            return weekday_match
+        return True
+
+    def _next_day(self, year: int, month: int, day: int) -> Optional[int]:
+        last_day = calendar.monthrange(year, month)[1]
+        if not self._weekdays_restricted:
+            index = bisect.bisect_left(self.days, day)
+            return self.days[index] if index < len(self.days) and self.days[index] <= last_day else None
+        for candidate in range(day, last_day + 1):
+            if self._day_matches(year, month, candidate):
+                return candidate
+        return None
+
+    def _next_local(self, start: datetime.datetime) -> Optional[datetime.datetime]:
+        """the first matching naive local time at or after start, which has no seconds"""
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        while year <= start.year + _MAX_YEARS:
+            index = bisect.bisect_left(self.months, month)
+            if index == len(self.months):
+                year, month, day, hour, minute = year + 1, self.months[0], 1, 0, 0
+                continue
+            if self.months[index] != month:
+                month, day, hour, minute = self.months[index], 1, 0, 0
+            next_day = self._next_day(year, month, day)
+            if next_day is None:
+                year, month, day, hour, minute = (year + 1, 1, 1, 0, 0) if month == 12 else (year, month + 1, 1, 0, 0)
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+            index = bisect.bisect_left(self.hours, hour)
+            if index == len(self.hours):
+                following = datetime.date(year, month, day) + datetime.timedelta(days=1)
+                year, month, day, hour, minute = following.year, following.month, following.day, 0, 0
+                continue
+            if self.hours[index] != hour:
+                hour, minute = self.hours[index], 0
+            index = bisect.bisect_left(self.minutes, minute)
+            if index == len(self.minutes):
+                hour, minute = hour + 1, 0
+                if hour == 24:
+                    following = datetime.date(year, month, day) + datetime.timedelta(days=1)
+                    year, month, day, hour = following.year, following.month, following.day, 0
+                continue
+            return datetime.datetime(year, month, day, hour, self.minutes[index])
+        return None
+
+    def _localize(self, local: datetime.datetime) -> Optional[datetime.datetime]:
+        """the aware time of a local time, None if the local time does not exist because of a DST gap"""
+        if self.timezone is not None:
+            aware = local.replace(tzinfo=self.timezone)
+            if aware.astimezone(datetime.timezone.utc).astimezone(self.timezone).replace(tzinfo=None) != local:
+                return None
+            return aware
+        aware = local.astimezone()
+        return aware if aware.astimezone().replace(tzinfo=None) == local else None
+
+    def next_after(self, after: datetime.datetime) -> Optional[datetime.datetime]:
+        """the first fire time strictly after the given time as aware datetime, naive times are local times"""
+        if after.tzinfo is None:
+            after = after.astimezone()
+        local_after = after.astimezone(self.timezone).replace(tzinfo=None) if self.timezone is not None \
+            else after.astimezone().replace(tzinfo=None)
+        start = local_after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        while True:
+            local = self._next_local(start)
+            if local is None:
+                return None
+            aware = self._localize(local)
+            # times in a DST gap are skipped, repeated times fire once
+            if aware is not None and aware > after:
+                return aware
+            start = local + datetime.timedelta(minutes=1)
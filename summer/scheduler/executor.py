@@ -0,0 +1,126 @@
+
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from summer.summer_logging import get_summer_logger
+
+
+class BoundedExecutor:
+    """
+    Runs submitted functions on at most max_workers threads. Functions waiting for a worker are kept in a queue
+    of at most queue_size entries; when it is full the overflow policy decides:
+    BLOCK waits until there is space, DISCARD drops the new function and DISCARD_OLDEST the longest waiting one.
+    Dropped functions are reported to their on_discard callback.
+    """
+
+    BLOCK = "block"
+    DISCARD = "discard"
+    DISCARD_OLDEST = "discard_oldest"
+
+    def __init__(self, max_workers: Optional[int] = None, queue_size: int = 10000,
+                 overflow_policy: str = BLOCK, name: str = "summer-executor") -> None:
+        if overflow_policy not in (self.BLOCK, self.DISCARD, self.DISCARD_OLDEST):
+            raise ValueError(f"Unknown overflow policy \"{overflow_policy}\"")
+        self.max_workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) + 4)
+        self.queue_size = max(queue_size, 1)
+        self.overflow_policy = overflow_policy
+        self._name = name
+        self._queue: Deque[Tuple[Callable[[], Any], Optional[Callable[[], Any]]]] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._workers: List[threading.Thread] = []
+        self._idle = 0
+        self._active = 0
+        self._discarded = 0
+        self._shutdown = False
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def discarded(self) -> int:
+        return self._discarded
+
+    def submit(self, fn: Callable[[], Any], on_discard: Optional[Callable[[], Any]] = None) -> bool:
+        """returns False if the function has been discarded instead of queued"""
+        dropped = None
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            if len(self._queue) >= self.queue_size:
+                if self.overflow_policy == self.DISCARD:
+                    self._discarded += 1
+                    dropped = on_discard
+                    fn = None
+                elif self.overflow_policy == self.DISCARD_OLDEST:
+                    self._discarded += 1
+                    _, dropped = self._queue.popleft()
+                else:
+                    while len(self._queue) >= self.queue_size and not self._shutdown:
+                        self._not_full.wait()
+                    if self._shutdown:
+                        return False
+            if fn is not None:
+                self._queue.append((fn, on_discard))
+                if len(self._queue) > self._idle and len(self._workers) < self.max_workers:
+                    self._start_worker()
+                else:
+                    self._not_empty.notify()
+        if dropped is not None:
+            self._report_discard(dropped)
+        return fn is not None
+
+    def _report_discard(self, on_discard: Callable[[], Any]):
+        try:
+            on_discard()
+        except Exception:
+            get_summer_logger().error("Handling a discarded task led to an error", exc_info=True)
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._work, name=f"{self._name}-{len(self._workers)}", daemon=True)
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while len(self._queue) == 0 and not self._shutdown:
+                    self._idle += 1
+                    self._not_empty.wait()
+                    self._idle -= 1
+                if len(self._queue) == 0:
+                    return
+                fn, _ = self._queue.popleft()
+                self._active += 1
+                self._not_full.notify()
+            try:
+                fn()
+            except Exception:
+                get_summer_logger().error("Running a submitted task led to an error", exc_info=True)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = True):
+        with self._lock:
+            self._shutdown = True
+            cancelled = list(self._queue) if cancel_pending else []
+            if cancel_pending:
+                self._queue.clear()
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        for _, on_discard in cancelled:
+            if on_discard is not None:
+                self._report_discard(on_discard)
+        if wait:
+            for worker in self._workers:
+                if worker is not threading.current_thread():
+                    worker.join()
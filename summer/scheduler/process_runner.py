@@ -0,0 +1,156 @@
+
+import importlib
+import inspect
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from summer.autowire.exceptions import ValidationError
+from summer.configuration import config_keys
+from summer.scheduler.scheduled_task import ClusterCoordinator
+from summer.summer_logging import get_summer_logger
+
+DEFAULT_CONTEXT = "summer.application.default_context:_DEFAULT_CTX"
+
+_WORKER_CONTEXT = None
+
+
+def _resolve(locator: str) -> Any:
+    module_name, _, attribute = locator.partition(":")
+    value = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def _initialize_worker(context_locator: str, configuration_files: List[str], modules: List[str]):
+    """
+    runs once in every worker process, the modules register their beans before the context is wired.
+    The scheduling process owns the schema, workers neither create tables nor run migrations
+    """
+    global _WORKER_CONTEXT
+    for module in modules:
+        importlib.import_module(module)
+    context = _resolve(context_locator)
+    loaded = context.get_configuration_files()
+    missing = [file for file in configuration_files if file not in loaded]
+    if len(missing) > 0:
+        context.load_configuration(*missing)
+    context.set_configuration_value(config_keys.DATABASE_MANAGE_SCHEMA, False)
+    context.initialize()
+    _WORKER_CONTEXT = context
+
+
+def _run_job(module: str, qualname: str) -> Tuple[float, Any]:
+    """returns the duration and the result of the job"""
+    target = importlib.import_module(module)
+    owner = None
+    for name in qualname.split("."):
+        owner, target = target, getattr(target, name)
+    args = []
+    if inspect.isclass(owner):
+        # methods of beans are called on the bean of the worker context
+        args.append(_WORKER_CONTEXT.get_bean(cls=owner))
+    start = time.perf_counter()
+    result = _WORKER_CONTEXT.autowire_and_run(target, *args)
+    return time.perf_counter() - start, result
+
+
+class ProcessTaskRunner:
+    """
+    Runs scheduled functions in a pool of worker processes, so CPU bound jobs do not compete for the GIL.
+    Workers are spawned, they import the modules of the jobs and wire their own context, located by
+    a "module:attribute" string, with the configuration files of the scheduling context.
+    Jobs must be module level functions or methods of beans, they are referenced by module and qualified name.
+    Leases of cluster singletons are acquired with the cluster_coordinator of the scheduling process,
+    so all workers of a node share them.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, context_locator: str = DEFAULT_CONTEXT,
+                 configuration_files: Iterable[str] = ()) -> None:
+        self.max_workers = max_workers if max_workers else None
+        self.context_locator = context_locator
+        self.configuration_files = list(configuration_files)
+        self._modules: Set[str] = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # the modules the workers of the current pool have imported
+        self._pool_modules: Set[str] = set()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self.cluster_coordinator: Optional[ClusterCoordinator] = None
+
+    def register(self, function: Callable[..., Any]) -> Tuple[str, str]:
+        """returns the reference of the function in the worker processes"""
+        module = getattr(function, "__module__", None)
+        qualname = getattr(function, "__qualname__", "")
+        if module is None or "<" in qualname:
+            raise ValidationError(f"{function} can not be run in a process, only module level functions and bean methods can")
+        if inspect.iscoroutinefunction(function):
+            raise ValidationError(f"{function} can not be run in a process, because it is a coroutine function")
+        with self._lock:
+            self._modules.add(module)
+        return module, qualname
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            if self._pool is not None and self._pool._broken:
+                # a worker died or failed to initialize, the executor refuses all further jobs
+                get_summer_logger().error("The process pool is broken, starting a new one: %s", self._pool._broken)
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is not None and not self._modules.issubset(self._pool_modules):
+                # the workers wired their contexts without the beans of modules registered later, new workers import them
+                get_summer_logger().info("Restarting the process pool for the modules %s", sorted(self._modules - self._pool_modules))
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool_modules = set(self._modules)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_worker,
+                    initargs=(self.context_locator, self.configuration_files, sorted(self._pool_modules)))
+            return self._pool
+
+    def submit(self, target: Tuple[str, str, Optional[str]], on_done: Callable[[Optional[float], Any, Optional[BaseException]], Any]):
+        """on_done is called with the duration and the result of the job in the worker, or with the error it raised.
+        The duration is None if the job has not run, because another node holds its lease. Results must be picklable.
+        Acquiring the lease queries the database, so cluster singletons should not be submitted by the scheduler thread"""
+        module, qualname, lease_name = target
+        if lease_name is not None:
+            try:
+                acquired = self.cluster_coordinator.try_acquire(lease_name)
+            except Exception as error:
+                on_done(None, None, error)
+                return
+            if not acquired:
+                on_done(None, None, None)
+                return
+        try:
+            future = self._get_pool().submit(_run_job, module, qualname)
+        except BrokenProcessPool:
+            # the pool broke after it has been checked, the next one is started right away
+            future = self._get_pool().submit(_run_job, module, qualname)
+
+        def done(finished: Future):
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            try:
+                duration, result = finished.result() if error is None else (None, None)
+                on_done(duration, result, error)
+            except Exception:
+                get_summer_logger().error("Handling the result of a process job led to an error", exc_info=True)
+        future.add_done_callback(done)
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -1,41 +1,231 @@
 
 from abc import abstractmethod
+from concurrent.futures import Future, InvalidStateError
 import datetime
-from typing import Any, Callable, Union
+import math
+import threading
+import time
+from typing import Any, Callable, ContextManager, Optional, Tuple, Union
+
+from summer.autowire.exceptions import ValidationError
+from summer.scheduler.cron import CronExpression
+from summer.util import time_util
+
+_RESULT_LOCK = threading.Lock()
+
+
+class Overlap:
+    """what happens when a task becomes due while its previous run is still queued or running"""
+    ALLOW = "allow"
+    SKIP = "skip"
+    QUEUE = "queue"
+    COALESCE = "coalesce"
+
+    ALL = (ALLOW, SKIP, QUEUE, COALESCE)
+
+
+class TaskExecutor:
+    """where a task runs, process tasks run in a worker process and must be importable there"""
+    THREAD = "thread"
+    PROCESS = "process"
+
+    ALL = (THREAD, PROCESS)
+
+
+class Misfire:
+    """what a fixed rate task does when it fires so late that further runs have been missed"""
+    FIRE_ONCE = "fire_once"
+    FIRE_ALL = "fire_all"
+    SKIP = "skip"
+
+    ALL = (FIRE_ONCE, FIRE_ALL, SKIP)
 
 
 class ScheduledTask:
+    # set by cancel_task, a cancelled task is neither run nor scheduled again
+    cancelled = False
+    overlap = Overlap.ALLOW
+    # tasks of coroutine functions are run by run_async on the event loop of the scheduler
+    is_async = False
+    # process tasks run the function referenced by process_target in a worker process instead of run,
+    # module, qualified name and the lease name for cluster singletons
+    executor = TaskExecutor.THREAD
+    process_target: Optional[Tuple[str, str, Optional[str]]] = None
+    # the time.monotonic() value the task is pending for, set by the scheduler thread
+    due: Optional[float] = None
+    # the time.monotonic() value the task has been scheduled for last, None once it fired or has been cancelled
+    next_due: Optional[float] = None
+    # metrics are collected per name, the qualified name of the scheduled function
+    name = "<task>"
+    _result: Optional[Future] = None
+
+    def on_fire(self, now: float) -> bool:
+        """called by the scheduler thread when the task is due, before it is handed to a worker. returns False to skip the run"""
+        return True
+
+    def on_finished(self):
+        """called after every run, also if it failed"""
+        pass
+
     @abstractmethod
     def run(self):
         pass
 
+    @abstractmethod
+    async def run_async(self):
+        pass
+
+    def get_result_future(self) -> Future:
+        """the future of the last finished run, of the next run if none has finished yet"""
+        with _RESULT_LOCK:
+            if self._result is None:
+                self._result = Future()
+            return self._result
+
+    def record_outcome(self, result: Any = None, error: Optional[BaseException] = None):
+        """called with the result or the error of every finished run"""
+        with _RESULT_LOCK:
+            future = self._result
+            if future is None or future.done():
+                future = self._result = Future()
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            # cancelled by a caller, or completed by an overlapping run
+            pass
+
+    def cancel_result(self):
+        """cancels the future of the next run, so callers waiting for it do not wait forever"""
+        self.get_result_future().cancel()
+
+
+class ScheduledTaskInterceptor:
+    """
+    beans implementing this interface are entered around every execution of a scheduled task,
+    for coroutines on the thread of the event loop, which all of them share
+    """
+
+    @abstractmethod
+    def around_task(self) -> ContextManager[Any]:
+        pass
+
+
+class ClusterCoordinator:
+    """decides which node of a cluster runs a cluster singleton task, a bean implementing it is used by the scheduler"""
+
+    @abstractmethod
+    def try_acquire(self, name: str) -> bool:
+        """returns whether this node may run the task with the given lease name now"""
+        pass
+
 
 class ISchedulerPlaceholder:
+    misfire_policy = Misfire.FIRE_ONCE
 
     @abstractmethod
-    def schedule_task_at(self, task: ScheduledTask, at: Union[datetime.datetime, float] ):
+    def schedule_task_at(self, task: ScheduledTask, at: Union[datetime.datetime, float] ) -> ScheduledTask:
         pass
 
+    @abstractmethod
+    def schedule_task_due(self, task: ScheduledTask, due: float) -> ScheduledTask:
+        """schedules the task at a time.monotonic() value"""
+        pass
+
+    @abstractmethod
+    def cancel_task(self, task: ScheduledTask):
+        pass
+
+
+class ScheduledTaskHandle:
+    """
+    Returned by the schedule methods of the scheduler, cancels and reschedules its task.
+    A cancelled task is removed from the pending tasks, it can not be rescheduled.
+    Rescheduling a one time task which has already run runs it again, repeated tasks continue from the new time.
+    """
+
+    def __init__(self, scheduler: ISchedulerPlaceholder, task: ScheduledTask) -> None:
+        self.scheduler = scheduler
+        self.task = task
+
+    @property
+    def cancelled(self) -> bool:
+        return self.task.cancelled
+
+    def cancel(self) -> bool:
+        """returns False if the task has already been cancelled, a run which has already started is not interrupted"""
+        if self.task.cancelled:
+            return False
+        self.scheduler.cancel_task(self.task)
+        return True
+
+    def reschedule_in(self, delay: Union[datetime.timedelta, float, int]) -> bool:
+        if self.task.cancelled:
+            return False
+        self.scheduler.schedule_task_due(self.task, time.monotonic() + time_util.coerce_duration(delay).total_seconds())
+        return True
+
+    def reschedule_at(self, at: Union[datetime.datetime, float]) -> bool:
+        if self.task.cancelled:
+            return False
+        self.scheduler.schedule_task_at(self.task, at)
+        return True
+
+    def get_next_fire_time(self) -> Optional[datetime.datetime]:
+        """local time of the next run, None while the task is not pending"""
+        next_due = self.task.next_due
+        if next_due is None:
+            return None
+        return datetime.datetime.now() + datetime.timedelta(seconds=next_due - time.monotonic())
+
+    def get_result_future(self) -> Future:
+        """completes with the result of the last finished run, it is cancelled if the task is cancelled before"""
+        return self.task.get_result_future()
+
 
 class OneTimeScheduledTask(ScheduledTask):
     def __init__(self, callable: Callable[[], Any]) -> None:
         self.callable = callable
 
     def run(self):
-        self.callable()
+        return self.callable()
+
+    async def run_async(self):
+        return await self.callable()
 
 
 class StartRegularilyTask(ScheduledTask):
-    def __init__(self, scheduler: ISchedulerPlaceholder, callable: Callable[[], Any], start_every: datetime.timedelta) -> None:
+    def __init__(self, scheduler: ISchedulerPlaceholder, callable: Callable[[], Any], start_every: datetime.timedelta,
+                 misfire: Optional[str] = None) -> None:
         super().__init__()
+        if misfire is not None and misfire not in Misfire.ALL:
+            raise ValidationError(f"misfire must be one of \"{str(Misfire.ALL)}\", not \"{misfire}\"")
         self.callable = callable
         self.start_every = start_every
         self.scheduler = scheduler
+        # None uses the misfire policy configured for the scheduler, it is resolved when the task fires first
+        self.misfire = misfire
+        self._period = start_every.total_seconds()
+
+    def on_fire(self, now: float) -> bool:
+        # runs are due at multiples of the period after the first run, so latency does not accumulate
+        due = self.due if self.due is not None else now
+        missed = math.floor((now - due) / self._period) if self._period > 0 else 0
+        if self.misfire is None:
+            self.misfire = self.scheduler.misfire_policy
+        if self.misfire == Misfire.FIRE_ALL or missed <= 0:
+            self.scheduler.schedule_task_due(self, due + self._period)
+            return True
+        self.scheduler.schedule_task_due(self, due + (missed + 1) * self._period)
+        return self.misfire == Misfire.FIRE_ONCE
 
     def run(self):
-        next_run = datetime.datetime.now() + self.start_every
-        self.scheduler.schedule_task_at(self, next_run)
-        self.callable()
+        return self.callable()
+
+    async def run_async(self):
+        return await self.callable()
 
 
 class RepeatAfterTimeTask(ScheduledTask):
@@ -47,7 +237,44 @@ class RepeatAfterTimeTask(ScheduledTask):
 
     def run(self):
         try:
-            self.callable()
+            return self.callable()
+        finally:
+            self.on_finished()
+
+    async def run_async(self):
+        try:
+            return await self.callable()
         finally:
-            next_run = datetime.datetime.now() + self.repeat_after
-            self.scheduler.schedule_task_at(self, next_run)
+            self.on_finished()
+
+    def on_finished(self):
+        self.scheduler.schedule_task_due(self, time.monotonic() + self.repeat_after.total_seconds())
+
+
+class CronTask(ScheduledTask):
+    def __init__(self, scheduler: ISchedulerPlaceholder, callable: Callable[[], Any], cron: CronExpression) -> None:
+        super().__init__()
+        self.callable = callable
+        self.cron = cron
+        self.scheduler = scheduler
+        self.next_fire: Optional[datetime.datetime] = None
+
+    def schedule_next(self, after: datetime.datetime) -> bool:
+        """schedules the first fire time after the given time, returns False if the expression never fires again"""
+        self.next_fire = self.cron.next_after(after)
+        if self.next_fire is None:
+            return False
+        wait = (self.next_fire - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        self.scheduler.schedule_task_due(self, time.monotonic() + wait)
+        return True
+
+    def on_fire(self, now: float) -> bool:
+        # a late run fires once, fire times which passed meanwhile are skipped
+        self.schedule_next(max(self.next_fire, datetime.datetime.now(datetime.timezone.utc)))
+        return True
+
+    def run(self):
+        return self.callable()
+
+    async def run_async(self):
+        return await self.callable()
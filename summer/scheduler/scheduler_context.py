@@ -1,14 +1,27 @@
 from __future__ import annotations
+import asyncio
+import contextlib
+import inspect
 import datetime
-import queue
-from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 from uuid import uuid4
 
 from summer.application.context_extension import ContextExtension, ContextExtensionRunThread
 from summer.autowire.context import SummerBeanContext
 from summer.autowire.exceptions import ValidationError
-from summer.scheduler.scheduled_task import ISchedulerPlaceholder, OneTimeScheduledTask, RepeatAfterTimeTask, ScheduledTask, StartRegularilyTask
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.scheduler.cron import CronExpression
+from summer.scheduler.scheduled_task import ClusterCoordinator, CronTask, ISchedulerPlaceholder, Misfire, OneTimeScheduledTask, Overlap, RepeatAfterTimeTask, ScheduledTask, ScheduledTaskHandle, ScheduledTaskInterceptor, StartRegularilyTask, TaskExecutor
+from summer.scheduler.async_runner import AsyncTaskRunner
+from summer.scheduler.executor import BoundedExecutor
+from summer.scheduler.process_runner import DEFAULT_CONTEXT, ProcessTaskRunner
+from summer.scheduler.scheduler_metrics import SchedulerMetrics
 from summer.scheduler.scheduler_run_thread import SchedulerRunThread
+from summer.scheduler.scheduling_inbox import SchedulingInbox
+from summer.scheduler.task_queue import TaskHeap
+from summer.scheduler.timing_wheel import TimingWheel
 from summer.util import inspection_util, time_util
 
 
@@ -17,20 +30,78 @@ _ATTR_SCHEDULER_REFERENCE = "__scheduler_reference__"
 
 
 class SummerSchedulerContextExtension(ContextExtension, ISchedulerPlaceholder):
+    HEAP = "heap"
+    TIMING_WHEEL = "timing_wheel"
+
+    backend = ConfigurationValue(
+        config_keys.SCHEDULER_BACKEND, str, default=HEAP).typed()
+    tick = ConfigurationValue(
+        config_keys.SCHEDULER_TICK, float, default=0.01).typed()
+    workers = ConfigurationValue(
+        config_keys.SCHEDULER_WORKERS, int, default=0).typed()
+    queue_size = ConfigurationValue(
+        config_keys.SCHEDULER_QUEUE_SIZE, int, default=10000).typed()
+    overflow_policy = ConfigurationValue(
+        config_keys.SCHEDULER_OVERFLOW_POLICY, str, default=BoundedExecutor.BLOCK).typed()
+    async_max_concurrency = ConfigurationValue(
+        config_keys.SCHEDULER_ASYNC_MAX_CONCURRENCY, int, default=1000).typed()
+    misfire_policy = ConfigurationValue(
+        config_keys.SCHEDULER_MISFIRE_POLICY, str, default=Misfire.FIRE_ONCE).typed()
+    process_workers = ConfigurationValue(
+        config_keys.SCHEDULER_PROCESS_WORKERS, int, default=0).typed()
+    process_context = ConfigurationValue(
+        config_keys.SCHEDULER_PROCESS_CONTEXT, str, default=DEFAULT_CONTEXT).typed()
+
     def __init__(self, bean_context: SummerBeanContext) -> None:
         self.bean_context = bean_context
         self.prepared_schedules: List[Tuple[Dict[str, Any], Callable]] = []
-        self._scheduler_queue = queue.Queue()
+        self._scheduler_inbox = SchedulingInbox()
         self._run_thread: Optional[SchedulerRunThread] = None
         self._background_job_running = True
         self._schedule_self_references = {}
+        self._task_interceptors: List[ScheduledTaskInterceptor] = []
+        # process jobs are registered while scheduling, the pool is configured when the scheduler starts
+        self._process_runner = ProcessTaskRunner()
+        self._metrics: Optional[SchedulerMetrics] = None
+        self._cluster_coordinator: Optional[ClusterCoordinator] = None
+        self._cluster_singletons: List[str] = []
+        self._beans_processed = False
+
+    def get_beans(self) -> Iterable[Any]:
+        return [SchedulerMetrics]
 
     def get_background_job(self) -> ContextExtensionRunThread:
+        # checked when the scheduler starts, worker processes import the same tasks without running them
+        if self._cluster_coordinator is None and len(self._cluster_singletons) > 0:
+            raise ValidationError(
+                f"cluster singleton tasks {self._cluster_singletons} need a ClusterCoordinator bean, e.g. by enabling the database")
+        if self.misfire_policy not in Misfire.ALL:
+            raise ValidationError(
+                f"{config_keys.SCHEDULER_MISFIRE_POLICY} must be one of \"{str(Misfire.ALL)}\", not \"{self.misfire_policy}\"")
         if self._run_thread is None:
-            self._run_thread = SchedulerRunThread(self._scheduler_queue)
+            executor = BoundedExecutor(self.workers, self.queue_size, self.overflow_policy, name="summer-scheduler")
+            async_runner = AsyncTaskRunner(self.async_max_concurrency, self.queue_size, self.overflow_policy)
+            self._process_runner.max_workers = self.process_workers if self.process_workers else None
+            self._process_runner.context_locator = self.process_context
+            self._process_runner.configuration_files = self.bean_context.get_configuration_files()
+            self._process_runner.cluster_coordinator = self._cluster_coordinator
+            metrics = self._metrics.get_recorder() if self._metrics is not None else None
+            self._run_thread = SchedulerRunThread(self._scheduler_inbox, self._create_task_queue(), executor,
+                                                  async_runner, self._process_runner, metrics)
         return self._run_thread
 
+    def _create_task_queue(self) -> Union[TaskHeap, TimingWheel]:
+        if self.backend == self.HEAP:
+            return TaskHeap()
+        if self.backend == self.TIMING_WHEEL:
+            return TimingWheel(tick=self.tick)
+        raise ValidationError(f"Unknown scheduler backend \"{self.backend}\"")
+
     def process_beans(self, beans: Dict[str, Any]):
+        self._task_interceptors = [bean for bean in beans.values() if isinstance(bean, ScheduledTaskInterceptor)]
+        self._metrics = next((bean for bean in beans.values() if isinstance(bean, SchedulerMetrics)), None)
+        self._cluster_coordinator = next((bean for bean in beans.values() if isinstance(bean, ClusterCoordinator)), None)
+        self._beans_processed = True
         for bean in beans.values():
             for method in inspection_util.get_methods(bean):
                 scheduler_reference = getattr(
@@ -38,14 +109,14 @@ class SummerSchedulerContextExtension(ContextExtension, ISchedulerPlaceholder):
                 if scheduler_reference is not None:
                     self._schedule_self_references[scheduler_reference] = bean
 
-    def schedule_at(self, function: Callable[..., Any], schedule_at:  Union[datetime.datetime, float, int]):
+    def schedule_at(self, function: Callable[..., Any], schedule_at:  Union[datetime.datetime, float, int]) -> ScheduledTaskHandle:
         return self.schedule(function, once_at_time=schedule_at)
 
-    def schedule_in(self, function: Callable[..., Any], schedule_in: Union[datetime.timedelta, float, int]):
+    def schedule_in(self, function: Callable[..., Any], schedule_in: Union[datetime.timedelta, float, int]) -> ScheduledTaskHandle:
         return self.schedule(function, once_in=schedule_in)
 
-    def schedule_repeated(self, function: Callable[..., Any], repeat_after: Optional[Union[datetime.timedelta, float, int]] = None, reschedule_after_completion=False, first_in: Optional[Union[datetime.timedelta, float, int]] = None):
-        kwargs = {'first_in': first_in}
+    def schedule_repeated(self, function: Callable[..., Any], repeat_after: Optional[Union[datetime.timedelta, float, int]] = None, reschedule_after_completion=False, first_in: Optional[Union[datetime.timedelta, float, int]] = None, overlap: str = Overlap.ALLOW, executor: str = TaskExecutor.THREAD, misfire: Optional[str] = None, cluster_singleton: Union[bool, str] = False) -> ScheduledTaskHandle:
+        kwargs = {'first_in': first_in, 'overlap': overlap, 'executor': executor, 'misfire': misfire, 'cluster_singleton': cluster_singleton}
         if reschedule_after_completion:
             kwargs['repeat_after'] = repeat_after
         else:
@@ -53,27 +124,39 @@ class SummerSchedulerContextExtension(ContextExtension, ISchedulerPlaceholder):
 
         return self.schedule(function, **kwargs)
 
-    def schedule(self, function: Callable[..., Any], **kwargs):
-        """_summary_
-
-        Args:
-        """
+    def schedule(self, function: Callable[..., Any], **kwargs) -> ScheduledTaskHandle:
+        """schedules the function with exactly one of the patterns, returns the handle to cancel or reschedule it"""
         patterns = ['once_at_time', 'once_at_datetime',
-                    "once_in", 'repeat_every', 'repeat_after']
+                    "once_in", 'repeat_every', 'repeat_after', 'cron']
         if sum([1 for x in patterns if kwargs.get(x) is not None]) != 1:
             raise ValidationError(
                 f"exactly one argument of \"{str(patterns)}\" must be present")
+        if kwargs.get('overlap', Overlap.ALLOW) not in Overlap.ALL:
+            raise ValidationError(
+                f"overlap must be one of \"{str(Overlap.ALL)}\"")
+        if kwargs.get('misfire') is not None and kwargs['misfire'] not in Misfire.ALL:
+            raise ValidationError(
+                f"misfire must be one of \"{str(Misfire.ALL)}\"")
+        if kwargs.get('executor', TaskExecutor.THREAD) not in TaskExecutor.ALL:
+            raise ValidationError(
+                f"executor must be one of \"{str(TaskExecutor.ALL)}\"")
 
         if 'once_at_time' in kwargs or 'once_at_datetime' in kwargs:
-            return self._schedule_once_at(function, **kwargs)
-        if 'once_in' in kwargs:
-            return self._schedule_once_in(function, **kwargs)
-        if 'repeat_every' in kwargs:
-            return self._schedule_repeat_every(function, **kwargs)
-        if 'repeat_after' in kwargs:
-            return self._schedule_repeat_after(function, **kwargs)
+            task = self._schedule_once_at(function, **kwargs)
+        elif 'once_in' in kwargs:
+            task = self._schedule_once_in(function, **kwargs)
+        elif 'repeat_every' in kwargs:
+            task = self._schedule_repeat_every(function, **kwargs)
+        elif 'repeat_after' in kwargs:
+            task = self._schedule_repeat_after(function, **kwargs)
+        else:
+            task = self._schedule_cron(function, **kwargs)
+        return ScheduledTaskHandle(self, task)
 
     def _autowired_callable(self, function: Callable[..., Any]) -> Callable[[], None]:
+        if inspect.iscoroutinefunction(function):
+            return self._autowired_coroutine(function)
+
         def inner():
             reference = getattr(function, _ATTR_SCHEDULER_REFERENCE, None)
             args = []
@@ -82,9 +165,58 @@ class SummerSchedulerContextExtension(ContextExtension, ISchedulerPlaceholder):
                     reference)
                 if referenced_value is not None:
                     args.append(referenced_value)
-            return self.bean_context.autowire_and_run(function, *args)
+            with contextlib.ExitStack() as stack:
+                for interceptor in self._task_interceptors:
+                    stack.enter_context(interceptor.around_task())
+                return self.bean_context.autowire_and_run(function, *args)
+        return inner
+
+    def _autowired_coroutine(self, function: Callable[..., Any]) -> Callable[[], Awaitable[None]]:
+        async def inner():
+            reference = getattr(function, _ATTR_SCHEDULER_REFERENCE, None)
+            args = []
+            if reference is not None:
+                referenced_value = self._schedule_self_references.get(
+                    reference)
+                if referenced_value is not None:
+                    args.append(referenced_value)
+            with contextlib.ExitStack() as stack:
+                for interceptor in self._task_interceptors:
+                    stack.enter_context(interceptor.around_task())
+                return await self.bean_context.autowire_and_run(function, *args)
         return inner
 
+    def _cluster_singleton(self, lease_name: str, callable: Callable[[], Any], is_async: bool) -> Callable[[], Any]:
+        # only the run is skipped on other nodes, repeated tasks are scheduled again everywhere
+        if is_async:
+            async def inner_async():
+                if await asyncio.to_thread(self._cluster_coordinator.try_acquire, lease_name):
+                    return await callable()
+            return inner_async
+
+        def inner():
+            if self._cluster_coordinator.try_acquire(lease_name):
+                return callable()
+        return inner
+
+    def _configure_task(self, task: ScheduledTask, function: Callable[..., Any], **kwargs):
+        task.name = f"{getattr(function, '__module__', None)}.{getattr(function, '__qualname__', repr(function))}"
+        task.overlap = kwargs.get('overlap', Overlap.ALLOW)
+        task.is_async = inspect.iscoroutinefunction(function)
+        task.executor = kwargs.get('executor', TaskExecutor.THREAD)
+        cluster_singleton = kwargs.get('cluster_singleton')
+        lease_name = None
+        if cluster_singleton:
+            # True uses the name of the task, which is the same on every node
+            lease_name = cluster_singleton if isinstance(cluster_singleton, str) else task.name
+            if self._beans_processed and self._cluster_coordinator is None:
+                raise ValidationError(
+                    f"cluster singleton task {lease_name} needs a ClusterCoordinator bean, e.g. by enabling the database")
+            self._cluster_singletons.append(lease_name)
+            task.callable = self._cluster_singleton(lease_name, task.callable, task.is_async)
+        if task.executor == TaskExecutor.PROCESS:
+            task.process_target = (*self._process_runner.register(function), lease_name)
+
     def _schedule_once_at(self,  function: Callable[...], **kwargs):
         if 'once_at_time' in kwargs:
             at = time_util.coerce_time(kwargs['once_at_time'])
@@ -95,42 +227,72 @@ class SummerSchedulerContextExtension(ContextExtension, ISchedulerPlaceholder):
             at = time_util.coerce_datetime(kwargs['once_at_datetime'])
         autowired_callable = self._autowired_callable(function)
         task = OneTimeScheduledTask(autowired_callable)
-        self.schedule_task_at(task, at)
+        self._configure_task(task, function, **kwargs)
+        return self.schedule_task_at(task, at)
 
     def _schedule_once_in(self,  function: Callable[...], **kwargs):
         once_in = kwargs['once_in']
         once_in = time_util.coerce_duration(once_in)
-        at = datetime.datetime.now() + once_in
+        due = time.monotonic() + once_in.total_seconds()
         autowired_callable = self._autowired_callable(function)
         task = OneTimeScheduledTask(autowired_callable)
-        self.schedule_task_at(task, at)
+        self._configure_task(task, function, **kwargs)
+        return self.schedule_task_due(task, due)
 
     def _schedule_repeat_every(self,  function: Callable[...], **kwargs):
         repeat_every = kwargs['repeat_every']
         repeat_every = time_util.coerce_duration(repeat_every)
         first_in = time_util.coerce_duration(kwargs.get('first_in'))
-        at = datetime.datetime.now() + first_in
+        due = time.monotonic() + first_in.total_seconds()
 
         autowired_callable = self._autowired_callable(function)
-        task = StartRegularilyTask(self, autowired_callable, repeat_every)
-        self.schedule_task_at(task, at)
+        # the configured policy is read when the task fires, configuration is not resolved while decorating
+        task = StartRegularilyTask(self, autowired_callable, repeat_every, kwargs.get('misfire'))
+        self._configure_task(task, function, **kwargs)
+        return self.schedule_task_due(task, due)
 
     def _schedule_repeat_after(self,  function: Callable[...], **kwargs):
         repeat_after = kwargs['repeat_after']
         repeat_after = time_util.coerce_duration(repeat_after)
         first_in = time_util.coerce_duration(kwargs.get('first_in'))
-        at = datetime.datetime.now() + first_in
+        due = time.monotonic() + first_in.total_seconds()
 
         autowired_callable = self._autowired_callable(function)
         task = RepeatAfterTimeTask(self, autowired_callable, repeat_after)
-        self.schedule_task_at(task, at)
+        self._configure_task(task, function, **kwargs)
+        return self.schedule_task_due(task, due)
 
-    def schedule_task_at(self, task: ScheduledTask, at: Union[datetime.datetime, float]):
+    def _schedule_cron(self,  function: Callable[...], **kwargs):
+        cron = CronExpression(kwargs['cron'], kwargs.get('timezone'))
+        autowired_callable = self._autowired_callable(function)
+        task = CronTask(self, autowired_callable, cron)
+        self._configure_task(task, function, **kwargs)
+        if not task.schedule_next(datetime.datetime.now(datetime.timezone.utc)):
+            raise ValidationError(f"cron expression \"{cron.expression}\" never fires")
+        return task
+
+    def schedule_task_at(self, task: ScheduledTask, at: Union[datetime.datetime, float]) -> ScheduledTask:
+        """the wall clock time is converted once, later changes of the system clock do not move the task"""
         if isinstance(at, float):
             at_timestamp = datetime.datetime.fromtimestamp(at)
         else:
-            at_timestamp = at
-        self._scheduler_queue.put((task, at_timestamp), block=True)
+            at_timestamp = time_util.coerce_datetime(at)
+        return self.schedule_task_due(task, time.monotonic() + (at_timestamp - datetime.datetime.now()).total_seconds())
+
+    def schedule_task_due(self, task: ScheduledTask, due: float) -> ScheduledTask:
+        # repeated tasks which are running while they are cancelled reschedule themselves when they finish
+        if task.cancelled:
+            return task
+        task.next_due = due
+        self._scheduler_inbox.put(task, due)
+        return task
+
+    def cancel_task(self, task: ScheduledTask):
+        """removes the task of a handle returned by one of the schedule methods, repeated tasks are not scheduled again"""
+        task.cancelled = True
+        task.next_due = None
+        task.cancel_result()
+        self._scheduler_inbox.put(task, None)
 
     def scheduled(self, **kwargs) -> Callable[[T], T]:
         def inner(fn: T) -> T:
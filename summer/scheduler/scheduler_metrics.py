@@ -0,0 +1,161 @@
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.util.histogram import OTHER, Histogram, HistogramRecorder, get_bounded
+
+# upper bounds of the lag and duration histograms in seconds
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+OTHER_TASKS = OTHER
+
+
+@dataclass
+class TaskMetrics:
+    task: str
+    successes: int
+    failures: int
+    # runs not started because of the overlap or misfire policy
+    skipped: int
+    # runs dropped because the scheduler queue was full
+    discarded: int
+    # time between the due time and the start of a run
+    lag: Histogram
+    duration: Histogram
+
+
+class _Task:
+    __slots__ = ('successes', 'failures', 'skipped', 'discarded', 'lag', 'duration')
+
+    def __init__(self) -> None:
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.discarded = 0
+        self.lag = HistogramRecorder(HISTOGRAM_BUCKETS)
+        self.duration = HistogramRecorder(HISTOGRAM_BUCKETS)
+
+
+class SchedulerMetricsRecorder:
+    """
+    Collects the metrics of the scheduler run thread per task name. The gauges of the queues are read
+    from the run thread when the metrics are requested, the run thread installs the source.
+    """
+
+    def __init__(self, max_tasks: int = 1000) -> None:
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, _Task] = {}
+        self.gauge_source: Optional[Callable[[], Dict[str, float]]] = None
+
+    def _get(self, name: str) -> _Task:
+        return get_bounded(self._tasks, name, self.max_tasks, _Task)
+
+    def record_lag(self, name: str, seconds: float):
+        with self._lock:
+            self._get(name).lag.add(max(seconds, 0.0))
+
+    def record_run(self, name: str, seconds: float, failed: bool):
+        with self._lock:
+            task = self._get(name)
+            task.duration.add(seconds)
+            if failed:
+                task.failures += 1
+            else:
+                task.successes += 1
+
+    def record_skip(self, name: str):
+        with self._lock:
+            self._get(name).skipped += 1
+
+    def record_discard(self, name: str):
+        with self._lock:
+            self._get(name).discarded += 1
+
+    def get_task_metrics(self) -> List[TaskMetrics]:
+        with self._lock:
+            return [TaskMetrics(name, t.successes, t.failures, t.skipped, t.discarded, t.lag.snapshot(), t.duration.snapshot())
+                    for name, t in self._tasks.items()]
+
+    def get_gauges(self) -> Dict[str, float]:
+        source = self.gauge_source
+        return source() if source is not None else {}
+
+    def reset(self):
+        with self._lock:
+            self._tasks.clear()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_histogram(lines: List[str], metric: str, task: str, histogram: Histogram):
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.bounds, histogram.buckets):
+        cumulative += bucket_count
+        lines.append(f"{metric}_bucket{{task=\"{_label(task)}\",le=\"{bound}\"}} {cumulative}")
+    lines.append(f"{metric}_bucket{{task=\"{_label(task)}\",le=\"+Inf\"}} {histogram.count}")
+    lines.append(f"{metric}_sum{{task=\"{_label(task)}\"}} {histogram.total_seconds}")
+    lines.append(f"{metric}_count{{task=\"{_label(task)}\"}} {histogram.count}")
+
+
+def format_metrics(tasks: List[TaskMetrics], gauges: Dict[str, float], prefix: str = "summer_scheduler") -> str:
+    """formats the metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for name, value in gauges.items():
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {value}")
+    for metric, help_text, attribute in (("task_lag_seconds", "Time between the due time and the start of a run", "lag"),
+                                         ("task_duration_seconds", "Duration of the runs", "duration")):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} histogram")
+        for task in tasks:
+            _format_histogram(lines, f"{prefix}_{metric}", task.task, getattr(task, attribute))
+    lines.append(f"# HELP {prefix}_task_runs_total Finished runs by outcome")
+    lines.append(f"# TYPE {prefix}_task_runs_total counter")
+    for task in tasks:
+        lines.append(f"{prefix}_task_runs_total{{task=\"{_label(task.task)}\",outcome=\"success\"}} {task.successes}")
+        lines.append(f"{prefix}_task_runs_total{{task=\"{_label(task.task)}\",outcome=\"failure\"}} {task.failures}")
+    for metric, attribute in (("task_skipped_total", "skipped"), ("task_discarded_total", "discarded")):
+        lines.append(f"# TYPE {prefix}_{metric} counter")
+        for task in tasks:
+            lines.append(f"{prefix}_{metric}{{task=\"{_label(task.task)}\"}} {getattr(task, attribute)}")
+    return "\n".join(lines) + "\n"
+
+
+class SchedulerMetrics(BeanStereotype):
+    """
+    Dispatch lag, run duration histograms and outcomes per scheduled task, plus the sizes of the scheduler queues.
+    get_text returns all of them in the Prometheus text exposition format.
+    """
+
+    enabled = ConfigurationValue(
+        config_keys.SCHEDULER_METRICS_ENABLED, bool, default=True).typed()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._recorder: Optional[SchedulerMetricsRecorder] = None
+
+    def get_recorder(self) -> Optional[SchedulerMetricsRecorder]:
+        """called by the scheduler when it starts, configuration is not resolved before"""
+        if self._recorder is None and self.enabled:
+            self._recorder = SchedulerMetricsRecorder()
+        return self._recorder
+
+    def get_task_metrics(self) -> List[TaskMetrics]:
+        return self._recorder.get_task_metrics() if self._recorder is not None else []
+
+    def get_gauges(self) -> Dict[str, float]:
+        """pending tasks and the backlog of the executors"""
+        return self._recorder.get_gauges() if self._recorder is not None else {}
+
+    def get_text(self) -> str:
+        return format_metrics(self.get_task_metrics(), self.get_gauges())
+
+    def reset(self):
+        if self._recorder is not None:
+            self._recorder.reset()
@@ -1,78 +1,215 @@
 
-from concurrent.futures import ThreadPoolExecutor
-from queue import Empty, Queue
-from typing import Any, Optional, Tuple, List
-import datetime
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
 from summer.application.context_extension import ContextExtensionRunThread
 
-from summer.scheduler.scheduler_context import ScheduledTask
+from summer.scheduler.async_runner import AsyncTaskRunner
+from summer.scheduler.executor import BoundedExecutor
+from summer.scheduler.process_runner import ProcessTaskRunner
+from summer.scheduler.scheduled_task import Overlap, ScheduledTask, TaskExecutor
+from summer.scheduler.scheduler_metrics import SchedulerMetricsRecorder
+from summer.scheduler.scheduling_inbox import Scheduling, SchedulingInbox
+from summer.scheduler.task_queue import TaskHeap
+from summer.scheduler.timing_wheel import TimingWheel
 from summer.summer_logging import get_summer_logger
-from summer.util import time_util
 
 
 class SchedulerRunThread(ContextExtensionRunThread):
-    def __init__(self, queue: Queue) -> None:
-        self.queue = queue
-        self.scheduled_actions: List[Tuple[datetime.datetime, ScheduledTask]] = []
+    def __init__(self, inbox: SchedulingInbox, scheduled_actions: Optional[Union[TaskHeap, TimingWheel]] = None,
+                 executor: Optional[BoundedExecutor] = None, async_runner: Optional[AsyncTaskRunner] = None,
+                 process_runner: Optional[ProcessTaskRunner] = None, metrics: Optional[SchedulerMetricsRecorder] = None) -> None:
+        self.inbox = inbox
+        self.scheduled_actions = scheduled_actions if scheduled_actions is not None else TaskHeap()
+        self.executor = executor if executor is not None else BoundedExecutor(name="summer-scheduler")
+        self.async_runner = async_runner if async_runner is not None else AsyncTaskRunner()
+        self.process_runner = process_runner if process_runner is not None else ProcessTaskRunner()
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.gauge_source = self._get_gauges
         self._background_job_running = False
+        # tasks with overlap control which are queued or running, with the number of runs waiting for them
+        self._in_flight: Dict[ScheduledTask, int] = {}
+        self._in_flight_lock = threading.Lock()
 
-    def _next_execution_wait_time(self) -> datetime.timedelta:
-        self.scheduled_actions = sorted(self.scheduled_actions, key=lambda x: x[0])
+    def _handle_new_schedulings(self, schedulings: List[Scheduling]):
+        for task, due in schedulings:
+            if due is None or task.cancelled:
+                self.scheduled_actions.remove(task)
+            else:
+                task.due = due
+                self.scheduled_actions.push(task, due)
 
-        next_scheduled = self.scheduled_actions[0] if len(self.scheduled_actions) > 0 else None
-        return (next_scheduled[0] - datetime.datetime.now()) if next_scheduled is not None else datetime.timedelta(hours=1)
+    def _next_task(self) -> Optional[ScheduledTask]:
+        return self.scheduled_actions.pop_due(time.monotonic())
+    
+    def _get_gauges(self) -> Dict[str, float]:
+        return {
+            "pending_tasks": len(self.scheduled_actions),
+            "incoming_schedulings": len(self.inbox),
+            "executor_queued": self.executor.queued,
+            "executor_active": self.executor.active,
+            "async_queued": self.async_runner.queued,
+            "async_active": self.async_runner.active,
+        }
 
-    def _get_from_queue(self, wait_for: float) -> Tuple[ScheduledTask, datetime.datetime]:
-        return self.queue.get(timeout=wait_for)
+    def _dispatch(self, task: ScheduledTask):
+        if task.cancelled:
+            return
+        # on_fire might reschedule the task, which replaces its due time
+        due = task.due
+        if task.next_due == due:
+            task.next_due = None
+        try:
+            if not task.on_fire(time.monotonic()):
+                get_summer_logger().debug("Skipping scheduled task, it has missed its time")
+                if self.metrics is not None:
+                    self.metrics.record_skip(task.name)
+                return
+        except:
+            get_summer_logger().error("Firing scheduled task led to an error", exc_info=True)
 
-    def _wait_and_handle_new_schedulings(self):
-        while self._background_job_running:
-            try:
-                wait_for = self._next_execution_wait_time().total_seconds()
-                if wait_for <= 0:
+        if task.overlap != Overlap.ALLOW:
+            with self._in_flight_lock:
+                waiting = self._in_flight.get(task)
+                if waiting is not None:
+                    if task.overlap == Overlap.QUEUE:
+                        self._in_flight[task] = waiting + 1
+                    elif task.overlap == Overlap.COALESCE:
+                        self._in_flight[task] = 1
+                    else:
+                        get_summer_logger().debug("Skipping scheduled task, its previous run has not finished")
+                        if self.metrics is not None:
+                            self.metrics.record_skip(task.name)
                     return
-                task, at_timestamp = self._get_from_queue(wait_for)
-                if task is not None:
-                    at_timestamp_no_tz = time_util.coerce_datetime(at_timestamp)
-                    self.scheduled_actions.append((at_timestamp_no_tz, task))
+                self._in_flight[task] = 0
+        if task.executor == TaskExecutor.PROCESS:
+            self._submit_to_process(task, due)
+        elif task.is_async:
+            self.async_runner.submit(lambda: self._run_task_async(task, due), on_discard=lambda: self._discarded(task))
+        else:
+            self.executor.submit(lambda: self._run_task(task, due), on_discard=lambda: self._discarded(task))
 
-            except Empty:
-                pass
+    def _discarded(self, task: ScheduledTask):
+        if self._background_job_running:
+            get_summer_logger().warning("Scheduled task has been discarded, the scheduler queue is full")
+            if self.metrics is not None:
+                self.metrics.record_discard(task.name)
+        with self._in_flight_lock:
+            self._in_flight.pop(task, None)
 
-    def _next_task(self) -> Optional[ScheduledTask]:
-        if len(self.scheduled_actions) == 0:
-            return None
-        
-        at, task = self.scheduled_actions[0]
-        if at <= datetime.datetime.now():
-            self.scheduled_actions = self.scheduled_actions[1:]
-            return task
-
-        return None
-    
-    def _run_task(self, task: ScheduledTask):
+    def _record_start(self, task: ScheduledTask, due: Optional[float]) -> float:
+        start = time.monotonic()
+        # runs queued behind a previous run are not late because of the scheduler
+        if self.metrics is not None and due is not None:
+            self.metrics.record_lag(task.name, start - due)
+        return start
+
+    def _record_end(self, task: ScheduledTask, start: float, failed: bool):
+        if self.metrics is not None:
+            self.metrics.record_run(task.name, time.monotonic() - start, failed)
+
+    def _run_task(self, task: ScheduledTask, due: Optional[float] = None):
+        while True:
+            if not task.cancelled:
+                start = self._record_start(task, due)
+                failed = False
+                try:
+                    result = task.run()
+                except BaseException as error:
+                    failed = True
+                    get_summer_logger().error("Running scheduled task led to an error", exc_info=True)
+                    task.record_outcome(error=error)
+                else:
+                    task.record_outcome(result)
+                self._record_end(task, start, failed)
+            due = None
+            if not self._has_waiting_run(task):
+                return
+
+    async def _run_task_async(self, task: ScheduledTask, due: Optional[float] = None):
+        while True:
+            if not task.cancelled:
+                start = self._record_start(task, due)
+                failed = False
+                try:
+                    result = await task.run_async()
+                except Exception as error:
+                    failed = True
+                    get_summer_logger().error("Running scheduled task led to an error", exc_info=True)
+                    task.record_outcome(error=error)
+                else:
+                    task.record_outcome(result)
+                self._record_end(task, start, failed)
+            due = None
+            if not self._has_waiting_run(task):
+                return
+
+    def _submit_to_process(self, task: ScheduledTask, due: Optional[float] = None):
+        # the lag of process tasks ends when they are handed to the pool
+        self._record_start(task, due)
+        if task.process_target[2] is not None:
+            # the lease of a cluster singleton is acquired with a database query, which must not block this thread
+            self.executor.submit(lambda: self._submit_process_target(task), on_discard=lambda: self._discarded(task))
+        else:
+            self._submit_process_target(task)
+
+    def _submit_process_target(self, task: ScheduledTask):
         try:
-            task.run()
-        except:
-            get_summer_logger().error("Running scheduled task led to an error", exc_info=True)
+            self.process_runner.submit(task.process_target,
+                                       lambda duration, result, error: self._process_task_finished(task, duration, result, error))
+        except RuntimeError:
+            self._discarded(task)
+
+    def _process_task_finished(self, task: ScheduledTask, duration: Optional[float], result: Any, error: Optional[BaseException]):
+        """called when a run in a worker process has finished, the error carries the traceback of the worker"""
+        if error is not None:
+            get_summer_logger().error("Running scheduled task %s in a process led to an error", task.name, exc_info=error)
+        elif duration is None:
+            get_summer_logger().debug("Scheduled task %s has not run, another node holds its lease", task.name)
+        else:
+            get_summer_logger().debug("Scheduled task %s finished in a process after %.3fs", task.name, duration)
+        if error is not None or duration is not None:
+            task.record_outcome(result, error)
+            if self.metrics is not None:
+                self.metrics.record_run(task.name, duration if duration is not None else 0.0, error is not None)
+        try:
+            task.on_finished()
+        except Exception:
+            get_summer_logger().error("Finishing scheduled task led to an error", exc_info=True)
+        if self._has_waiting_run(task):
+            self._submit_to_process(task)
+
+    def _has_waiting_run(self, task: ScheduledTask) -> bool:
+        """runs which became due meanwhile are executed right away by the worker of the previous run"""
+        if task.overlap == Overlap.ALLOW:
+            return False
+        with self._in_flight_lock:
+            waiting = self._in_flight.get(task, 0)
+            if waiting == 0 or task.cancelled or not self._background_job_running:
+                self._in_flight.pop(task, None)
+                return False
+            self._in_flight[task] = waiting - 1
+            return True
 
     def run(self) -> Any:
-        threadpool = ThreadPoolExecutor()
-        
         try:
             self._background_job_running = True
             while self._background_job_running:
-                self._wait_and_handle_new_schedulings()
                 next_task = self._next_task()
-                if next_task is None:
-                    continue
-                threadpool.submit(self._run_task, next_task)
+                while next_task is not None and self._background_job_running:
+                    self._dispatch(next_task)
+                    next_task = self._next_task()
+                # sleeps until the next task is due, unless an earlier one is scheduled meanwhile
+                self._handle_new_schedulings(self.inbox.take(self.scheduled_actions.next_due()))
 
         finally:
             self._background_job_running = False
-            threadpool.shutdown(cancel_futures=True)
+            self.executor.shutdown(wait=True, cancel_pending=True)
+            self.async_runner.shutdown()
+            self.process_runner.shutdown()
             get_summer_logger().info("Scheduler shutdown completed")
 
     def stop(self):
         self._background_job_running = False
-        self.queue.put((None, None))
\ No newline at end of file
+        self.inbox.stop()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import math
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from summer.scheduler.scheduled_task import ScheduledTask
+
+Scheduling = Tuple[ScheduledTask, Optional[float]]
+
+
+class SchedulingInbox:
+    """
+    Hands new schedulings to the scheduler thread. Schedulings are appended to a staging list, which the scheduler
+    thread swaps out as a whole, so a burst of schedulings costs one lock acquisition per scheduling and one per batch.
+    The scheduler thread is only woken when a scheduling is due before the time it sleeps until, or when
+    max_staged removals are waiting, which bounds the memory of cancelled tasks while it sleeps.
+    A scheduling is a task with its due time, a time.monotonic() value, or with None to remove the task.
+    """
+
+    def __init__(self, max_staged: int = 4096) -> None:
+        self.max_staged = max_staged
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._staged: List[Scheduling] = []
+        self._staged_removals = 0
+        # the time the scheduler thread sleeps until, -inf while it is awake and takes the staged schedulings anyway
+        self._wake_at = -math.inf
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def put(self, task: ScheduledTask, due: Optional[float]):
+        # the plain lock is faster to enter than the condition
+        with self._lock:
+            self._staged.append((task, due))
+            if due is None:
+                self._staged_removals += 1
+                if self._staged_removals < self.max_staged:
+                    return
+            elif due >= self._wake_at:
+                return
+            self._wake_at = -math.inf
+            self._condition.notify()
+
+    def take(self, until: Optional[float] = None) -> List[Scheduling]:
+        """
+        returns the staged schedulings, waits for new ones until the given monotonic time if there are none,
+        forever if it is None
+        """
+        with self._condition:
+            if len(self._staged) == 0 and not self._stopped:
+                timeout = until - time.monotonic() if until is not None else None
+                if timeout is None or timeout > 0:
+                    self._wake_at = until if until is not None else math.inf
+                    self._condition.wait(timeout)
+                    self._wake_at = -math.inf
+            staged = self._staged
+            self._staged = []
+            self._staged_removals = 0
+            return staged
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
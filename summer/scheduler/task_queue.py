@@ -0,0 +1,131 @@
+
+import itertools
+from typing import Dict, List, Optional
+
+from summer.scheduler.scheduled_task import ScheduledTask
+
+
+class ScheduledEntry:
+    __slots__ = ('at', 'sequence', 'task', 'index')
+
+    def __init__(self, at: float, sequence: int, task: ScheduledTask) -> None:
+        self.at = at
+        # tasks due at the same time run in the order they have been scheduled
+        self.sequence = sequence
+        self.task = task
+        self.index = -1
+
+    def __lt__(self, other: 'ScheduledEntry') -> bool:
+        return (self.at, self.sequence) < (other.at, other.sequence)
+
+
+class TaskHeap:
+    """
+    Pending tasks ordered by their due time, a time.monotonic() value. A binary heap which keeps the position of each entry,
+    so that adding, popping, removing and rescheduling a task are O(log n). Every task is pending at most once.
+    Not thread safe, it is owned by the scheduler thread.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[ScheduledEntry] = []
+        self._entries: Dict[ScheduledTask, ScheduledEntry] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, task: ScheduledTask) -> bool:
+        return task in self._entries
+
+    def push(self, task: ScheduledTask, at: float) -> ScheduledEntry:
+        """adds the task, if it is already pending it is moved to the new time"""
+        entry = self._entries.get(task)
+        if entry is not None:
+            entry.at = at
+            entry.sequence = next(self._sequence)
+            self._fix(entry.index)
+            return entry
+        entry = ScheduledEntry(at, next(self._sequence), task)
+        entry.index = len(self._heap)
+        self._heap.append(entry)
+        self._entries[task] = entry
+        self._sift_up(entry.index)
+        return entry
+
+    def peek(self) -> Optional[ScheduledEntry]:
+        return self._heap[0] if len(self._heap) > 0 else None
+
+    def pop(self) -> Optional[ScheduledEntry]:
+        if len(self._heap) == 0:
+            return None
+        return self._remove_at(0)
+
+    def remove(self, task: ScheduledTask) -> Optional[ScheduledEntry]:
+        entry = self._entries.get(task)
+        if entry is None:
+            return None
+        return self._remove_at(entry.index)
+
+    def get(self, task: ScheduledTask) -> Optional[ScheduledEntry]:
+        return self._entries.get(task)
+
+    def next_due(self) -> Optional[float]:
+        """the time the scheduler has to wake up for the next task"""
+        return self._heap[0].at if len(self._heap) > 0 else None
+
+    def pop_due(self, now: float) -> Optional[ScheduledTask]:
+        if len(self._heap) == 0 or self._heap[0].at > now:
+            return None
+        return self._remove_at(0).task
+
+    def _remove_at(self, index: int) -> ScheduledEntry:
+        heap = self._heap
+        entry = heap[index]
+        last = heap.pop()
+        if last is not entry:
+            heap[index] = last
+            last.index = index
+            self._fix(index)
+        entry.index = -1
+        del self._entries[entry.task]
+        return entry
+
+    def _fix(self, index: int):
+        if index > 0 and self._heap[index] < self._heap[(index - 1) >> 1]:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def _sift_up(self, index: int):
+        heap = self._heap
+        entry = heap[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if not entry < parent:
+                break
+            heap[index] = parent
+            parent.index = index
+            index = parent_index
+        heap[index] = entry
+        entry.index = index
+
+    def _sift_down(self, index: int):
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            right_index = child_index + 1
+            if right_index < size and heap[right_index] < heap[child_index]:
+                child_index = right_index
+            child = heap[child_index]
+            if not child < entry:
+                break
+            heap[index] = child
+            child.index = index
+            index = child_index
+        heap[index] = entry
+        entry.index = index
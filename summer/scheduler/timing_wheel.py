@@ -0,0 +1,166 @@
+
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from summer.scheduler.scheduled_task import ScheduledTask
+
+
+class _Timer:
+    __slots__ = ('task', 'at', 'deadline', 'level', 'slot')
+
+    def __init__(self, task: ScheduledTask, at: float, deadline: int) -> None:
+        self.task = task
+        self.at = at
+        self.deadline = deadline
+        self.level = -1
+        self.slot = -1
+
+
+_UNKNOWN = -1
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel, an alternative to TaskHeap for very many timers. Times are time.monotonic() values.
+    Adding and removing a task is O(1). Tasks become due at the end of the tick containing their time,
+    so they are delayed by up to one tick. Level k of the wheel holds timers which are due in less than
+    wheel_size^(k+1) ticks, they are moved to lower levels when their slot is reached.
+    Not thread safe, it is owned by the scheduler thread.
+    """
+
+    def __init__(self, tick: float = 0.01, wheel_size: int = 256, levels: int = 4,
+                 now: Optional[float] = None) -> None:
+        if wheel_size < 2 or wheel_size & (wheel_size - 1) != 0:
+            raise ValueError("wheel_size must be a power of two")
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        self._tick = tick
+        self._wheel_size = wheel_size
+        self._bits = wheel_size.bit_length() - 1
+        self._mask = wheel_size - 1
+        self._levels: List[List[Dict[ScheduledTask, _Timer]]] = [[{} for _ in range(wheel_size)] for _ in range(levels)]
+        self._level_counts = [0] * levels
+        self._timers: Dict[ScheduledTask, _Timer] = {}
+        # ordered by the time they became due, OrderedDict pops its first item in O(1)
+        self._due: 'OrderedDict[ScheduledTask, _Timer]' = OrderedDict()
+        self._current = self._floor_tick(now if now is not None else time.monotonic())
+        self._next_tick = _UNKNOWN
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, task: ScheduledTask) -> bool:
+        return task in self._timers
+
+    def _floor_tick(self, at: float) -> int:
+        return math.floor(at / self._tick + 1e-6)
+
+    def _ceil_tick(self, at: float) -> int:
+        return math.ceil(at / self._tick - 1e-6)
+
+    def push(self, task: ScheduledTask, at: float):
+        """adds the task, if it is already pending it is moved to the new time"""
+        if task in self._timers:
+            self.remove(task)
+        timer = _Timer(task, at, self._ceil_tick(at))
+        self._timers[task] = timer
+        processed_at = self._place(timer)
+        if self._next_tick != _UNKNOWN and processed_at < self._next_tick:
+            self._next_tick = processed_at
+
+    def remove(self, task: ScheduledTask) -> Optional[ScheduledTask]:
+        timer = self._timers.pop(task, None)
+        if timer is None:
+            return None
+        if timer.level < 0:
+            del self._due[task]
+        else:
+            del self._levels[timer.level][timer.slot][task]
+            self._level_counts[timer.level] -= 1
+        return task
+
+    def _place(self, timer: _Timer) -> int:
+        """puts the timer into its slot and returns the tick at which this slot is processed"""
+        delta = timer.deadline - self._current
+        if delta <= 0:
+            timer.level = -1
+            self._due[timer.task] = timer
+            return self._current
+        level = 0
+        last_level = len(self._levels) - 1
+        while level < last_level and delta >> (self._bits * (level + 1)) > 0:
+            level += 1
+        shift = self._bits * level
+        timer.level = level
+        timer.slot = (timer.deadline >> shift) & self._mask
+        self._levels[level][timer.slot][timer.task] = timer
+        self._level_counts[level] += 1
+        return (timer.deadline >> shift) << shift
+
+    def next_due(self) -> Optional[float]:
+        """the time the scheduler has to wake up, either for due tasks or to move timers to a lower level"""
+        if len(self._due) > 0:
+            return next(iter(self._due.values())).at
+        if len(self._timers) == 0:
+            return None
+        if self._next_tick == _UNKNOWN:
+            self._next_tick = self._find_next_tick()
+        return self._next_tick * self._tick
+
+    def _find_next_tick(self) -> int:
+        best = None
+        for level, slots in enumerate(self._levels):
+            if self._level_counts[level] == 0:
+                continue
+            shift = self._bits * level
+            base = self._current >> shift
+            for offset in range(1, self._wheel_size + 1):
+                if slots[(base + offset) & self._mask]:
+                    tick = (base + offset) << shift
+                    best = tick if best is None or tick < best else best
+                    break
+        return best if best is not None else self._current + 1
+
+    def pop_due(self, now: float) -> Optional[ScheduledTask]:
+        if len(self._due) == 0:
+            self._advance(self._floor_tick(now))
+            if len(self._due) == 0:
+                return None
+        task, _ = self._due.popitem(last=False)
+        del self._timers[task]
+        return task
+
+    def _advance(self, target: int):
+        while self._current < target:
+            if len(self._timers) == len(self._due):
+                self._current = target
+                break
+            if self._level_counts[0] > 0:
+                tick = self._current + 1
+            else:
+                # nothing can become due before level 0 wraps around and higher levels are cascaded
+                tick = ((self._current >> self._bits) + 1) << self._bits
+                if tick > target:
+                    self._current = target
+                    break
+            self._current = tick
+            self._process_tick(tick)
+        self._next_tick = _UNKNOWN
+
+    def _process_tick(self, tick: int):
+        level = 1
+        while level < len(self._levels) and tick & ((1 << (self._bits * level)) - 1) == 0:
+            self._cascade(level, (tick >> (self._bits * level)) & self._mask)
+            level += 1
+        self._cascade(0, tick & self._mask)
+
+    def _cascade(self, level: int, slot: int):
+        timers = self._levels[level][slot]
+        if not timers:
+            return
+        self._levels[level][slot] = {}
+        self._level_counts[level] -= len(timers)
+        for timer in timers.values():
+            self._place(timer)
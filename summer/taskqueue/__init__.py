@@ -0,0 +1 @@
+from summer.taskqueue.task_queue_context import *
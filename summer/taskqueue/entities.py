@@ -0,0 +1,41 @@
+
+from peewee import BinaryUUIDField, CharField, FloatField, IntegerField, TextField
+
+from summer.database.entities import BaseModel, BaseModelWithOrderedId
+
+
+class QueuedTask(BaseModelWithOrderedId):
+    queue = CharField()
+    name = CharField()
+    # json
+    payload = TextField(null=True)
+    # incremented when the task is claimed
+    attempts = IntegerField(default=0)
+    max_attempts = IntegerField()
+    # unix timestamp from which on the task can be claimed, claiming moves it by the visibility timeout
+    available_at = FloatField()
+    created_at = FloatField()
+    # token of the latest claim, completing and failing only succeed with it
+    claim = CharField(null=True, index=True)
+    last_error = TextField(null=True)
+
+    class Meta:
+        table_name = "summer_queued_task"
+        indexes = (
+            (('queue', 'available_at'), False),
+        )
+
+
+class DeadLetterTask(BaseModel):
+    """tasks which failed max_attempts times, they keep the id they had in the queue"""
+    id = BinaryUUIDField(primary_key=True)
+    queue = CharField(index=True)
+    name = CharField()
+    payload = TextField(null=True)
+    attempts = IntegerField()
+    created_at = FloatField()
+    failed_at = FloatField()
+    error = TextField(null=True)
+
+    class Meta:
+        table_name = "summer_dead_letter_task"
@@ -0,0 +1,195 @@
+
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from peewee import MySQLDatabase, PostgresqlDatabase, Value
+
+from summer.bean_strereotype import BeanStereotype
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.summer_logging import get_summer_logger
+from summer.taskqueue.entities import DeadLetterTask, QueuedTask
+
+DEFAULT_QUEUE = "default"
+
+
+@dataclass
+class ClaimedTask:
+    id: uuid.UUID
+    queue: str
+    name: str
+    payload: Any
+    attempts: int
+    max_attempts: int
+    claim: str
+
+
+class TaskQueue(BeanStereotype):
+    """
+    Durable queue of tasks stored as entities, consumed by the workers of all processes using the same database.
+    Claiming marks a batch of due tasks with a claim token and hides them for the visibility timeout, tasks
+    which are neither completed nor failed within it are claimed again. Failed tasks are retried with exponential
+    backoff and moved to the dead letter table after max_attempts attempts.
+    Backends with row locks claim with SELECT ... FOR UPDATE SKIP LOCKED, so workers do not wait for each other,
+    on SQLite the claim is a single conditional UPDATE, since writes are serialized anyway.
+    """
+
+    # backends supporting FOR UPDATE SKIP LOCKED, MySQL from 8.0 on
+    SKIP_LOCKED = (PostgresqlDatabase, MySQLDatabase)
+
+    visibility_timeout = ConfigurationValue(
+        config_keys.TASKQUEUE_VISIBILITY_TIMEOUT, float, default=60.0).typed()
+    max_attempts = ConfigurationValue(
+        config_keys.TASKQUEUE_MAX_ATTEMPTS, int, default=5).typed()
+    backoff_base = ConfigurationValue(
+        config_keys.TASKQUEUE_BACKOFF_BASE, float, default=1.0).typed()
+    backoff_max = ConfigurationValue(
+        config_keys.TASKQUEUE_BACKOFF_MAX, float, default=300.0).typed()
+
+    def __init__(self, connection_factory: DatabaseConnectionFactory) -> None:
+        super().__init__()
+        self._connection_factory = connection_factory
+        self._bound = False
+        self._bind_lock = threading.Lock()
+        self._enqueue_listeners: List[Callable[[str], Any]] = []
+
+    def _assert_bound(self):
+        with self._bind_lock:
+            if not self._bound:
+                self._connection_factory.bind_entities([QueuedTask, DeadLetterTask])
+                self._bound = True
+
+    def add_enqueue_listener(self, listener: Callable[[str], Any]):
+        """called with the queue name after tasks have been enqueued in this process"""
+        self._enqueue_listeners.append(listener)
+
+    def _notify(self, queue: str):
+        for listener in self._enqueue_listeners:
+            listener(queue)
+
+    def enqueue(self, name: str, payload: Any = None, queue: str = DEFAULT_QUEUE, delay: float = 0.0,
+                max_attempts: Optional[int] = None) -> uuid.UUID:
+        """stores a task for the handler with the given name, the payload must be serializable as json"""
+        return self.enqueue_many(name, [payload], queue, delay, max_attempts)[0]
+
+    def enqueue_many(self, name: str, payloads: Iterable[Any], queue: str = DEFAULT_QUEUE, delay: float = 0.0,
+                     max_attempts: Optional[int] = None) -> List[uuid.UUID]:
+        """stores one task per payload with a single insert statement"""
+        self._assert_bound()
+        now = time.time()
+        max_attempts = max_attempts if max_attempts is not None else self.max_attempts
+        rows = [{'id': QueuedTask.id.default(), 'queue': queue, 'name': name, 'payload': json.dumps(payload),
+                 'max_attempts': max_attempts, 'available_at': now + delay, 'created_at': now}
+                for payload in payloads]
+        if len(rows) == 0:
+            return []
+        QueuedTask.insert_many(rows).execute()
+        self._notify(queue)
+        return [row['id'] for row in rows]
+
+    def claim(self, queues: Sequence[str], limit: int) -> List[ClaimedTask]:
+        """claims at most limit due tasks of the given queues, the oldest first"""
+        self._assert_bound()
+        if limit <= 0:
+            return []
+        now = time.time()
+        token = uuid.uuid4().hex
+        claimed = QueuedTask.update(claim=token, available_at=now + self.visibility_timeout,
+                                    attempts=QueuedTask.attempts + 1)
+        due = (QueuedTask.queue.in_(list(queues))) & (QueuedTask.available_at <= now)
+        candidates = QueuedTask.select(QueuedTask.id).where(due).order_by(QueuedTask.available_at).limit(limit)
+        with self._connection_factory.read_from_primary():
+            database = self._connection_factory.get_database()
+            if isinstance(database, self.SKIP_LOCKED):
+                with database.atomic():
+                    ids = [row.id for row in candidates.for_update(skip_locked=True)]
+                    if len(ids) == 0:
+                        return []
+                    claimed.where(QueuedTask.id.in_(ids)).execute()
+            else:
+                # tasks claimed meanwhile by another process are no longer due
+                claimed.where(QueuedTask.id.in_(candidates) & due).execute()
+            rows = list(QueuedTask.select().where(QueuedTask.claim == token))
+        return [ClaimedTask(row.id, row.queue, row.name, json.loads(row.payload) if row.payload is not None else None,
+                            row.attempts, row.max_attempts, token) for row in rows]
+
+    def _claimed(self, task: ClaimedTask):
+        return (QueuedTask.id == task.id) & (QueuedTask.claim == task.claim)
+
+    def complete(self, task: ClaimedTask) -> bool:
+        """removes the task, returns False if its claim has expired and it has been claimed again"""
+        return QueuedTask.delete().where(self._claimed(task)).execute() > 0
+
+    def extend(self, task: ClaimedTask, seconds: Optional[float] = None) -> bool:
+        """hides a claimed task for longer, for handlers which run longer than the visibility timeout"""
+        seconds = seconds if seconds is not None else self.visibility_timeout
+        return QueuedTask.update(available_at=time.time() + seconds).where(self._claimed(task)).execute() > 0
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_base * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        # jitter spreads retries of tasks which failed together
+        return delay * random.uniform(0.5, 1.0)
+
+    def fail(self, task: ClaimedTask, error: str) -> bool:
+        """schedules a retry, or moves the task to the dead letter table after its last attempt"""
+        if task.attempts < task.max_attempts:
+            return QueuedTask.update(claim=None, last_error=error, available_at=time.time() + self._backoff(task.attempts)) \
+                .where(self._claimed(task)).execute() > 0
+        # writes come first, a transaction which reads first can not be upgraded on SQLite once another process wrote
+        with self._connection_factory.read_from_primary():
+            with self._connection_factory.get_database().atomic() as transaction:
+                DeadLetterTask.insert_from(
+                    QueuedTask.select(QueuedTask.id, QueuedTask.queue, QueuedTask.name, QueuedTask.payload,
+                                      QueuedTask.attempts, QueuedTask.created_at, Value(time.time()), Value(error))
+                    .where(self._claimed(task)),
+                    [DeadLetterTask.id, DeadLetterTask.queue, DeadLetterTask.name, DeadLetterTask.payload,
+                     DeadLetterTask.attempts, DeadLetterTask.created_at, DeadLetterTask.failed_at, DeadLetterTask.error]
+                ).execute()
+                if QueuedTask.delete().where(self._claimed(task)).execute() == 0:
+                    transaction.rollback()
+                    return False
+        get_summer_logger().warning("Task %s of queue \"%s\" failed %d times, moved it to the dead letters",
+                                    task.name, task.queue, task.attempts)
+        return True
+
+    def count(self, queue: Optional[str] = None) -> int:
+        """number of tasks which are waiting or claimed"""
+        self._assert_bound()
+        query = QueuedTask.select()
+        if queue is not None:
+            query = query.where(QueuedTask.queue == queue)
+        return query.count()
+
+    def get_dead_letters(self, queue: Optional[str] = None, limit: int = 100) -> List[DeadLetterTask]:
+        self._assert_bound()
+        query = DeadLetterTask.select().order_by(DeadLetterTask.failed_at.desc()).limit(limit)
+        if queue is not None:
+            query = query.where(DeadLetterTask.queue == queue)
+        return list(query)
+
+    def requeue_dead_letter(self, id: uuid.UUID, max_attempts: Optional[int] = None) -> bool:
+        """moves a dead letter back into its queue with its attempts reset"""
+        self._assert_bound()
+        now = time.time()
+        max_attempts = max_attempts if max_attempts is not None else self.max_attempts
+        with self._connection_factory.read_from_primary():
+            with self._connection_factory.get_database().atomic() as transaction:
+                QueuedTask.insert_from(
+                    DeadLetterTask.select(DeadLetterTask.id, DeadLetterTask.queue, DeadLetterTask.name, DeadLetterTask.payload,
+                                          Value(0), Value(max_attempts), Value(now), Value(now))
+                    .where(DeadLetterTask.id == id),
+                    [QueuedTask.id, QueuedTask.queue, QueuedTask.name, QueuedTask.payload, QueuedTask.attempts,
+                     QueuedTask.max_attempts, QueuedTask.available_at, QueuedTask.created_at]
+                ).execute()
+                queue = DeadLetterTask.select(DeadLetterTask.queue).where(DeadLetterTask.id == id).scalar()
+                if queue is None or DeadLetterTask.delete().where(DeadLetterTask.id == id).execute() == 0:
+                    transaction.rollback()
+                    return False
+        self._notify(queue)
+        return True
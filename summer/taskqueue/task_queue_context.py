@@ -0,0 +1,92 @@
+
+from typing import Any, Callable, Dict, Iterable, Optional, TypeVar
+from uuid import uuid4
+
+from summer.application.context_extension import ContextExtension, ContextExtensionRunThread
+from summer.autowire.context import SummerBeanContext
+from summer.autowire.exceptions import ValidationError
+from summer.configuration import config_keys
+from summer.configuration.configuration_value import ConfigurationValue
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.taskqueue.task_queue import DEFAULT_QUEUE, TaskQueue
+from summer.taskqueue.task_queue_worker import TaskQueueWorker
+from summer.util import inspection_util
+
+T = TypeVar('T', bound=Callable)
+_ATTR_HANDLER_REFERENCE = "__task_handler_reference__"
+
+
+class TaskQueueContextExtension(ContextExtension):
+    """
+    Runs the handlers of tasks stored by the TaskQueue bean. Handlers are registered by name with task_handler,
+    they get the payload as first argument and their other arguments are autowired.
+    Every process with the extension runs a worker, unless taskqueue.worker.enabled is false.
+    """
+
+    worker_enabled = ConfigurationValue(
+        config_keys.TASKQUEUE_WORKER_ENABLED, bool, default=True).typed()
+    queues = ConfigurationValue(
+        config_keys.TASKQUEUE_WORKER_QUEUES, list, default=[DEFAULT_QUEUE]).typed()
+    concurrency = ConfigurationValue(
+        config_keys.TASKQUEUE_WORKER_CONCURRENCY, int, default=4).typed()
+    batch_size = ConfigurationValue(
+        config_keys.TASKQUEUE_WORKER_BATCH_SIZE, int, default=0).typed()
+    poll_interval = ConfigurationValue(
+        config_keys.TASKQUEUE_WORKER_POLL_INTERVAL, float, default=1.0).typed()
+
+    def __init__(self, bean_context: SummerBeanContext) -> None:
+        self.bean_context = bean_context
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._handler_self_references: Dict[Any, Any] = {}
+        self._task_queue: Optional[TaskQueue] = None
+        self._connection_factory: Optional[DatabaseConnectionFactory] = None
+        self._worker: Optional[TaskQueueWorker] = None
+
+    def get_beans(self) -> Iterable[Any]:
+        return [TaskQueue]
+
+    def process_beans(self, beans: Dict[str, Any]):
+        for bean in beans.values():
+            if isinstance(bean, TaskQueue):
+                self._task_queue = bean
+            if isinstance(bean, DatabaseConnectionFactory):
+                self._connection_factory = bean
+            for method in inspection_util.get_methods(bean):
+                reference = getattr(method, _ATTR_HANDLER_REFERENCE, None)
+                if reference is not None:
+                    self._handler_self_references[reference] = bean
+        if self._task_queue is None or self._connection_factory is None:
+            raise ValidationError("the task queue needs the database extension")
+
+    def get_background_job(self) -> ContextExtensionRunThread:
+        if not self.worker_enabled:
+            return None
+        if self._worker is None:
+            handlers = {name: self._autowired_handler(function) for name, function in self._handlers.items()}
+            self._worker = TaskQueueWorker(self._task_queue, self._connection_factory, handlers, list(self.queues),
+                                           self.concurrency, self.batch_size, self.poll_interval)
+        return self._worker
+
+    def _autowired_handler(self, function: Callable[..., Any]) -> Callable[[Any], Any]:
+        def inner(payload: Any):
+            reference = getattr(function, _ATTR_HANDLER_REFERENCE, None)
+            args = []
+            bean = self._handler_self_references.get(reference)
+            if bean is not None:
+                args.append(bean)
+            return self.bean_context.autowire_and_run(function, *args, payload)
+        return inner
+
+    def register_handler(self, name: str, function: Callable[..., Any]):
+        if name in self._handlers:
+            raise ValidationError(f"there is already a handler for tasks \"{name}\"")
+        self._handlers[name] = function
+
+    def task_handler(self, name: Optional[str] = None) -> Callable[[T], T]:
+        """registers the function as handler of the tasks with the given name, by default its qualified name"""
+        def inner(fn: T) -> T:
+            if getattr(fn, _ATTR_HANDLER_REFERENCE, None) is None:
+                setattr(fn, _ATTR_HANDLER_REFERENCE, uuid4())
+            self.register_handler(name if name is not None else f"{fn.__module__}.{fn.__qualname__}", fn)
+            return fn
+        return inner
@@ -0,0 +1,109 @@
+
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from summer.application.context_extension import ContextExtensionRunThread
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.scheduler.executor import BoundedExecutor
+from summer.summer_logging import get_summer_logger
+from summer.taskqueue.task_queue import ClaimedTask, TaskQueue
+
+
+class TaskQueueWorker(ContextExtensionRunThread):
+    """
+    Claims tasks of the given queues in batches and runs their handlers on at most concurrency threads.
+    Only as many tasks are claimed as there are free threads, so claimed tasks do not wait for a thread
+    while their visibility timeout runs out. Polls every poll_interval and right after tasks are enqueued in this process.
+    """
+
+    def __init__(self, task_queue: TaskQueue, connection_factory: DatabaseConnectionFactory,
+                 handlers: Dict[str, Callable[[Any], Any]], queues: List[str], concurrency: int = 4,
+                 batch_size: Optional[int] = None, poll_interval: float = 1.0) -> None:
+        self.task_queue = task_queue
+        self.connection_factory = connection_factory
+        self.handlers = handlers
+        self.queues = queues
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = batch_size if batch_size else self.concurrency
+        self.poll_interval = poll_interval
+        self._executor = BoundedExecutor(self.concurrency, self.concurrency, name="summer-taskqueue")
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._running_tasks = 0
+        self._background_job_running = False
+        task_queue.add_enqueue_listener(self._on_enqueued)
+
+    def _on_enqueued(self, queue: str):
+        if queue in self.queues:
+            self._wakeup.set()
+
+    def _free_slots(self) -> int:
+        with self._lock:
+            return self.concurrency - self._running_tasks
+
+    def _claim(self) -> int:
+        """claims and submits tasks, returns how many have been claimed"""
+        free = min(self._free_slots(), self.batch_size)
+        if free <= 0:
+            return 0
+        try:
+            with self.connection_factory.connection():
+                tasks = self.task_queue.claim(self.queues, free)
+        except Exception:
+            get_summer_logger().error("Claiming tasks led to an error", exc_info=True)
+            return 0
+        for task in tasks:
+            with self._lock:
+                self._running_tasks += 1
+            self._executor.submit(lambda task=task: self._execute(task))
+        return len(tasks)
+
+    def _execute(self, task: ClaimedTask):
+        try:
+            with self.connection_factory.connection():
+                self._run_handler(task)
+        except Exception:
+            get_summer_logger().error("Finishing task %s led to an error", task.name, exc_info=True)
+        finally:
+            with self._lock:
+                self._running_tasks -= 1
+            self._wakeup.set()
+
+    def _run_handler(self, task: ClaimedTask):
+        handler = self.handlers.get(task.name)
+        if handler is None:
+            self.task_queue.fail(task, f"no handler for task \"{task.name}\"")
+            return
+        if task.attempts > task.max_attempts:
+            # the previous claims expired, the handler crashed the process or ran longer than the visibility timeout
+            self.task_queue.fail(task, "visibility timeout expired on the last attempt")
+            return
+        try:
+            handler(task.payload)
+        except Exception:
+            get_summer_logger().warning("Task %s failed on attempt %d", task.name, task.attempts, exc_info=True)
+            self.task_queue.fail(task, traceback.format_exc())
+            return
+        if not self.task_queue.complete(task):
+            get_summer_logger().warning("Task %s completed after its claim expired, it might run twice", task.name)
+
+    def run(self) -> Any:
+        self._background_job_running = True
+        try:
+            while self._background_job_running:
+                self._wakeup.clear()
+                claimed = self._claim()
+                # a full batch indicates more due tasks, the queue is polled again right away if there are free threads
+                if claimed > 0 and claimed == self.batch_size and self._free_slots() > 0:
+                    continue
+                self._wakeup.wait(self.poll_interval)
+        finally:
+            self._background_job_running = False
+            # claimed tasks are finished, unclaimed ones stay in the database
+            self._executor.shutdown(wait=True, cancel_pending=False)
+            get_summer_logger().info("Task queue worker shutdown completed")
+
+    def stop(self):
+        self._background_job_running = False
+        self._wakeup.set()
@@ -1,16 +1,39 @@
 import dataclasses
 import datetime
 import inspect
+from enum import Enum
 from types import NoneType
-from typing import Any, Dict, List, Optional, Type, TypeVar, Generic, Tuple, Union, get_args, get_origin
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Generic, Tuple, Union, get_args, get_origin
 from collections.abc import Iterable
 from abc import abstractmethod
 
 from yaml import serialize_all
 
+
+class DeserialisationMode(Enum):
+    """
+    DEFAULT: lenient, primitive type mismatches are deserialized to None
+    STRICT: every value is checked, all errors are collected and reported together with their path
+    TRUSTED: no checks at all, for internal data which is known to be well-formed
+    """
+    DEFAULT = "default"
+    STRICT = "strict"
+    TRUSTED = "trusted"
+
+
+@dataclasses.dataclass
+class FieldError:
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
 class DeserialisationError(Exception):
-    def __init__(self, *args: object) -> None:
+    def __init__(self, *args: object, errors: Optional[List[FieldError]] = None) -> None:
         super().__init__(*args)
+        self.errors: List[FieldError] = errors if errors is not None else []
 
 T = TypeVar('T')
 SERIALIZED = TypeVar('SERIALIZED')
@@ -45,6 +68,7 @@ class DataObjectMapper:
         self._serializers = serializers
         self._deserializer_map : Optional[Dict[Tuple[Type[SERIALIZED], Type[DESERIALIZED]], Deserializer[Type[SERIALIZED], Type[DESERIALIZED]]]] = None
         self._serializer_map : Optional[Dict[Type[DESERIALIZED], Serializer[Type[SERIALIZED], Type[DESERIALIZED]]]] = None
+        self._trusted_plans: Dict[Any, Callable[[Any], Any]] = {}
     
     def _deserializer(self, from_type: Type[SERIALIZED], to_type: Type[DESERIALIZED]) -> Optional[Deserializer[SERIALIZED, DESERIALIZED]]:
         if self._deserializer_map is None:
@@ -104,7 +128,11 @@ class DataObjectMapper:
         if isinstance(serialized, as_type):
             return serialized
         
-    def deserialize(self, serialized:Any, as_type: Type[DESERIALIZED]) -> DESERIALIZED:
+    def deserialize(self, serialized:Any, as_type: Type[DESERIALIZED], mode: DeserialisationMode = DeserialisationMode.DEFAULT) -> DESERIALIZED:
+        if mode == DeserialisationMode.TRUSTED:
+            return self._trusted_plan(as_type)(serialized)
+        if mode == DeserialisationMode.STRICT:
+            return self._deserialize_strict_checked(serialized, as_type)
         try:
             return self._deserialize(serialized, as_type)
         except KeyError as e:
@@ -153,6 +181,181 @@ class DataObjectMapper:
 
         return as_type(**kwargs)
 
+    def _is_optional(self, t) -> bool:
+        return get_origin(t) == Union and NoneType in get_args(t)
+
+    def _deserialize_strict_checked(self, serialized: Any, as_type: Type[DESERIALIZED]) -> DESERIALIZED:
+        errors: List[FieldError] = []
+        result = self._deserialize_strict(serialized, as_type, "$", errors)
+        if len(errors) > 0:
+            message = f"{len(errors)} error(s) while deserializing {as_type}:\n" + "\n".join(str(e) for e in errors)
+            raise DeserialisationError(message, errors=errors)
+        return result
+
+    def _deserialize_strict(self, serialized: Any, as_type: Type[DESERIALIZED], path: str, errors: List[FieldError]) -> DESERIALIZED:
+        if serialized is None:
+            if as_type is not Any and not self._is_optional(as_type):
+                errors.append(FieldError(path, f"value must not be None, expected {as_type}"))
+            return None
+        if as_type is Any:
+            return serialized
+        try:
+            as_type, type_args = self._translate_type(as_type)
+        except TypeError as e:
+            errors.append(FieldError(path, str(e)))
+            return None
+
+        if as_type == list and type_args:
+            if not isinstance(serialized, (list, tuple)):
+                errors.append(FieldError(path, f"expected a list, got {serialized.__class__.__name__}"))
+                return None
+            return [self._deserialize_strict(elem, type_args[0], f"{path}[{i}]", errors) for i, elem in enumerate(serialized)]
+
+        deserializer = self._deserializer(serialized.__class__, as_type)
+        if deserializer is not None:
+            try:
+                return deserializer.deserialize(serialized)
+            except Exception as e:
+                errors.append(FieldError(path, f"can not deserialize {serialized!r} to {as_type}: {e}"))
+                return None
+
+        if self._is_primitive_type(as_type):
+            if isinstance(serialized, bool) and as_type is not bool:
+                errors.append(FieldError(path, f"expected {as_type.__name__}, got bool"))
+                return None
+            if isinstance(serialized, as_type):
+                return serialized
+            if as_type is float and isinstance(serialized, int):
+                return float(serialized)
+            errors.append(FieldError(path, f"expected {as_type.__name__}, got {serialized.__class__.__name__}"))
+            return None
+
+        if isinstance(serialized, as_type):
+            return serialized
+
+        if not dataclasses.is_dataclass(as_type):
+            errors.append(FieldError(path, f"can not deserialize type to {as_type}, because it is not a dataclass"))
+            return None
+        if not isinstance(serialized, dict):
+            errors.append(FieldError(path, f"expected an object, got {serialized.__class__.__name__}"))
+            return None
+
+        fields = {f.name: f for f in dataclasses.fields(as_type) if f.init}
+        error_count = len(errors)
+        kwargs = {}
+        for key, value in serialized.items():
+            if key not in fields:
+                errors.append(FieldError(f"{path}.{key}", f"unknown field for {as_type.__name__}"))
+                continue
+            if value is None and fields[key].default is None:
+                kwargs[key] = None
+                continue
+            kwargs[key] = self._deserialize_strict(value, fields[key].type, f"{path}.{key}", errors)
+        for name, f in fields.items():
+            if name not in serialized and f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+                errors.append(FieldError(f"{path}.{name}", "missing required field"))
+
+        if len(errors) != error_count:
+            return None
+        try:
+            return as_type(**kwargs)
+        except Exception as e:
+            errors.append(FieldError(path, f"can not create {as_type.__name__}: {e}"))
+            return None
+
+    def _trusted_plan(self, as_type) -> Callable[[Any], Any]:
+        plan = self._trusted_plans.get(as_type)
+        if plan is None:
+            plan = self._build_trusted_plan(as_type)
+        return plan
+
+    def _build_trusted_plan(self, as_type) -> Callable[[Any], Any]:
+        """
+        Compiles a converter for as_type once, so deserializing trusted data only has to follow
+        the precomputed plan instead of inspecting types and values on every level
+        """
+        if as_type is Any:
+            plan = _identity
+            self._trusted_plans[as_type] = plan
+            return plan
+        target_type, type_args = self._translate_type(as_type)
+
+        if target_type == list and type_args:
+            element_plan = self._trusted_plan(type_args[0])
+            if element_plan is _identity:
+                def plan(value):
+                    return None if value is None else list(value)
+            else:
+                def plan(value):
+                    return None if value is None else [element_plan(elem) for elem in value]
+            self._trusted_plans[as_type] = plan
+            return plan
+
+        if dataclasses.is_dataclass(target_type):
+            field_plans: Dict[str, Callable[[Any], Any]] = {}
+            construct = self._trusted_constructor(target_type)
+
+            def plan(value):
+                if value is None or isinstance(value, target_type):
+                    return value
+                return construct({k: field_plans[k](v) for k, v in value.items() if k in field_plans})
+
+            # register before resolving the fields, so recursive dataclasses terminate
+            self._trusted_plans[as_type] = plan
+            for f in dataclasses.fields(target_type):
+                if f.init:
+                    field_plans[f.name] = self._trusted_plan(f.type)
+            return plan
+
+        deserializers = {deserializer.types()[0]: deserializer for deserializer in self._deserializers
+                         if deserializer.types()[1] == target_type}
+        if len(deserializers) == 0:
+            plan = _identity
+        else:
+            def plan(value):
+                deserializer = deserializers.get(value.__class__)
+                return value if deserializer is None else deserializer.deserialize(value)
+        self._trusted_plans[as_type] = plan
+        return plan
+
+    def _trusted_constructor(self, as_type: Type[T]) -> Callable[[Dict[str, Any]], T]:
+        fields = dataclasses.fields(as_type)
+        # only generated __init__ methods without side effects can be skipped
+        bypass_init = (
+            _has_generated_init(as_type)
+            and not hasattr(as_type, "__post_init__")
+            and not hasattr(as_type, "__slots__")
+            and all(f.init for f in fields)
+        )
+        if not bypass_init:
+            return lambda kwargs: as_type(**kwargs)
+
+        defaults = {f.name: f.default for f in fields if f.default is not dataclasses.MISSING}
+        factories = [(f.name, f.default_factory) for f in fields if f.default_factory is not dataclasses.MISSING]
+        new = object.__new__
+
+        def construct(kwargs: Dict[str, Any]) -> T:
+            obj = new(as_type)
+            attributes = obj.__dict__
+            attributes.update(defaults)
+            for name, factory in factories:
+                if name not in kwargs:
+                    attributes[name] = factory()
+            attributes.update(kwargs)
+            return obj
+        return construct
+
+
+def _identity(value):
+    return value
+
+
+def _has_generated_init(as_type: type) -> bool:
+    # dataclass keeps an __init__ defined in the class body, the generated one is compiled from a string
+    init = as_type.__dict__.get("__init__")
+    code = getattr(init, "__code__", None)
+    return as_type.__dataclass_params__.init and code is not None and code.co_filename == "<string>"
+
 
 class DateSerializer(Deserializer[str, datetime.datetime], Serializer[str, datetime.datetime]):
 
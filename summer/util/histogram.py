@@ -0,0 +1,65 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+# the key all further values are collected under once a bounded dict is full
+OTHER = "<other>"
+
+V = TypeVar('V')
+
+
+@dataclass
+class Histogram:
+    count: int
+    total_seconds: float
+    max_seconds: float
+    # upper bounds in seconds, the last bucket counts everything above
+    bounds: Tuple[float, ...]
+    # count per bucket of bounds plus one for slower values, not cumulative
+    buckets: List[int]
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count > 0 else 0.0
+
+    def quantile(self, q: float) -> float:
+        """upper bound of the bucket containing the quantile, max_seconds for the last bucket"""
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count > 0:
+                return self.bounds[i] if i < len(self.bounds) else self.max_seconds
+        return 0.0
+
+
+class HistogramRecorder:
+    """collects durations into the buckets of the given bounds, not thread safe"""
+    __slots__ = ('bounds', 'count', 'total', 'max', 'buckets')
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(bounds) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+
+    def snapshot(self) -> Histogram:
+        return Histogram(self.count, self.total, self.max, self.bounds, list(self.buckets))
+
+
+def get_bounded(values: Dict[str, V], key: str, max_size: int, factory: Callable[[], V]) -> V:
+    """returns the value of the key, new keys share the OTHER value once max_size keys are present"""
+    value = values.get(key)
+    if value is None:
+        if len(values) >= max_size:
+            key = OTHER
+        value = values.setdefault(key, factory())
+    return value
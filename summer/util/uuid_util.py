@@ -0,0 +1,44 @@
+
+import os
+import threading
+import time
+import uuid
+
+_UUID7_LOCK = threading.Lock()
+_UUID7_MAX_COUNTER = 0xFFF
+_last_uuid7_ms = 0
+_last_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Create a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits hold the unix timestamp in milliseconds, followed by a 12 bit counter that keeps
+    ids generated within the same millisecond (or after the clock went backwards) strictly increasing.
+    The remaining 62 bits are random. Sequentially generated ids therefore sort in creation order,
+    which keeps inserts at the right edge of a primary key index.
+    """
+    global _last_uuid7_ms, _last_uuid7_counter
+
+    with _UUID7_LOCK:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_uuid7_ms:
+            _last_uuid7_ms = timestamp_ms
+            # start in the lower half, so the counter rarely overflows
+            _last_uuid7_counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _last_uuid7_counter += 1
+            if _last_uuid7_counter > _UUID7_MAX_COUNTER:
+                _last_uuid7_ms += 1
+                _last_uuid7_counter = 0
+        timestamp_ms = _last_uuid7_ms
+        counter = _last_uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
@@ -0,0 +1,60 @@
+"""
+Runs 64 concurrent aggregate queries from one event loop with 1, 2, 4 and 8 workers of AsyncEntityAccess on a SQLite
+WAL database. SQLite releases the GIL while a query is executed, so the throughput rises with the number of workers
+up to the number of cores.
+Run from the repository root: python -m tests.benchmarks.bench_async_entities
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from peewee import IntegerField, fn
+
+from summer.database.async_entities import AsyncEntityAccess
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.database_context_extension import DatabaseContextExtension
+from summer.database.entities import BaseModelWithId
+from tests.conftest import build_context, _remove_configuration_binding
+
+
+class Row(BaseModelWithId):
+    n = IntegerField()
+
+
+def _aggregate() -> int:
+    other = Row.alias()
+    return Row.select(fn.COUNT(Row.id)).join(other, on=(other.n < Row.n)).scalar()
+
+
+async def _run_queries(access: AsyncEntityAccess, queries: int):
+    await asyncio.gather(*(access.execute(_aggregate) for _ in range(queries)))
+
+
+def main(rows: int = 1000, queries: int = 64):
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "bench.db")
+        for workers in (1, 2, 4, 8):
+            config_file = os.path.join(directory, f"config{workers}.json")
+            with open(config_file, "w") as file:
+                json.dump({"logging": {"level": "WARNING"},
+                           "database": {"type": "sqlite", "filename": filename, "async": {"workers": workers}}}, file)
+            context = build_context(config_file, [DatabaseContextExtension()])
+            context.get_bean(DatabaseConnectionFactory).bind_entities([Row])
+            if Row.select().count() == 0:
+                Row.insert_many([{"n": n} for n in range(rows)]).execute()
+            access = context.get_bean(AsyncEntityAccess)
+            asyncio.run(_run_queries(access, workers))
+
+            start = time.perf_counter()
+            asyncio.run(_run_queries(access, queries))
+            seconds = time.perf_counter() - start
+            print(f"{workers} workers: {queries / seconds:.1f} queries/s")
+            context.pre_destroy()
+            _remove_configuration_binding(context)
+            Row._meta.database.initialize(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Deserializes a nested payload with each DeserialisationMode.
+Run from the repository root: python -m tests.benchmarks.bench_dataobject_mapper
+"""
+import dataclasses
+import datetime
+import timeit
+from typing import List, Optional
+
+from summer.util.dataobject_mapper import DataObjectMapper, DateSerializer, DeserialisationMode
+
+
+@dataclasses.dataclass
+class Item:
+    id: int
+    name: str
+    created: Optional[datetime.datetime] = None
+
+
+@dataclasses.dataclass
+class Order:
+    customer: str
+    items: List[Item]
+    tags: List[str] = dataclasses.field(default_factory=list)
+
+
+def main(item_count: int = 1000, repetitions: int = 50):
+    mapper = DataObjectMapper([DateSerializer()], [DateSerializer()])
+    payload = {
+        "customer": "customer",
+        "items": [{"id": i, "name": f"item {i}", "created": "2024-01-01T00:00:00"} for i in range(item_count)],
+        "tags": ["a", "b"]
+    }
+    for mode in DeserialisationMode:
+        mapper.deserialize(payload, Order, mode)
+        seconds = timeit.timeit(lambda: mapper.deserialize(payload, Order, mode), number=repetitions)
+        print(f"{mode.value:>8}: {seconds / repetitions * 1000:8.2f} ms per payload of {item_count} items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Inserts rows in batches into SQLite tables keyed by random UUIDv4 text ids and by time-ordered binary UUIDv7 ids,
+reports the insert throughput as the tables grow and the size of the tables with their indexes.
+Run from the repository root: python -m tests.benchmarks.bench_ordered_ids
+"""
+import os
+import tempfile
+import time
+
+from peewee import CharField, SqliteDatabase
+
+from summer.database.entities import BaseModel, BaseModelWithId, BaseModelWithOrderedId
+
+
+class RandomIdRow(BaseModelWithId):
+    name = CharField()
+
+
+class OrderedIdRow(BaseModelWithOrderedId):
+    name = CharField()
+
+
+def _sizes(database: SqliteDatabase) -> dict:
+    # dbstat is compiled into most SQLite builds, the file size is reported without it
+    try:
+        rows = database.execute_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+        return dict(rows)
+    except Exception:
+        return {}
+
+
+def main(batches: int = 20, batch_size: int = 10000):
+    BaseModel._meta.database.initialize(None)
+    with tempfile.TemporaryDirectory() as directory:
+        for entity in (RandomIdRow, OrderedIdRow):
+            filename = os.path.join(directory, f"{entity.__name__}.db")
+            database = SqliteDatabase(filename, pragmas={'journal_mode': 'wal'})
+            entity._meta.database.initialize(database)
+            database.create_tables([entity])
+            rates = []
+            for _ in range(batches):
+                rows = [{"name": "row"} for _ in range(batch_size)]
+                start = time.perf_counter()
+                with database.atomic():
+                    entity.insert_many(rows).execute()
+                rates.append(batch_size / (time.perf_counter() - start))
+            database.execute_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            sizes = _sizes(database)
+            print(f"{entity.__name__}: first batch {rates[0]:,.0f} rows/s, last batch {rates[-1]:,.0f} rows/s, "
+                  f"file {os.path.getsize(filename) / 1024 / 1024:.1f} MiB")
+            for name, size in sorted(sizes.items()):
+                if name.startswith(entity._meta.table_name) or name.startswith("sqlite_autoindex"):
+                    print(f"    {name}: {size / 1024 / 1024:.1f} MiB")
+            database.close()
+            entity._meta.database.initialize(None)
+
+
+if __name__ == "__main__":
+    main()
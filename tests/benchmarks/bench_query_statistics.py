@@ -0,0 +1,35 @@
+"""
+Measures the bookkeeping the QueryRecorder adds to a trivial SQLite statement at several sample rates.
+Run from the repository root: python -m tests.benchmarks.bench_query_statistics
+"""
+import time
+
+from peewee import SqliteDatabase
+
+from summer.database.query_statistics import QueryRecorder
+
+
+def _nanoseconds_per_statement(execute, database: SqliteDatabase, statements: int, rounds: int = 7) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(statements):
+            execute(database, "SELECT ?", (1,))
+        best = min(best, (time.perf_counter() - start) / statements * 1e9)
+    return best
+
+
+def main(statements: int = 100000):
+    database = SqliteDatabase(':memory:')
+    database.connect()
+    baseline = _nanoseconds_per_statement(lambda db, sql, params: db.execute_sql(sql, params), database, statements)
+    print(f"without recorder: {baseline:.0f} ns per statement")
+    for sample_rate in (1.0, 0.1, 0.01, 0.0):
+        recorder = QueryRecorder(sample_rate=sample_rate)
+        overhead = _nanoseconds_per_statement(recorder.execute, database, statements) - baseline
+        print(f"sample rate {sample_rate:>4}: {overhead:+.0f} ns per statement")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Fires 100k one-time timers spread over a few seconds, 1% of them cancelled through the inbox, and reports how late
+the scheduler thread fires them with the TaskHeap and the TimingWheel as pending set. Then 4 threads submit 50k
+schedulings each, due after the run, and it reports how many schedulings per second the inbox accepts.
+Run from the repository root: python -m tests.benchmarks.bench_scheduler_queue
+"""
+import random
+import threading
+import time
+from typing import List
+
+from summer.scheduler.scheduled_task import OneTimeScheduledTask
+from summer.scheduler.scheduler_run_thread import SchedulerRunThread
+from summer.scheduler.scheduling_inbox import SchedulingInbox
+from summer.scheduler.task_queue import TaskHeap
+from summer.scheduler.timing_wheel import TimingWheel
+from summer.summer_logging import LoggingConfiguration, init_logging
+
+
+class _LatenessTask(OneTimeScheduledTask):
+    """records when it is fired and skips the run, so only the scheduler thread is measured"""
+
+    def __init__(self, lateness: List[float]) -> None:
+        super().__init__(lambda: None)
+        self._lateness = lateness
+
+    def on_fire(self, now: float) -> bool:
+        self._lateness.append(now - self.due)
+        return False
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(pending_set, timers: int, spread: float, cancelled: int):
+    inbox = SchedulingInbox()
+    run_thread = SchedulerRunThread(inbox, pending_set)
+    lateness: List[float] = []
+    start = time.monotonic() + 2.0
+    tasks = [_LatenessTask(lateness) for _ in range(timers)]
+    for task in tasks:
+        inbox.put(task, start + random.random() * spread)
+    thread = threading.Thread(target=run_thread.run)
+    thread.start()
+    for task in tasks[:cancelled]:
+        task.cancelled = True
+        inbox.put(task, None)
+    time.sleep(start + spread + 1.0 - time.monotonic())
+    run_thread.stop()
+    thread.join()
+    lateness.sort()
+    print(f"{type(pending_set).__name__}: {len(lateness)} fired, lateness p50 {_percentile(lateness, 0.5) * 1000:.2f} ms, "
+          f"p99 {_percentile(lateness, 0.99) * 1000:.2f} ms, max {lateness[-1] * 1000:.2f} ms")
+
+
+def measure_submission(pending_set, threads: int, schedulings: int):
+    inbox = SchedulingInbox()
+    run_thread = SchedulerRunThread(inbox, pending_set)
+    thread = threading.Thread(target=run_thread.run)
+    thread.start()
+    due = time.monotonic() + 3600.0
+    tasks = [[_LatenessTask([]) for _ in range(schedulings)] for _ in range(threads)]
+
+    def submit(thread_tasks: List[_LatenessTask]):
+        for task in thread_tasks:
+            inbox.put(task, due)
+
+    submitters = [threading.Thread(target=submit, args=(thread_tasks,)) for thread_tasks in tasks]
+    start = time.perf_counter()
+    for submitter in submitters:
+        submitter.start()
+    for submitter in submitters:
+        submitter.join()
+    seconds = time.perf_counter() - start
+    run_thread.stop()
+    thread.join()
+    print(f"{type(pending_set).__name__}: {threads * schedulings / seconds:,.0f} schedulings/s submitted by {threads} threads")
+
+
+def main(timers: int = 100000, spread: float = 4.0):
+    init_logging(LoggingConfiguration(level="WARNING"))
+    for pending_set in (TaskHeap(), TimingWheel()):
+        measure(pending_set, timers, spread, timers // 100)
+    for pending_set in (TaskHeap(), TimingWheel()):
+        measure_submission(pending_set, 4, 50000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Writes 50 rows per call on a SQLite WAL database, in autocommit mode and within one @transactional call.
+Run from the repository root: python -m tests.benchmarks.bench_transactional
+"""
+import json
+import os
+import tempfile
+import time
+
+from peewee import IntegerField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.database_context_extension import DatabaseContextExtension
+from summer.database.entities import BaseModelWithId
+from summer.database.transaction import transactional
+from tests.conftest import build_context
+
+
+class Row(BaseModelWithId):
+    n = IntegerField()
+
+
+def write_rows(count: int):
+    for n in range(count):
+        Row.create(n=n)
+
+
+@transactional
+def write_rows_in_transaction(count: int):
+    write_rows(count)
+
+
+def main(rows_per_call: int = 50, calls: int = 20):
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, "config.json")
+        with open(config_file, "w") as file:
+            json.dump({"logging": {"level": "WARNING"},
+                       "database": {"type": "sqlite", "filename": os.path.join(directory, "bench.db")}}, file)
+        context = build_context(config_file, [DatabaseContextExtension()])
+        context.get_bean(DatabaseConnectionFactory).bind_entities([Row])
+        for function in (write_rows, write_rows_in_transaction):
+            start = time.perf_counter()
+            for _ in range(calls):
+                function(rows_per_call)
+            milliseconds = (time.perf_counter() - start) / calls * 1000
+            print(f"{function.__name__}: {milliseconds:.2f} ms per call of {rows_per_call} rows")
+        context.pre_destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Inserts rows one by one with Model.create and through the EntityWriteBuffer on a SQLite WAL database.
+Run from the repository root: python -m tests.benchmarks.bench_write_buffer
+"""
+import json
+import os
+import tempfile
+import time
+
+from peewee import IntegerField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.database_context_extension import DatabaseContextExtension
+from summer.database.entities import BaseModelWithId
+from summer.database.write_buffer import EntityWriteBuffer
+from tests.conftest import build_context
+
+
+class Row(BaseModelWithId):
+    n = IntegerField()
+
+
+def main(rows: int = 5000):
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, "config.json")
+        with open(config_file, "w") as file:
+            json.dump({"logging": {"level": "WARNING"},
+                       "database": {"type": "sqlite", "filename": os.path.join(directory, "bench.db")}}, file)
+        context = build_context(config_file, [DatabaseContextExtension()])
+        context.get_bean(DatabaseConnectionFactory).bind_entities([Row])
+        write_buffer = context.get_bean(EntityWriteBuffer)
+
+        start = time.perf_counter()
+        for n in range(rows):
+            Row.create(n=n)
+        create_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for n in range(rows):
+            write_buffer.add({"n": n}, Row)
+        write_buffer.flush()
+        buffer_seconds = time.perf_counter() - start
+
+        assert Row.select().count() == 2 * rows
+        print(f"Model.create: {rows / create_seconds:,.0f} rows/s")
+        print(f"EntityWriteBuffer: {rows / buffer_seconds:,.0f} rows/s ({create_seconds / buffer_seconds:.1f}x)")
+        context.pre_destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+import pytest
+
+from summer.application.default_beans import DEFAULT_BEANS
+from summer.application.summer_context import SummerContext
+from summer.configuration.configuration import SummerConfigurationContext
+from summer.database.database_context_extension import DatabaseContextExtension
+from summer.database.entities import BaseModel
+
+
+def build_context(config_file: str, extensions: Iterable[Any] = (), components: Iterable[Any] = ()) -> SummerContext:
+    context = _create_context(config_file, extensions, components)
+    context.initialize()
+    return context
+
+
+def _create_context(config_file: str, extensions: Iterable[Any], components: Iterable[Any]) -> SummerContext:
+    context = SummerContext()
+    # the bean registry is a class attribute shared with the default context, every test context gets its own
+    context.beans = {}
+    context.bean_providers = []
+    context.load_configuration(config_file)
+    for bean in DEFAULT_BEANS:
+        context.register_component(bean)
+    for component in components:
+        context.register_component(component)
+    for extension in extensions:
+        context.register_context_extension(extension)
+    return context
+
+
+def _remove_configuration_binding(context: SummerContext):
+    """configuration values are resolved by patching the classes of the beans, the next context patches them again"""
+    for bean in context.beans.values():
+        for cls in type(bean).__mro__:
+            attribute = cls.__dict__.get("__getattribute__")
+            if attribute is not None and attribute.__qualname__.startswith(SummerConfigurationContext._replace_getattribute.__qualname__):
+                delattr(cls, "__getattribute__")
+
+
+def _merge(config: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(config)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@pytest.fixture
+def summer_context(tmp_path) -> Iterator[Callable[..., SummerContext]]:
+    """builds initialized contexts with the given configuration, they are destroyed after the test"""
+    contexts = []
+
+    def create(configuration: Dict[str, Any] = None, extensions: Iterable[Any] = (), components: Iterable[Any] = ()) -> SummerContext:
+        config = _merge({"logging": {"level": "WARNING"}}, configuration or {})
+        config_file = tmp_path / f"config{len(contexts)}.json"
+        config_file.write_text(json.dumps(config))
+        context = _create_context(str(config_file), extensions, components)
+        # contexts failing to initialize are bound to their configuration as well
+        contexts.append(context)
+        context.initialize()
+        return context
+
+    yield create
+    for context in contexts:
+        context.pre_destroy()
+        _remove_configuration_binding(context)
+    # all entities share the proxy of BaseModel, the next test binds it to its own database
+    BaseModel._meta.database.initialize(None)
+
+
+@pytest.fixture
+def database_context(summer_context, tmp_path) -> Callable[..., SummerContext]:
+    """builds contexts with the database extension on the SQLite file test.db in tmp_path"""
+    def create(configuration: Dict[str, Any] = None, extensions: Iterable[Any] = (), components: Iterable[Any] = ()) -> SummerContext:
+        config = _merge({"database": {"type": "sqlite", "filename": str(tmp_path / "test.db")}}, configuration or {})
+        return summer_context(config, [DatabaseContextExtension(), *extensions], components)
+    return create
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from peewee import CharField
+
+from summer.database.async_entities import AsyncEntityAccess, _LanePool
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+
+
+class Book(BaseModel):
+    title = CharField()
+
+
+def _access(database_context) -> AsyncEntityAccess:
+    context = database_context({"database": {"async": {"workers": 2}}})
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Book])
+    return context.get_bean(AsyncEntityAccess)
+
+
+def test_get_select_and_insert_many(database_context):
+    access = _access(database_context)
+
+    async def run():
+        inserted = await access.insert_many(Book, [{"title": "a"}, Book(title="b"), {"title": "c"}], batch_size=2)
+        book = await access.get(Book, Book.title == "b")
+        titles = [b.title for b in await access.select(Book.select().where(Book.title != "b").order_by(Book.title))]
+        return inserted, book.title, titles
+
+    assert asyncio.run(run()) == (3, "b", ["a", "c"])
+
+
+def test_transaction_commits_on_exit(database_context):
+    access = _access(database_context)
+
+    async def run():
+        async with access.transaction() as transaction:
+            await transaction.execute(Book.create, title="a")
+            await transaction.execute(Book.create, title="b")
+        return await access.execute(Book.select().count)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_transaction_rolls_back_on_error(database_context):
+    access = _access(database_context)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with access.transaction() as transaction:
+                await transaction.execute(Book.create, title="a")
+                raise RuntimeError("failed")
+        return await access.execute(Book.select().count)
+
+    assert asyncio.run(run()) == 0
+
+
+def test_waiting_coroutines_get_lanes_in_order():
+    pool = _LanePool(["lane"])
+    order = []
+
+    async def wait(name: str):
+        lane = await pool.acquire()
+        order.append(name)
+        await asyncio.sleep(0)
+        pool.release(lane)
+
+    async def run():
+        lane = await pool.acquire()
+        waiters = []
+        for name in ("first", "second", "third"):
+            waiters.append(asyncio.create_task(wait(name)))
+            await asyncio.sleep(0)
+        pool.release(lane)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+    assert order == ["first", "second", "third"]
+
+
+@pytest.mark.parametrize("release_before_cancel", [False, True])
+def test_cancelled_acquire_does_not_keep_the_lane(release_before_cancel: bool):
+    pool = _LanePool(["lane"])
+
+    async def run():
+        lane = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        if release_before_cancel:
+            # the lane is handed over to the waiter, which is cancelled before it resumes
+            pool.release(lane)
+            waiter.cancel()
+        else:
+            waiter.cancel()
+            await asyncio.sleep(0)
+            pool.release(lane)
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await asyncio.wait_for(pool.acquire(), 1.0)
+
+    assert asyncio.run(run()) == "lane"
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from summer.scheduler.async_runner import AsyncTaskRunner
+from summer.scheduler.executor import BoundedExecutor
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def runner():
+    runners = []
+
+    def create(overflow_policy: str) -> AsyncTaskRunner:
+        runners.append(AsyncTaskRunner(max_concurrency=1, queue_size=1, overflow_policy=overflow_policy))
+        return runners[-1]
+
+    yield create
+    for created in runners:
+        created.shutdown(5.0)
+
+
+def _submit_all(runner: AsyncTaskRunner):
+    """the first coroutine blocks the only slot until the returned event is set, the second one waits"""
+    release = threading.Event()
+    events = []
+
+    async def blocking():
+        events.append("blocking")
+        await asyncio.to_thread(release.wait)
+
+    def coroutine(name: str):
+        async def run():
+            events.append(name)
+        return run
+
+    assert runner.submit(blocking)
+    _wait_for(lambda: runner.active == 1)
+    runner.submit(coroutine("waiting"), on_discard=lambda: events.append("waiting discarded"))
+    accepted = runner.submit(coroutine("new"), on_discard=lambda: events.append("new discarded"))
+    release.set()
+    _wait_for(lambda: runner.active == 0 and runner.queued == 0)
+    return accepted, events
+
+
+def test_discard_oldest_discards_the_waiting_coroutine(runner):
+    discard_oldest = runner(BoundedExecutor.DISCARD_OLDEST)
+    accepted, events = _submit_all(discard_oldest)
+
+    assert accepted
+    assert events == ["blocking", "waiting discarded", "new"]
+    assert discard_oldest.discarded == 1
+    # the discarded coroutine handed its capacity to the new one, none is lost
+    assert discard_oldest._capacity._value == 2
+
+
+def test_discard_discards_the_new_coroutine(runner):
+    accepted, events = _submit_all(runner(BoundedExecutor.DISCARD))
+
+    assert not accepted
+    assert events == ["blocking", "new discarded", "waiting"]
+
+
+def test_unknown_overflow_policy_is_refused():
+    with pytest.raises(ValueError):
+        AsyncTaskRunner(overflow_policy="discard_newest")
@@ -0,0 +1,73 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from summer.autowire.exceptions import ValidationError
+from summer.scheduler.cron import CronExpression
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+@pytest.mark.parametrize("expression, attribute, expected", [
+    ("*/15 * * * *", "minutes", [0, 15, 30, 45]),
+    ("5/20 * * * *", "minutes", [5, 25, 45]),
+    ("0 9-17/4 * * *", "hours", [9, 13, 17]),
+    ("0 0 1,15,31 * *", "days", [1, 15, 31]),
+    ("0 0 * jan,JUL-aug *", "months", [1, 7, 8]),
+    ("0 0 * * mon-fri", "weekdays", {0, 1, 2, 3, 4}),
+    ("0 0 * * 0,7", "weekdays", {6}),
+    ("@hourly", "minutes", [0]),
+    ("@weekly", "weekdays", {6}),
+])
+def test_fields_are_parsed(expression: str, attribute: str, expected):
+    values = getattr(CronExpression(expression), attribute)
+
+    assert (set(values) if isinstance(expected, set) else values) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "",
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "*/x * * * *",
+    "5-1 * * * *",
+    "x * * * *",
+    "* * * foo *",
+    "@sometimes",
+])
+def test_invalid_expressions_are_refused(expression: str):
+    with pytest.raises(ValidationError):
+        CronExpression(expression)
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("30 9 * * *", datetime.datetime(2026, 1, 1, 9, 30, tzinfo=BERLIN), datetime.datetime(2026, 1, 2, 9, 30, tzinfo=BERLIN)),
+    ("0 0 29 2 *", datetime.datetime(2026, 1, 1, tzinfo=BERLIN), datetime.datetime(2028, 2, 29, tzinfo=BERLIN)),
+    # either day field matches when both are restricted
+    ("0 0 13 * fri", datetime.datetime(2026, 2, 1, tzinfo=BERLIN), datetime.datetime(2026, 2, 6, tzinfo=BERLIN)),
+])
+def test_next_after(expression: str, after: datetime.datetime, expected: datetime.datetime):
+    assert CronExpression(expression, "Europe/Berlin").next_after(after) == expected
+
+
+@pytest.mark.parametrize("expression, after, expected_utc", [
+    # 02:00 to 03:00 does not exist on 2026-03-29, the times in between are skipped
+    ("30 2 * * *", datetime.datetime(2026, 3, 28, 3, 0, tzinfo=BERLIN), datetime.datetime(2026, 3, 30, 0, 30)),
+    ("0 * * * *", datetime.datetime(2026, 3, 29, 1, 30, tzinfo=BERLIN), datetime.datetime(2026, 3, 29, 1, 0)),
+    # 02:00 to 03:00 happens twice on 2026-10-25, the times in between fire once
+    ("30 2 * * *", datetime.datetime(2026, 10, 25, 0, 0, tzinfo=BERLIN), datetime.datetime(2026, 10, 25, 0, 30)),
+    ("30 2 * * *", datetime.datetime(2026, 10, 25, 0, 30, tzinfo=datetime.timezone.utc), datetime.datetime(2026, 10, 26, 1, 30)),
+    ("0 * * * *", datetime.datetime(2026, 10, 25, 0, 0, tzinfo=datetime.timezone.utc), datetime.datetime(2026, 10, 25, 2, 0)),
+])
+def test_next_after_across_daylight_saving_transitions(expression: str, after: datetime.datetime,
+                                                        expected_utc: datetime.datetime):
+    next_time = CronExpression(expression, "Europe/Berlin").next_after(after)
+
+    assert next_time.astimezone(datetime.timezone.utc).replace(tzinfo=None) == expected_utc
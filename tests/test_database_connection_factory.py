@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+from typing import List, Tuple
+
+from peewee import CharField, ForeignKeyField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.scheduler.scheduler_context import SummerSchedulerContextExtension
+
+
+class Note(BaseModel):
+    text = CharField()
+
+
+def test_background_initialization_keeps_an_in_memory_database(database_context):
+    context = database_context({"database": {"filename": ":memory:"}})
+    connection_factory = context.get_bean(DatabaseConnectionFactory)
+    initialized = []
+
+    connection_factory.initialize_in_background([Note], lambda: initialized.append(True))
+    connection_factory.wait_until_ready(5.0)
+
+    Note.create(text="kept")
+    assert initialized == [True]
+    assert [note.text for note in Note.select()] == ["kept"]
+
+
+def test_background_initialization_of_a_database_file(database_context):
+    context = database_context()
+    connection_factory = context.get_bean(DatabaseConnectionFactory)
+
+    connection_factory.initialize_in_background([Note], lambda: None)
+    connection_factory.wait_until_ready(5.0)
+
+    Note.create(text="written")
+    assert [note.text for note in Note.select()] == ["written"]
+
+
+def _pooled_context(database_context, tmp_path):
+    pool = {"max_connections": 2, "wait_timeout": 1}
+    replica = str(tmp_path / "replica.db")
+    connection = sqlite3.connect(replica)
+    connection.execute("CREATE TABLE note (id INTEGER PRIMARY KEY, text VARCHAR(255) NOT NULL)")
+    connection.close()
+    scheduler = SummerSchedulerContextExtension(None)
+    context = database_context({"database": {"pool": pool, "replicas": [{"filename": replica, "pool": pool}]}},
+                               extensions=[scheduler])
+    scheduler.bean_context = context
+    connection_factory = context.get_bean(DatabaseConnectionFactory)
+    connection_factory.bind_entities([Note])
+    return connection_factory, scheduler
+
+
+def test_pool_statistics(database_context, tmp_path):
+    connection_factory, _ = _pooled_context(database_context, tmp_path)
+    # the thread which created the tables keeps its connection
+    before = connection_factory.get_pool_statistics()
+    during = []
+
+    def check_out():
+        with connection_factory.connection():
+            during.append(connection_factory.get_pool_statistics())
+
+    thread = threading.Thread(target=check_out)
+    thread.start()
+    thread.join()
+
+    after = connection_factory.get_pool_statistics()
+    assert connection_factory.is_pooled()
+    assert before.max_connections == 2
+    assert (before.in_use, during[0].in_use, after.in_use) == (1, 2, 1)
+    assert (during[0].checkouts, after.idle) == (before.checkouts + 1, before.idle + 1)
+
+
+def test_scheduled_tasks_return_their_connections_to_the_pools(database_context, tmp_path):
+    connection_factory, scheduler = _pooled_context(database_context, tmp_path)
+    replica = connection_factory.get_routing_database().replicas[0]
+    in_use = connection_factory.get_pool_statistics().in_use
+    run_thread = scheduler.get_background_job()
+    thread = threading.Thread(target=run_thread.run)
+    thread.start()
+
+    def task():
+        Note.create(text="primary")
+        return [note.text for note in Note.select()]
+
+    try:
+        # the read goes to the empty replica
+        assert scheduler.schedule_in(task, 0.0).get_result_future().result(5.0) == []
+    finally:
+        run_thread.stop()
+        thread.join()
+
+    assert connection_factory.get_pool_statistics().in_use == in_use
+    assert replica.get_pool_statistics().checkouts == 1
+    assert replica.get_pool_statistics().in_use == 0
+
+
+class Author(BaseModel):
+    name = CharField()
+
+
+class Post(BaseModel):
+    author = ForeignKeyField(Author)
+    reviewer = ForeignKeyField(Author, null=True)
+
+
+class Comment(BaseModel):
+    post = ForeignKeyField(Post)
+
+
+def _record_created_tables(monkeypatch, database) -> List[Tuple[str, bool]]:
+    """the created tables, with whether they were created in a transaction"""
+    created = []
+    execute_sql = database.execute_sql
+
+    def record(sql, params=None, *args, **kwargs):
+        if sql.startswith("CREATE TABLE"):
+            created.append((sql.split('"')[1], database.in_transaction()))
+        return execute_sql(sql, params, *args, **kwargs)
+
+    monkeypatch.setattr(database, "execute_sql", record)
+    return created
+
+
+def test_tables_are_created_in_dependency_order_in_one_transaction(database_context, monkeypatch):
+    connection_factory = database_context().get_bean(DatabaseConnectionFactory)
+    created = _record_created_tables(monkeypatch, connection_factory.get_database())
+
+    connection_factory.bind_entities([Comment, Post, Author])
+
+    assert created == [("author", True), ("post", True), ("comment", True)]
+
+
+def test_existing_tables_are_not_created_again(database_context, monkeypatch):
+    connection_factory = database_context().get_bean(DatabaseConnectionFactory)
+    connection_factory.bind_entities([Author])
+    created = _record_created_tables(monkeypatch, connection_factory.get_database())
+
+    connection_factory.bind_entities([Post, Author])
+    connection_factory.bind_entities([Post, Author])
+
+    assert created == [("post", True)]
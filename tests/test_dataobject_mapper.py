@@ -0,0 +1,44 @@
+import dataclasses
+from typing import List
+
+import pytest
+
+from summer.util.dataobject_mapper import DataObjectMapper, DeserialisationError, DeserialisationMode
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int = 0
+    labels: List[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class Scaled:
+    value: int
+
+    def __init__(self, value: int) -> None:
+        self.value = value * 10
+
+
+@pytest.fixture
+def mapper() -> DataObjectMapper:
+    return DataObjectMapper([], [])
+
+
+def test_trusted_mode_applies_defaults(mapper):
+    point = mapper.deserialize({"x": 1}, Point, DeserialisationMode.TRUSTED)
+
+    assert point == Point(1)
+    assert point.labels is not mapper.deserialize({"x": 2}, Point, DeserialisationMode.TRUSTED).labels
+
+
+def test_trusted_mode_calls_a_custom_init(mapper):
+    assert mapper.deserialize({"value": 2}, Scaled, DeserialisationMode.TRUSTED).value == 20
+
+
+def test_strict_mode_reports_all_field_errors(mapper):
+    with pytest.raises(DeserialisationError) as error:
+        mapper.deserialize({"x": "one", "labels": [1]}, Point, DeserialisationMode.STRICT)
+
+    assert [field_error.path for field_error in error.value.errors] == ["$.x", "$.labels[0]"]
@@ -0,0 +1,130 @@
+import threading
+
+from peewee import CharField, ForeignKeyField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.database import entity_cache
+from summer.database.entity_cache import CacheStatistics, EntityCache
+
+
+class Setting(BaseModel):
+    value = CharField()
+
+
+class Override(BaseModel):
+    setting = ForeignKeyField(Setting)
+    value = CharField()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _cache(database_context, configuration=None) -> EntityCache:
+    context = database_context(configuration)
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Setting, Override])
+    return context.get_bean(EntityCache)
+
+
+def _read_in_other_thread(cache: EntityCache, pk) -> str:
+    values = []
+    thread = threading.Thread(target=lambda: values.append(cache.get_by_id(Setting, pk).value))
+    thread.start()
+    thread.join()
+    return values[0]
+
+
+def test_writes_in_transactions_invalidate_on_commit(database_context):
+    cache = _cache(database_context)
+    setting = Setting.create(value="old")
+
+    with Setting._meta.database.atomic():
+        Setting.update(value="new").where(Setting.id == setting.id).execute()
+        # another connection still reads and caches the committed row
+        assert _read_in_other_thread(cache, setting.id) == "old"
+
+    assert cache.get_by_id(Setting, setting.id).value == "new"
+
+
+def test_writes_in_rolled_back_transactions_do_not_invalidate(database_context):
+    cache = _cache(database_context)
+    setting = Setting.create(value="old")
+    assert cache.get_by_id(Setting, setting.id).value == "old"
+    invalidations = cache.get_statistics().invalidations
+
+    with Setting._meta.database.atomic() as transaction:
+        Setting.update(value="new").where(Setting.id == setting.id).execute()
+        transaction.rollback()
+
+    assert cache.get_statistics().invalidations == invalidations
+    assert cache.get_by_id(Setting, setting.id).value == "old"
+
+
+def test_entries_expire_after_the_ttl(database_context, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(entity_cache, "time", clock)
+    cache = _cache(database_context, {"database": {"cache": {"ttl": 10.0}}})
+    setting = Setting.create(value="old")
+    cache.get_by_id(Setting, setting.id)
+    # raw SQL is not noticed, so only the expiry reveals the new value
+    Setting._meta.database.execute_sql("UPDATE setting SET value = 'new'")
+
+    clock.now += 9
+    assert cache.get_by_id(Setting, setting.id).value == "old"
+    clock.now += 2
+    assert cache.get_by_id(Setting, setting.id).value == "new"
+
+    assert cache.get_statistics() == CacheStatistics(size=1, hits=1, misses=2, evictions=0, expirations=1, invalidations=0)
+
+
+def test_least_recently_used_entries_are_evicted(database_context):
+    cache = _cache(database_context, {"database": {"cache": {"size": 2}}})
+    first, second, third = (Setting.create(value=value) for value in ("1", "2", "3"))
+
+    cache.get_by_id(Setting, first.id)
+    cache.get_by_id(Setting, second.id)
+    cache.get_by_id(Setting, first.id)
+    cache.get_by_id(Setting, third.id)
+    statistics = cache.get_statistics()
+    cache.get_by_id(Setting, first.id)
+    cache.get_by_id(Setting, second.id)
+
+    assert (statistics.size, statistics.hits, statistics.misses, statistics.evictions) == (2, 1, 3, 1)
+    assert (cache.get_statistics().hits, cache.get_statistics().misses) == (2, 4)
+
+
+def test_select_results_are_cached_by_sql_and_parameters(database_context):
+    cache = _cache(database_context)
+    Setting.create(value="a")
+    Setting.create(value="b")
+
+    def values(value: str):
+        return [setting.value for setting in cache.select(Setting.select().where(Setting.value == value))]
+
+    assert values("a") == ["a"]
+    assert values("a") == ["a"]
+    assert values("b") == ["b"]
+    Setting.create(value="a")
+    assert values("a") == ["a", "a"]
+
+    statistics = cache.get_statistics()
+    assert (statistics.hits, statistics.misses, statistics.invalidations) == (1, 3, 2)
+    assert statistics.hit_rate == 0.25
+
+
+def test_select_results_are_invalidated_by_writes_to_joined_entities(database_context):
+    cache = _cache(database_context)
+    setting = Setting.create(value="default")
+    Override.create(setting=setting, value="first")
+    query = Setting.select(Setting.value, Override.value.alias("override")).join(Override).dicts()
+
+    assert cache.select(query) == [{"value": "default", "override": "first"}]
+    Override.update(value="second").execute()
+
+    assert cache.select(query) == [{"value": "default", "override": "second"}]
+    assert cache.get_statistics().invalidations == 1
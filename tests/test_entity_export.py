@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import sqlite3
+import uuid
+
+from peewee import CharField, IntegerField, UUIDField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.database.entity_export import EntityExporter
+
+
+class Measurement(BaseModel):
+    sensor = CharField()
+    value = IntegerField()
+
+
+class Device(BaseModel):
+    id = UUIDField(primary_key=True)
+    name = CharField()
+
+
+def _exporter(database_context, configuration=None) -> EntityExporter:
+    context = database_context(configuration)
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Measurement, Device])
+    return context.get_bean(EntityExporter)
+
+
+def _create_measurements(count: int):
+    Measurement.insert_many([{"sensor": f"s{i % 3}", "value": i} for i in range(count)]).execute()
+
+
+def test_integer_keys_are_exported_in_chunks(database_context):
+    exporter = _exporter(database_context)
+    _create_measurements(25)
+
+    chunks = list(exporter.iter_chunks(Measurement, chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [row[0] for chunk in chunks for row in chunk] == list(range(1, 26))
+
+
+def test_uuid_keys_are_exported_in_key_order(database_context):
+    exporter = _exporter(database_context)
+    ids = [uuid.uuid4() for _ in range(7)]
+    Device.insert_many([{"id": device_id, "name": str(i)} for i, device_id in enumerate(ids)]).execute()
+
+    rows = list(exporter.iter_rows(Device, chunk_size=3))
+
+    assert [row[0] for row in rows] == sorted(ids, key=lambda device_id: device_id.hex)
+
+
+def test_where_and_field_subsets_without_the_primary_key(database_context):
+    exporter = _exporter(database_context)
+    _create_measurements(30)
+
+    rows = list(exporter.iter_rows(Measurement, fields=[Measurement.value], where=Measurement.sensor == "s1",
+                                   as_dicts=True, chunk_size=4))
+
+    assert rows == [{"value": value} for value in range(1, 30, 3)]
+
+
+def test_csv_round_trip(database_context):
+    exporter = _exporter(database_context)
+    _create_measurements(12)
+    target = io.StringIO()
+
+    count = exporter.to_csv(Measurement, target, fields=[Measurement.sensor, Measurement.value], chunk_size=5)
+
+    rows = list(csv.reader(io.StringIO(target.getvalue())))
+    assert count == 12
+    assert rows[0] == ["sensor", "value"]
+    assert rows[1:] == [[f"s{i % 3}", str(i)] for i in range(12)]
+
+
+def test_json_lines_round_trip(database_context, tmp_path):
+    exporter = _exporter(database_context)
+    device_id = uuid.uuid4()
+    Device.create(id=device_id, name="sensor")
+    target = tmp_path / "devices.jsonl"
+
+    count = exporter.to_json_lines(Device, str(target))
+
+    assert count == 1
+    assert [json.loads(line) for line in target.read_text().splitlines()] == [{"id": str(device_id), "name": "sensor"}]
+
+
+def test_chunks_are_read_from_the_primary(database_context, tmp_path):
+    replica = str(tmp_path / "replica.db")
+    connection = sqlite3.connect(replica)
+    connection.execute("CREATE TABLE measurement (id INTEGER PRIMARY KEY, sensor VARCHAR(255) NOT NULL, value INTEGER NOT NULL)")
+    connection.close()
+    exporter = _exporter(database_context, {"database": {"replicas": [{"filename": replica}]}})
+    _create_measurements(5)
+
+    assert len(list(exporter.iter_rows(Measurement, chunk_size=2))) == 5
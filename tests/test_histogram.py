@@ -0,0 +1,35 @@
+from summer.scheduler.scheduler_metrics import SchedulerMetricsRecorder, format_metrics
+from summer.util.histogram import OTHER, HistogramRecorder, get_bounded
+
+
+def test_quantiles_are_bucket_bounds():
+    recorder = HistogramRecorder((0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 3.0):
+        recorder.add(seconds)
+
+    histogram = recorder.snapshot()
+
+    assert histogram.buckets == [2, 1, 1]
+    assert histogram.mean_seconds == 0.9
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == 3.0
+
+
+def test_keys_beyond_the_limit_share_the_other_value():
+    values = {}
+    for key in ("a", "b", "c", "d"):
+        get_bounded(values, key, 2, list).append(key)
+
+    assert values == {"a": ["a"], "b": ["b"], OTHER: ["c", "d"]}
+
+
+def test_scheduler_metrics_are_formatted_with_their_buckets():
+    recorder = SchedulerMetricsRecorder(max_tasks=1)
+    recorder.record_run("job", 0.002, failed=False)
+    recorder.record_run("other job", 0.002, failed=True)
+
+    text = format_metrics(recorder.get_task_metrics(), {})
+
+    assert 'summer_scheduler_task_duration_seconds_bucket{task="job",le="0.005"} 1' in text
+    assert f'summer_scheduler_task_runs_total{{task="{OTHER}",outcome="failure"}} 1' in text
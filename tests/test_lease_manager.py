@@ -0,0 +1,113 @@
+import json
+import multiprocessing
+import os
+import time
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.lease_manager import Lease, LeaseManager
+from summer.scheduler.process_runner import ProcessTaskRunner
+from tests.conftest import build_context
+
+
+def _write_config(tmp_path, duration: float) -> str:
+    config_file = tmp_path / "lease.json"
+    config_file.write_text(json.dumps({
+        "logging": {"level": "WARNING"},
+        "database": {"type": "sqlite", "filename": str(tmp_path / "test.db"),
+                     "leases": {"duration": duration, "heartbeat": duration / 3}}}))
+    return str(config_file)
+
+
+def _compete(config_file: str, name: str, start: float, results):
+    """runs in a spawned process with its own context"""
+    from summer.database.database_context_extension import DatabaseContextExtension
+    context = build_context(config_file, [DatabaseContextExtension()])
+    leases = context.get_bean(LeaseManager)
+    time.sleep(max(start - time.time(), 0))
+    acquired = leases.try_acquire(name)
+    results.put((os.getpid(), acquired))
+    results.close()
+    results.join_thread()
+    # exits without destroying the context, so the lease is not released, like on a crashed node
+    os._exit(0)
+
+
+def _run_competitors(config_file: str, count: int):
+    spawn = multiprocessing.get_context("spawn")
+    results = spawn.Queue()
+    start = time.time() + 2.0
+    processes = [spawn.Process(target=_compete, args=(config_file, "job", start, results)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=30) for _ in processes]
+    return processes, outcomes
+
+
+def test_one_of_several_processes_acquires_the_lease(database_context, tmp_path):
+    # the schema exists before the nodes start, switching a new SQLite file to WAL fails on concurrent connections
+    database_context()
+    config_file = _write_config(tmp_path, 30.0)
+    processes, outcomes = _run_competitors(config_file, 4)
+    for process in processes:
+        process.join(30)
+
+    assert sum(1 for _, acquired in outcomes if acquired) == 1
+
+
+def test_expired_and_released_leases_are_taken_over(database_context, tmp_path):
+    context = database_context({"database": {"leases": {"duration": 0.5, "heartbeat": 10.0}}})
+    connection_factory = context.get_bean(DatabaseConnectionFactory)
+    first = context.get_bean(LeaseManager)
+    # a second node sharing the database
+    second = LeaseManager(connection_factory)
+    second._duration = 0.5
+
+    assert first.try_acquire("job")
+    assert not second.try_acquire("job")
+    assert first.try_acquire("job")
+
+    time.sleep(0.6)
+    assert second.try_acquire("job")
+    assert not first.try_acquire("job")
+
+    second.release("job")
+    assert first.try_acquire("job")
+    assert Lease.get_by_id("job").owner == first.owner
+
+
+def test_lease_is_taken_over_after_a_process_died(database_context, tmp_path):
+    config_file = _write_config(tmp_path, 0.5)
+    # the winner dies while holding the lease
+    processes, outcomes = _run_competitors(config_file, 1)
+    processes[0].join(30)
+    assert outcomes[0][1]
+
+    leases = database_context({"database": {"leases": {"duration": 0.5}}}).get_bean(LeaseManager)
+    deadline = time.time() + 5.0
+    while not leases.try_acquire("job"):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    assert Lease.get_by_id("job").owner == leases.owner
+
+
+class _Coordinator:
+    def __init__(self, acquired: bool) -> None:
+        self.acquired = acquired
+        self.names = []
+
+    def try_acquire(self, name: str) -> bool:
+        self.names.append(name)
+        return self.acquired
+
+
+def test_process_jobs_use_the_lease_of_the_scheduling_process():
+    runner = ProcessTaskRunner()
+    runner.cluster_coordinator = _Coordinator(False)
+    outcomes = []
+
+    runner.submit(("tests.test_lease_manager", "_compete", "job"), lambda *outcome: outcomes.append(outcome))
+
+    # another node holds the lease, the pool is not even started
+    assert runner.cluster_coordinator.names == ["job"]
+    assert outcomes == [(None, None, None)]
+    assert runner._pool is None
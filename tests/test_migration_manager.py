@@ -0,0 +1,151 @@
+import logging
+import sqlite3
+
+import pytest
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import DatabaseException
+from summer.database.migration import Migration
+from summer.database.migration_manager import Migration as AppliedMigration, MigrationManager
+
+
+class M1(Migration):
+    def name(self) -> str:
+        return "1"
+
+    def migrate(self, db, migrator):
+        pass
+
+
+class M2(Migration):
+    def name(self) -> str:
+        return "2"
+
+    def migrate(self, db, migrator):
+        db.execute_sql("CREATE TABLE foo (a INTEGER)")
+
+
+class M3(Migration):
+    def name(self) -> str:
+        return "3"
+
+    def migrate(self, db, migrator):
+        db.execute_sql("CREATE TABLE bar (a INTEGER)")
+
+
+class FailingM3(Migration):
+    def name(self) -> str:
+        return "3"
+
+    def migrate(self, db, migrator):
+        db.execute_sql("CREATE TABLE bar (a INTEGER)")
+        raise RuntimeError("migration failed halfway")
+
+
+def _create_baseline_database(filename: str, applied_name: str):
+    """the migration table as created by versions without checksums"""
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE migration (id VARCHAR(40) PRIMARY KEY, name VARCHAR(255), applied DATETIME)")
+    connection.execute("INSERT INTO migration VALUES ('fadf076352544d0ca9de2343507e6da3', ?, '2020-01-01 00:00:00')", (applied_name,))
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def baseline_database(tmp_path):
+    def create(applied_name: str):
+        _create_baseline_database(str(tmp_path / "test.db"), applied_name)
+    return create
+
+
+def _tables(context) -> list:
+    return context.get_bean(DatabaseConnectionFactory).get_database().get_tables()
+
+
+def test_new_database_is_on_latest_migration(database_context):
+    context = database_context(components=[M1, M2])
+
+    assert "foo" not in _tables(context)
+    assert [row.name for row in AppliedMigration.select()] == ["2"]
+
+
+def test_dry_run_on_baseline_table(database_context, baseline_database):
+    baseline_database(repr(M1().name))
+    context = database_context({"database": {"migrations": {"dry_run": True}}}, components=[M1, M2])
+
+    results = context.get_bean(MigrationManager).run_migrations()
+
+    assert [result.name for result in results] == ["2"]
+    assert not any(result.applied for result in results)
+    assert "foo" not in _tables(context)
+    database = context.get_bean(DatabaseConnectionFactory).get_database()
+    assert "checksum" not in {column.name for column in database.get_columns("migration")}
+
+
+def test_legacy_name_is_mapped_to_its_migration(database_context, baseline_database):
+    baseline_database(repr(M1().name))
+    context = database_context(components=[M1, M2])
+
+    assert "foo" in _tables(context)
+    assert sorted(row.name for row in AppliedMigration.select()) == ["1", "2"]
+    assert context.get_bean(MigrationManager).run_migrations() == []
+
+
+def test_unknown_applied_migrations_are_refused(database_context, baseline_database):
+    baseline_database("unknown")
+
+    with pytest.raises(DatabaseException):
+        database_context(components=[M1, M2])
+
+
+
+def _file_tables(tmp_path) -> set:
+    connection = sqlite3.connect(str(tmp_path / "test.db"))
+    try:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        connection.close()
+
+
+def test_failing_migration_rolls_back_its_batch(database_context, baseline_database, tmp_path):
+    baseline_database("1")
+
+    with pytest.raises(RuntimeError):
+        database_context(components=[M1, M2, FailingM3])
+
+    assert not {"foo", "bar"} & _file_tables(tmp_path)
+    connection = sqlite3.connect(str(tmp_path / "test.db"))
+    assert [row[0] for row in connection.execute("SELECT name FROM migration")] == ["1"]
+    connection.close()
+
+
+def test_changed_migrations_are_reported(database_context, caplog):
+    context = database_context(components=[M1, M2])
+    AppliedMigration.update(checksum="changed").where(AppliedMigration.name == "2").execute()
+
+    with caplog.at_level(logging.WARNING):
+        assert context.get_bean(MigrationManager).run_migrations() == []
+
+    assert 'Migration "2" has been changed after it has been applied' in caplog.text
+
+
+def test_migrations_before_the_first_applied_one_are_not_reported(database_context, caplog):
+    with caplog.at_level(logging.WARNING):
+        context = database_context(components=[M1, M2, M3])
+        context.get_bean(MigrationManager).run_migrations()
+
+    assert [row.name for row in AppliedMigration.select()] == ["3"]
+    assert "will not be applied" not in caplog.text
+
+
+def test_skipped_migrations_between_applied_ones_are_reported(database_context, baseline_database, caplog):
+    baseline_database("1")
+    context = database_context(components=[M1, M3])
+    AppliedMigration.delete().execute()
+    AppliedMigration.insert_many([{"name": "1", "applied": "2020-01-01"}, {"name": "3", "applied": "2020-01-02"}]).execute()
+    manager = MigrationManager([M1(), M2(), M3()], context.get_bean(DatabaseConnectionFactory))
+
+    with caplog.at_level(logging.WARNING):
+        assert manager.run_migrations() == []
+
+    assert 'Migration "2" is older than the latest applied migration "3" and will not be applied' in caplog.text
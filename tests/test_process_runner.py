@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from peewee import IntegerField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.database.migration_manager import Migration as AppliedMigration
+from summer.scheduler.process_runner import ProcessTaskRunner
+
+
+class Counter(BaseModel):
+    value = IntegerField()
+
+
+def _job() -> int:
+    return 1
+
+
+def _crash():
+    os._exit(1)
+
+
+def test_worker_contexts_neither_create_tables_nor_migrate(database_context):
+    context = database_context({"database": {"manage_schema": False}})
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Counter])
+
+    assert context.get_bean(DatabaseConnectionFactory).get_database().get_tables() == []
+    assert not AppliedMigration.table_exists()
+
+
+def test_pool_is_restarted_for_modules_registered_later():
+    runner = ProcessTaskRunner(max_workers=1)
+    try:
+        reference = runner.register(_job)
+        first = runner._get_pool()
+        assert runner._get_pool() is first
+
+        runner.register(test_pool_is_restarted_for_modules_registered_later)
+        assert runner._get_pool() is first
+
+        runner.register(ProcessTaskRunner.register)
+        second = runner._get_pool()
+        assert second is not first
+        assert runner._pool_modules == {__name__, "summer.scheduler.process_runner"}
+        assert reference == (__name__, "_job")
+    finally:
+        runner.shutdown()
+
+
+def test_pool_is_replaced_after_a_worker_died(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"logging": {"level": "WARNING"}}))
+    runner = ProcessTaskRunner(max_workers=1, configuration_files=[str(config_file)])
+    outcomes = []
+    finished = threading.Semaphore(0)
+
+    def on_done(duration, result, error):
+        outcomes.append((result, type(error).__name__ if error is not None else None))
+        finished.release()
+
+    try:
+        runner.submit((__name__, "_crash", None), on_done)
+        assert finished.acquire(timeout=60)
+        runner.submit((__name__, "_job", None), on_done)
+        assert finished.acquire(timeout=60)
+    finally:
+        runner.shutdown()
+
+    assert outcomes == [(None, "BrokenProcessPool"), (1, None)]
@@ -0,0 +1,39 @@
+from peewee import CharField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.database.query_statistics import QueryStatistics
+
+
+class Event(BaseModel):
+    name = CharField()
+
+
+def _statistics(database_context, **configuration) -> QueryStatistics:
+    context = database_context({"database": {"statistics": configuration}})
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Event])
+    statistics = context.get_bean(QueryStatistics)
+    statistics.reset()
+    return statistics
+
+
+def test_every_nth_statement_is_sampled(database_context):
+    statistics = _statistics(database_context, sample_rate=0.25)
+
+    for i in range(8):
+        Event.create(name=str(i))
+
+    [insert] = statistics.get_statistics()
+    assert insert.fingerprint.startswith('INSERT INTO "event"')
+    assert insert.count == 2
+    assert insert.rows == 2
+
+
+def test_slow_queries_are_logged_regardless_of_the_sample(database_context):
+    statistics = _statistics(database_context, sample_rate=0.0, slow_threshold=0.0)
+
+    Event.create(name="slow")
+
+    assert statistics.get_statistics() == []
+    [slow_query] = statistics.get_slow_queries()
+    assert slow_query.params == ("slow",)
@@ -0,0 +1,59 @@
+import sqlite3
+
+from peewee import CharField
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+
+
+class Item(BaseModel):
+    name = CharField()
+
+
+def _create_replica(filename: str, name: str):
+    """replicas are plain files here, each holds a row telling where a read went"""
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL)")
+    connection.execute("INSERT INTO item (name) VALUES (?)", (name,))
+    connection.commit()
+    connection.close()
+
+
+def _routed_context(database_context, tmp_path, replica_selection: str = "round_robin"):
+    replicas = []
+    for name in ("replica1", "replica2"):
+        filename = str(tmp_path / f"{name}.db")
+        _create_replica(filename, name)
+        replicas.append({"filename": filename})
+    context = database_context({"database": {"replicas": replicas, "replica_selection": replica_selection}})
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Item])
+    return context
+
+
+def _read() -> str:
+    return Item.select().get().name
+
+
+def test_reads_are_routed_to_the_replicas_in_turn(database_context, tmp_path):
+    _routed_context(database_context, tmp_path)
+
+    Item.create(name="primary")
+
+    assert sorted(_read() for _ in range(4)) == ["replica1", "replica1", "replica2", "replica2"]
+
+
+def test_transactions_and_primary_reads_use_the_primary(database_context, tmp_path):
+    context = _routed_context(database_context, tmp_path)
+    Item.create(name="primary")
+
+    with Item._meta.database.atomic():
+        assert _read() == "primary"
+    with context.get_bean(DatabaseConnectionFactory).read_from_primary():
+        assert _read() == "primary"
+
+
+def test_least_busy_selection_reads_from_an_idle_replica(database_context, tmp_path):
+    _routed_context(database_context, tmp_path, "least_busy")
+
+    assert _read() == "replica1"
+    assert _read() == "replica1"
@@ -0,0 +1,59 @@
+import datetime
+from typing import List, Optional, Tuple
+
+import pytest
+
+from summer.scheduler.scheduled_task import Misfire, StartRegularilyTask
+
+
+class _StubScheduler:
+    """records the reschedulings instead of queueing the task"""
+
+    def __init__(self, misfire_policy: str = Misfire.FIRE_ONCE) -> None:
+        self.misfire_policy = misfire_policy
+        self.scheduled: List[float] = []
+
+    def schedule_task_due(self, task: StartRegularilyTask, due: float) -> StartRegularilyTask:
+        task.due = due
+        self.scheduled.append(due)
+        return task
+
+
+def _task(misfire: Optional[str], scheduler_policy: str = Misfire.FIRE_ONCE) -> Tuple[StartRegularilyTask, _StubScheduler]:
+    scheduler = _StubScheduler(scheduler_policy)
+    task = StartRegularilyTask(scheduler, lambda: None, datetime.timedelta(seconds=10), misfire)
+    task.due = 100.0
+    return task, scheduler
+
+
+@pytest.mark.parametrize("misfire, scheduler_policy, runs, next_due", [
+    # three runs at 110, 120 and 130 have been missed
+    (Misfire.FIRE_ONCE, Misfire.SKIP, True, 140.0),
+    (Misfire.FIRE_ALL, Misfire.SKIP, True, 110.0),
+    (Misfire.SKIP, Misfire.FIRE_ALL, False, 140.0),
+    (None, Misfire.SKIP, False, 140.0),
+    (None, Misfire.FIRE_ALL, True, 110.0),
+])
+def test_late_fire_follows_the_misfire_policy(misfire: Optional[str], scheduler_policy: str, runs: bool, next_due: float):
+    task, scheduler = _task(misfire, scheduler_policy)
+
+    assert task.on_fire(135.0) == runs
+    assert scheduler.scheduled == [next_due]
+
+
+def test_fire_all_catches_up_with_every_missed_run():
+    task, scheduler = _task(Misfire.FIRE_ALL)
+
+    fired = [task.on_fire(135.0) for _ in range(4)]
+
+    assert fired == [True] * 4
+    assert scheduler.scheduled == [110.0, 120.0, 130.0, 140.0]
+
+
+def test_fires_on_time_do_not_drift():
+    task, scheduler = _task(Misfire.SKIP)
+
+    for lateness in (0.4, 0.9, 0.0, 2.5):
+        assert task.on_fire(task.due + lateness)
+
+    assert scheduler.scheduled == [110.0, 120.0, 130.0, 140.0]
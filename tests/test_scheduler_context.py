@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+import datetime
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from summer.autowire.exceptions import ValidationError
+from summer.scheduler.scheduled_task import ScheduledTaskInterceptor, StartRegularilyTask
+from summer.scheduler.scheduler_context import SummerSchedulerContextExtension
+
+
+def _job():
+    pass
+
+
+class _RecordingInterceptor(ScheduledTaskInterceptor):
+    events = []
+
+    @contextlib.contextmanager
+    def around_task(self):
+        self.events.append("enter")
+        try:
+            yield
+        finally:
+            self.events.append("exit")
+
+
+@pytest.fixture
+def scheduler(summer_context) -> SummerSchedulerContextExtension:
+    extension = SummerSchedulerContextExtension(None)
+    extension.bean_context = summer_context(extensions=[extension], components=[_RecordingInterceptor])
+    _RecordingInterceptor.events = []
+    return extension
+
+
+def test_cluster_singleton_without_coordinator_is_refused_when_scheduled(scheduler):
+    with pytest.raises(ValidationError):
+        scheduler.schedule_repeated(_job, 1.0, cluster_singleton=True)
+
+
+def test_interceptors_wrap_coroutine_tasks(scheduler):
+    async def job():
+        _RecordingInterceptor.events.append("run")
+        await asyncio.sleep(0)
+
+    asyncio.run(scheduler._autowired_callable(job)())
+
+    assert _RecordingInterceptor.events == ["enter", "run", "exit"]
+
+
+def test_unknown_misfire_policy_of_a_task_is_refused(scheduler):
+    with pytest.raises(ValidationError):
+        scheduler.schedule_repeated(_job, 1.0, misfire="fire_twice")
+    with pytest.raises(ValidationError):
+        StartRegularilyTask(scheduler, _job, datetime.timedelta(seconds=1), misfire="fire_twice")
+
+
+def test_unknown_misfire_policy_of_the_scheduler_is_refused_when_it_starts(summer_context):
+    extension = SummerSchedulerContextExtension(None)
+    extension.bean_context = summer_context({"scheduler": {"misfire_policy": "fire_twice"}}, extensions=[extension])
+
+    with pytest.raises(ValidationError, match="scheduler.misfire_policy"):
+        extension.get_background_job()
+
+
+@pytest.fixture
+def running_scheduler(scheduler) -> Iterator[SummerSchedulerContextExtension]:
+    run_thread = scheduler.get_background_job()
+    thread = threading.Thread(target=run_thread.run)
+    thread.start()
+    yield scheduler
+    run_thread.stop()
+    thread.join()
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancelled_tasks_are_removed_from_the_pending_tasks(running_scheduler):
+    pending_tasks = running_scheduler.get_background_job().scheduled_actions
+    handles = [running_scheduler.schedule_in(_job, 60.0) for _ in range(3)]
+    _wait_for(lambda: len(pending_tasks) == 3)
+
+    assert handles[0].cancel()
+    assert not handles[0].cancel()
+    # removals wait in the inbox until the scheduler thread wakes up, a task due now wakes it
+    running_scheduler.schedule_in(_job, 0.0).get_result_future().result(5.0)
+
+    assert len(pending_tasks) == 2
+    assert handles[0].cancelled
+
+
+def test_rescheduled_one_time_task_runs_at_the_new_time(running_scheduler):
+    ran = threading.Event()
+    handle = running_scheduler.schedule_in(ran.set, 60.0)
+
+    assert handle.reschedule_in(0.05)
+
+    assert ran.wait(5.0)
+    assert handle.get_next_fire_time() is None
+
+
+def test_result_future_completes_with_the_result(running_scheduler):
+    def fail():
+        raise RuntimeError("failed")
+
+    succeeding = running_scheduler.schedule_in(lambda: 42, 0.0)
+    failing = running_scheduler.schedule_in(fail, 0.0)
+
+    assert succeeding.get_result_future().result(5.0) == 42
+    with pytest.raises(RuntimeError, match="failed"):
+        failing.get_result_future().result(5.0)
+
+
+def test_result_future_is_cancelled_with_the_task(running_scheduler):
+    handle = running_scheduler.schedule_in(_job, 60.0)
+
+    handle.cancel()
+
+    assert handle.get_result_future().cancelled()
+    assert not handle.reschedule_in(0.0)
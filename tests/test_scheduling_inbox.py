@@ -0,0 +1,79 @@
+import math
+import threading
+import time
+
+from summer.scheduler.scheduled_task import OneTimeScheduledTask
+from summer.scheduler.scheduling_inbox import SchedulingInbox
+
+
+def _task() -> OneTimeScheduledTask:
+    return OneTimeScheduledTask(lambda: None)
+
+
+def _count_notifications(inbox: SchedulingInbox):
+    notifications = []
+    notify = inbox._condition.notify
+    inbox._condition.notify = lambda *args: (notifications.append(1), notify(*args))
+    return notifications
+
+
+def _sleeping_taker(inbox: SchedulingInbox, until: float):
+    taken = []
+    thread = threading.Thread(target=lambda: taken.extend(inbox.take(until)))
+    thread.start()
+    deadline = time.monotonic() + 5.0
+    while inbox._wake_at == -math.inf:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return thread, taken
+
+
+def test_only_schedulings_before_the_wake_up_time_signal_the_scheduler():
+    inbox = SchedulingInbox()
+    notifications = _count_notifications(inbox)
+    now = time.monotonic()
+    thread, taken = _sleeping_taker(inbox, now + 10.0)
+
+    later, earlier = _task(), _task()
+    inbox.put(later, now + 20.0)
+    thread.join(0.2)
+    assert thread.is_alive()
+    assert notifications == []
+
+    inbox.put(earlier, now + 1.0)
+    thread.join(5.0)
+    assert not thread.is_alive()
+    assert notifications == [1]
+    assert taken == [(later, now + 20.0), (earlier, now + 1.0)]
+
+
+def test_removals_signal_the_scheduler_when_max_staged_are_waiting():
+    inbox = SchedulingInbox(max_staged=3)
+    notifications = _count_notifications(inbox)
+    thread, taken = _sleeping_taker(inbox, time.monotonic() + 10.0)
+
+    tasks = [_task() for _ in range(3)]
+    for task in tasks[:2]:
+        inbox.put(task, None)
+    assert notifications == []
+    inbox.put(tasks[2], None)
+    thread.join(5.0)
+
+    assert notifications == [1]
+    assert taken == [(task, None) for task in tasks]
+
+
+def test_staged_schedulings_are_taken_as_one_batch():
+    inbox = SchedulingInbox()
+    notifications = _count_notifications(inbox)
+    now = time.monotonic()
+    # a scheduler thread which is awake takes the staged schedulings anyway, so none of them signals it
+    schedulings = [(_task(), now + i) for i in range(100)]
+    for task, due in schedulings:
+        inbox.put(task, due)
+
+    assert len(inbox) == 100
+    assert notifications == []
+    assert inbox.take(now) == schedulings
+    assert len(inbox) == 0
+    assert inbox.take(time.monotonic()) == []
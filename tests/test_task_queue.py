@@ -0,0 +1,146 @@
+import json
+import multiprocessing
+import threading
+import time
+
+from summer.taskqueue.entities import DeadLetterTask
+from summer.taskqueue.task_queue import TaskQueue
+from summer.taskqueue.task_queue_context import TaskQueueContextExtension
+from tests.conftest import build_context
+
+
+def _queue(database_context, **configuration) -> TaskQueue:
+    return database_context({"taskqueue": configuration}, components=[TaskQueue]).get_bean(TaskQueue)
+
+
+def test_claim_takes_batches_of_the_oldest_due_tasks(database_context):
+    queue = _queue(database_context)
+    ids = [queue.enqueue("job", i, delay=i - 3) for i in range(3)]
+    queue.enqueue("job", "later", delay=60)
+    queue.enqueue("job", "other queue", queue="other")
+
+    first = queue.claim(["default"], 2)
+    second = queue.claim(["default"], 2)
+
+    assert [task.id for task in first] == ids[:2]
+    assert [task.payload for task in first] == [0, 1]
+    assert [task.id for task in second] == ids[2:]
+    assert queue.claim(["default"], 2) == []
+
+
+def test_expired_claims_are_taken_again(database_context):
+    queue = _queue(database_context, visibility_timeout=0.2)
+    queue.enqueue("job")
+    expired = queue.claim(["default"], 1)[0]
+    assert queue.claim(["default"], 1) == []
+
+    time.sleep(0.3)
+    again = queue.claim(["default"], 1)[0]
+
+    assert again.id == expired.id
+    assert again.attempts == 2
+    assert not queue.complete(expired)
+    assert queue.complete(again)
+    assert queue.count() == 0
+
+
+def test_failed_tasks_are_retried_then_dead_lettered_and_requeued(database_context):
+    queue = _queue(database_context, max_attempts=2, backoff={"base": 0.2, "max": 0.2})
+    id = queue.enqueue("job", {"key": "value"})
+
+    assert queue.fail(queue.claim(["default"], 1)[0], "first error")
+    # the retry waits for the backoff
+    assert queue.claim(["default"], 1) == []
+    time.sleep(0.25)
+    last = queue.claim(["default"], 1)[0]
+    assert last.attempts == 2
+    assert queue.fail(last, "second error")
+
+    assert queue.count() == 0
+    [dead_letter] = queue.get_dead_letters()
+    assert (dead_letter.id, dead_letter.attempts, dead_letter.error) == (id, 2, "second error")
+    assert json.loads(dead_letter.payload) == {"key": "value"}
+
+    assert queue.requeue_dead_letter(id)
+    assert DeadLetterTask.select().count() == 0
+    requeued = queue.claim(["default"], 1)[0]
+    assert (requeued.id, requeued.attempts, requeued.payload) == (id, 1, {"key": "value"})
+
+
+def test_worker_runs_autowired_handlers_within_its_concurrency(database_context):
+    extension = TaskQueueContextExtension(None)
+    context = database_context({"taskqueue": {"worker": {"concurrency": 2, "poll_interval": 0.05}}}, extensions=[extension])
+    extension.bean_context = context
+    lock = threading.Lock()
+    running = []
+    handled = []
+    peak = [0]
+
+    @extension.task_handler("work")
+    def work(payload, task_queue: TaskQueue):
+        with lock:
+            running.append(payload)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(payload)
+            handled.append((payload, task_queue))
+
+    worker = extension.get_background_job()
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        queue = context.get_bean(TaskQueue)
+        queue.enqueue_many("work", range(8))
+        deadline = time.monotonic() + 10
+        while queue.count() > 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+    finally:
+        worker.stop()
+        thread.join(10)
+
+    assert sorted(payload for payload, _ in handled) == list(range(8))
+    assert all(task_queue is queue for _, task_queue in handled)
+    assert peak[0] == 2
+
+
+def _consume(config_file: str, start: float, results):
+    """runs in a spawned process with its own context, completes tasks until the queue is empty"""
+    from summer.database.database_context_extension import DatabaseContextExtension
+    context = build_context(config_file, [DatabaseContextExtension()], [TaskQueue])
+    queue = context.get_bean(TaskQueue)
+    time.sleep(max(start - time.time(), 0))
+    completed = []
+    while True:
+        tasks = queue.claim(["default"], 5)
+        if len(tasks) == 0:
+            break
+        for task in tasks:
+            if queue.complete(task):
+                completed.append(task.payload)
+    results.put(completed)
+    results.close()
+    results.join_thread()
+
+
+def test_processes_sharing_a_queue_run_every_task_once(database_context, tmp_path):
+    queue = _queue(database_context)
+    queue.enqueue_many("job", range(200))
+    config_file = tmp_path / "consumer.json"
+    config_file.write_text(json.dumps({
+        "logging": {"level": "WARNING"},
+        "database": {"type": "sqlite", "filename": str(tmp_path / "test.db")}}))
+
+    spawn = multiprocessing.get_context("spawn")
+    results = spawn.Queue()
+    start = time.time() + 2.0
+    processes = [spawn.Process(target=_consume, args=(str(config_file), start, results)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    completed = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(30)
+
+    assert sorted(completed[0] + completed[1]) == list(range(200))
+    assert queue.count() == 0
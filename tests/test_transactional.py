@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from peewee import CharField, SqliteDatabase
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel, DatabaseException
+from summer.database import transaction
+from summer.database.transaction import transactional
+
+
+class Account(BaseModel):
+    name = CharField()
+
+
+def _bind(database_context):
+    context = database_context()
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Account])
+    return context
+
+
+def _names():
+    return sorted(account.name for account in Account.select())
+
+
+def _names_in_other_thread():
+    names = []
+    thread = threading.Thread(target=lambda: names.extend(_names()))
+    thread.start()
+    thread.join()
+    return names
+
+
+def test_commits_when_the_function_returns(database_context):
+    _bind(database_context)
+
+    @transactional
+    def create():
+        Account.create(name="a")
+        assert Account._meta.database.in_transaction()
+
+    create()
+
+    # other connections only see committed rows
+    assert _names_in_other_thread() == ["a"]
+
+
+def test_rolls_back_when_the_function_raises(database_context):
+    _bind(database_context)
+
+    @transactional
+    def create():
+        Account.create(name="a")
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        create()
+
+    assert _names() == []
+
+
+def test_failing_nested_call_rolls_back_only_its_savepoint(database_context):
+    _bind(database_context)
+
+    @transactional
+    def inner():
+        Account.create(name="inner")
+        raise RuntimeError("failed")
+
+    @transactional
+    def outer():
+        Account.create(name="outer")
+        with pytest.raises(RuntimeError):
+            inner()
+        Account.create(name="after")
+
+    outer()
+
+    assert _names() == ["after", "outer"]
+
+
+def test_nested_call_without_savepoint_joins_the_transaction(database_context):
+    _bind(database_context)
+
+    @transactional(savepoint=False)
+    def inner():
+        Account.create(name="inner")
+        raise RuntimeError("failed")
+
+    @transactional
+    def outer():
+        Account.create(name="outer")
+        inner()
+
+    with pytest.raises(RuntimeError):
+        outer()
+
+    assert _names() == []
+
+
+def test_destroyed_context_no_longer_provides_the_database(database_context):
+    context = _bind(database_context)
+
+    @transactional
+    def create():
+        Account.create(name="a")
+
+    context.pre_destroy()
+
+    with pytest.raises(DatabaseException):
+        create()
+
+
+def test_clearing_a_replaced_provider_keeps_the_newer_one():
+    older, newer = SqliteDatabase(":memory:"), SqliteDatabase(":memory:")
+    transaction.set_database_provider(lambda: older)
+    older_provider = transaction._DATABASE_PROVIDER
+    transaction.set_database_provider(lambda: newer)
+    try:
+        transaction.clear_database_provider(older_provider)
+        assert transaction._get_database() is newer
+    finally:
+        transaction.set_database_provider(None)
@@ -0,0 +1,47 @@
+import contextlib
+
+from peewee import CharField, IntegerField, OperationalError
+
+from summer.database.database_connection_factory import DatabaseConnectionFactory
+from summer.database.entities import BaseModel
+from summer.database.write_buffer import EntityWriteBuffer
+
+
+class Measurement(BaseModel):
+    name = CharField()
+    value = IntegerField(default=0)
+
+
+def _write_buffer(database_context) -> EntityWriteBuffer:
+    context = database_context({"database": {"write_buffer": {"flush_interval": 3600.0}}})
+    context.get_bean(DatabaseConnectionFactory).bind_entities([Measurement])
+    return context.get_bean(EntityWriteBuffer)
+
+
+def test_flush_writes_the_buffered_rows(database_context):
+    buffer = _write_buffer(database_context)
+
+    buffer.add(Measurement(name="a", value=1))
+    buffer.add_all([{"name": "b"}, {"name": "c", "value": 3}], Measurement)
+
+    assert buffer.flush() == 3
+    assert buffer.size() == 0
+    assert sorted((row.name, row.value) for row in Measurement.select()) == [("a", 1), ("b", 0), ("c", 3)]
+    assert buffer.flush() == 0
+
+
+def test_rows_are_reported_when_no_connection_can_be_opened(database_context, monkeypatch):
+    buffer = _write_buffer(database_context)
+    buffer.add_all([{"name": "a"}, {"name": "b"}], Measurement)
+
+    @contextlib.contextmanager
+    def unavailable():
+        raise OperationalError("unable to open database file")
+        yield
+    monkeypatch.setattr(buffer._connection_factory, "connection", unavailable)
+
+    assert buffer.flush() == 0
+    failed_batches = buffer.get_failed_batches()
+    assert [(batch.entity, batch.rows) for batch in failed_batches] == [(Measurement, [{"name": "a"}, {"name": "b"}])]
+    assert isinstance(failed_batches[0].error, OperationalError)
+    assert Measurement.select().count() == 0